@@ -12,7 +12,10 @@ const CVUpload = () => {
     const [moreJobsLoading, setMoreJobsLoading] = useState(false);
     const [hasMoreJobs, setHasMoreJobs] = useState(false);
     const [keywords, setKeywords] = useState('');
+    const [cursor, setCursor] = useState(null); // Next page of the server-side ranking
+    const [morePage, setMorePage] = useState(2); // Next keyword page once the ranking has expired
     const [savingJobs, setSavingJobs] = useState(new Set()); // Track which jobs are being saved
+    const [jobDetails, setJobDetails] = useState({}); // Details of the top matches, fetched in one batch
 
     const currentUser = AuthService.getCurrentUser();
 
@@ -87,11 +90,36 @@ const CVUpload = () => {
         }
     };
 
-    const handleViewDetails = async (jobId) => {
+    const prefetchJobDetails = async (jobs) => {
+        if (!jobs.length) return;
         try {
-            const response = await fetch(`http://localhost:5000/job-details/${jobId}`);
+            const response = await fetch('http://localhost:5000/job-details/batch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ job_ids: jobs.map(job => ({ id: job.id, source: job.source })) })
+            });
             if (response.ok) {
-                const details = await response.json();
+                const data = await response.json();
+                setJobDetails(prev => ({ ...prev, ...data.job_details }));
+            }
+        } catch (error) {
+            // Details are fetched one by one when viewed instead
+            console.error('Error prefetching job details:', error);
+        }
+    };
+
+    const handleViewDetails = async (jobId) => {
+        try {
+            let details = jobDetails[jobId];
+            if (!details) {
+                const response = await fetch(`http://localhost:5000/job-details/${jobId}`);
+                if (response.ok) {
+                    details = await response.json();
+                }
+            }
+            if (details) {
                 // Create a simple alert for now - in production, use a modal
                 const detailsText = `
 Job Details:
@@ -122,29 +150,44 @@ ${details.skills_required.map(s => `• ${s}`).join('\n')}
         }
     };
 
+    const fetchMoreJobs = (body) => fetch('http://localhost:5000/more-jobs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ ...body, per_page: 20 })
+    });
+
     const handleLoadMoreJobs = async () => {
-        if (!keywords) return;
+        if (!cursor && !keywords) return;
         
         setMoreJobsLoading(true);
         try {
-            console.log('Loading more jobs with keywords:', keywords);
-            const response = await fetch('http://localhost:5000/more-jobs', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    keywords: keywords,
-                    page: 2,
-                    per_page: 20
-                })
-            });
+            // The cursor continues the ranking of this CV; once the server has dropped it
+            // (410), fall back to unranked keyword pages
+            let response = null;
+            if (cursor) {
+                console.log('Loading more ranked jobs');
+                response = await fetchMoreJobs({ cursor });
+                if (response.status === 410) {
+                    setCursor(null);
+                    response = null;
+                }
+            }
+            if (response === null) {
+                console.log('Loading more jobs with keywords:', keywords);
+                response = await fetchMoreJobs({ keywords, page: morePage });
+                setMorePage(page => page + 1);
+            }
 
             if (response.ok) {
                 const data = await response.json();
                 console.log('More jobs loaded:', data);
                 setMatchedJobs(prev => [...prev, ...data.jobs]);
                 setHasMoreJobs(data.has_more);
+                if (data.cursor !== undefined) {
+                    setCursor(data.cursor);
+                }
             } else {
                 throw new Error('Failed to load more jobs');
             }
@@ -179,13 +222,17 @@ ${details.skills_required.map(s => `• ${s}`).join('\n')}
         setUploading(true);
         setError("");
         setMatchedJobs([]);
+        setJobDetails({});
+        setCursor(null);
+        setMorePage(2);
 
         const formData = new FormData();
         formData.append('resume', selectedFile);
 
         try {
             console.log("Sending request to ML engine...");
-            const response = await fetch('http://localhost:5000/match-jobs', {
+            // The streaming endpoint sends keywords first, then ranked matches as each job site finishes
+            const response = await fetch('http://localhost:5000/match-jobs/stream', {
                 method: 'POST',
                 body: formData,
             });
@@ -193,15 +240,43 @@ ${details.skills_required.map(s => `• ${s}`).join('\n')}
             console.log("Response status:", response.status);
 
             if (response.ok) {
-                const data = await response.json();
-                console.log("Response data:", data);
-                setMatchedJobs(data.matched_jobs || []);
-                setResumeText(data.resume_text || "");
-                setTotalJobs(data.total_jobs_analyzed || 0);
-                setKeywords(data.keywords_used || '');
-                setHasMoreJobs(data.has_more_jobs || false);
-                
-                if (!data.matched_jobs || data.matched_jobs.length === 0) {
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let finalMatches = null;
+
+                const handleEvent = (data) => {
+                    console.log("Stream event:", data.type, data);
+                    if (data.type === 'keywords') {
+                        setResumeText(data.resume_text || "");
+                        setKeywords(data.keywords_used || '');
+                    } else if (data.type === 'source' || data.type === 'final') {
+                        setMatchedJobs(data.matched_jobs || []);
+                        setTotalJobs(data.total_jobs_analyzed || 0);
+                        if (data.type === 'final') {
+                            finalMatches = data.matched_jobs || [];
+                            setHasMoreJobs(data.has_more_jobs || false);
+                            setCursor(data.cursor || null);
+                            prefetchJobDetails(finalMatches);
+                        }
+                    } else if (data.type === 'error') {
+                        setError(data.error);
+                    }
+                };
+
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+                }
+                if (buffer.trim()) {
+                    handleEvent(JSON.parse(buffer));
+                }
+
+                if (finalMatches !== null && finalMatches.length === 0) {
                     setError("No matching jobs found. This could be because there are no jobs in the database or the CV content doesn't match available positions.");
                 }
             } else {
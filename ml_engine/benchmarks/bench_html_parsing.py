@@ -0,0 +1,83 @@
+# Compares full-page BeautifulSoup parsing of scraper result pages with the
+# streaming card extraction in html_cards.py, on saved pages in fixtures/.
+#
+#   python benchmarks/bench_html_parsing.py --num-jobs 10 --repeat 20
+#
+# Reports CPU time (process_time, so network and sleeps never count) and peak
+# traced memory per page, and checks that both paths return the same cards.
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_cards import select_cards, select_cards_full  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# The first-choice selectors each scraper uses (see *_CARD_SELECTORS in match_jobs.py)
+PAGES = {
+    'bdjobs': [('div', {'class': 'job-listing'}), ('tr', {'bgcolor': '#FFFFFF'})],
+    'linkedin': [('div', {'class': 'job-search-card'}), ('li', {'class': 'result-card'}), ('div', {'class': 'base-card'})],
+    'indeed': [('div', {'class': 'job_seen_beacon'}), ('a', {'data-jk': True}), ('h2', {'class': 'jobTitle'})]
+}
+
+
+def card_texts(cards):
+    return [' '.join(card.get_text(' ', strip=True).split()) for card in cards]
+
+
+def measure(fn, repeat):
+    """Median CPU milliseconds over repeat runs, and the peak traced memory of one more run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        timings.append((time.process_time() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return round(timings[len(timings) // 2], 2), round(peak / (1024 * 1024), 2)
+
+
+def run(num_jobs, repeat):
+    results = {}
+    for site, selectors in PAGES.items():
+        path = os.path.join(FIXTURES_DIR, f'{site}.html')
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        full_ms, full_mb = measure(lambda: card_texts(select_cards_full(content, selectors, num_jobs)), repeat)
+        stream_ms, stream_mb = measure(lambda: card_texts(select_cards(content, selectors, num_jobs)), repeat)
+        same = card_texts(select_cards_full(content, selectors, num_jobs)) == card_texts(select_cards(content, selectors, num_jobs))
+        results[site] = {
+            'page_kb': round(len(content) / 1024, 1),
+            'cards': len(select_cards(content, selectors, num_jobs)),
+            'full_cpu_ms': full_ms,
+            'streaming_cpu_ms': stream_ms,
+            'speedup': round(full_ms / stream_ms, 2) if stream_ms else None,
+            'full_peak_mb': full_mb,
+            'streaming_peak_mb': stream_mb,
+            'same_cards': same
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-page vs streaming parsing of scraper result pages.')
+    parser.add_argument('--num-jobs', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.num_jobs, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
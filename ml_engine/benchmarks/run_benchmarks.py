@@ -0,0 +1,288 @@
+# Offline micro-benchmarks for every stage of the matching pipeline.
+#
+#   python benchmarks/run_benchmarks.py                       # all stages, results/<time>_<commit>.json
+#   python benchmarks/run_benchmarks.py --stages pdf keywords --repeat 20
+#   python benchmarks/run_benchmarks.py --compare results/old.json results/new.json
+#
+# Nothing touches the network: scrapers parse the saved pages in fixtures/, CVs
+# and job corpora come from sample_data.py, and the ranking stage uses fixed
+# random embeddings so it measures the result session ranking itself
+# (RankedResults.add and page, as served by /match-jobs and /more-jobs), not the model.
+# Only the embedding stage needs the model (it is skipped with an error entry
+# if the model cannot be loaded from the local cache).
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_ENGINE_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ML_ENGINE_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import sample_data  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+STAGES = ('pdf', 'keywords', 'scrapers', 'dedup', 'embedding', 'ranking')
+CV_PAGES = (1, 2, 5, 20)
+CORPUS_SIZES = (10, 100, 1000, 10000, 100000)
+EMBEDDING_BATCH_SIZES = (1, 8, 32, 128)
+
+
+def measure(fn, repeat, warmup=1):
+    """Runs fn warmup + repeat times (with its output silenced) and summarizes the timed runs."""
+    wall, cpu = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            fn()
+            wall.append((time.perf_counter() - wall_start) * 1000)
+            cpu.append((time.process_time() - cpu_start) * 1000)
+    wall.sort()
+    cpu.sort()
+    return {
+        'runs': repeat,
+        'median_ms': round(wall[len(wall) // 2], 3),
+        'min_ms': round(wall[0], 3),
+        'max_ms': round(wall[-1], 3),
+        'cpu_median_ms': round(cpu[len(cpu) // 2], 3)
+    }
+
+
+def bench_pdf(match_jobs, repeat):
+    results = {}
+    for pages in CV_PAGES:
+        pdf = sample_data.cv_pdf(pages)
+        result = measure(lambda: match_jobs.extract_text_from_pdf(io.BytesIO(pdf)), repeat)
+        result['pdf_kb'] = round(len(pdf) / 1024, 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result['characters'] = len(match_jobs.extract_text_from_pdf(io.BytesIO(pdf)))
+        results[f'{pages}_pages'] = result
+    return results
+
+
+def bench_keywords(match_jobs, repeat):
+    results = {}
+    for pages in CV_PAGES:
+        text = sample_data.cv_text(pages)
+        result = measure(lambda: match_jobs.extract_keywords_from_resume(text), repeat)
+        result['characters'] = len(text)
+        results[f'{pages}_pages'] = result
+    return results
+
+
+class FixtureResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+        self.text = content.decode('utf-8', 'replace')
+
+
+def bench_scrapers(match_jobs, repeat, num_jobs=10):
+    scrapers = {
+        'bdjobs': match_jobs.scrape_bdjobs,
+        'indeed': match_jobs.scrape_indeed_jobs,
+        'linkedin': match_jobs.scrape_linkedin_jobs
+    }
+    results = {}
+    original_get = match_jobs.http_client.get
+    try:
+        for site, scraper in scrapers.items():
+            page = sample_data.fixture_page(site)
+            match_jobs.http_client.get = lambda url, **kwargs: FixtureResponse(page)
+            result = measure(lambda: scraper('python developer', num_jobs), repeat)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result['jobs'] = len(scraper('python developer', num_jobs))
+            result['page_kb'] = round(len(page) / 1024, 1)
+            results[site] = result
+    finally:
+        match_jobs.http_client.get = original_get
+    return results
+
+
+def bench_dedup(match_jobs, repeat, sizes=(100, 1000, 10000)):
+    results = {}
+    for size in sizes:
+        # Distinct postings (a random code keeps titles apart, as real titles are), and a third of
+        # the listings are copies of another posting as listed by a different source
+        rng = np.random.default_rng(size)
+        jobs = [dict(job, title=f"{job['title']} {rng.integers(16 ** 6):06x}") for job in sample_data.job_corpus(size)]
+        copies = [dict(job, source='LinkedIn', id=f'copy_{i}', title=job['title'] + ' (Remote)', job_url=f'https://example.com/copy/{i}')
+                  for i, job in enumerate(jobs[:size // 2])]
+        listings = jobs + copies
+        result = measure(lambda: match_jobs.collapse_duplicate_jobs(listings), repeat)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result['unique_jobs'] = len(match_jobs.collapse_duplicate_jobs(listings))
+        result['listings'] = len(listings)
+        results[f'{len(listings)}_listings'] = result
+    return results
+
+
+def bench_embedding(match_jobs, repeat):
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            match_jobs.model_loader.warm_up()
+    except Exception as e:
+        return {'error': f'model could not be loaded: {e}'}
+
+    texts = [sample_data.job_corpus(1, seed=i)[0]['description'] for i in range(max(EMBEDDING_BATCH_SIZES))]
+    results = {}
+    for batch_size in EMBEDDING_BATCH_SIZES:
+        batch = texts[:batch_size]
+        result = measure(lambda: match_jobs.get_embedding(batch), repeat)
+        result['texts_per_second'] = round(batch_size / (result['median_ms'] / 1000), 1)
+        results[f'batch_{batch_size}'] = result
+    return results
+
+
+def bench_ranking(match_jobs, repeat, sizes=CORPUS_SIZES, dimension=384):
+    """Ranks a scraped batch into a result session and serves pages from it, as /match-jobs and /more-jobs do."""
+    rng = np.random.default_rng(0)
+    resume_embedding = rng.standard_normal(dimension).astype(np.float32)
+    filters = {'sources': ['BDJobs', 'LinkedIn'], 'min_score': 5.0}
+
+    def first_page(jobs, embeddings, filters=None):
+        results = match_jobs.RankedResults(resume_embedding, 'python', filters)
+        results.add(jobs, embeddings)
+        return results.page(0, 10)
+
+    results = {}
+    for size in sizes:
+        jobs = sample_data.job_corpus(size)
+        embeddings = rng.standard_normal((size, dimension)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        session = match_jobs.RankedResults(resume_embedding, 'python')
+        session.add(jobs, embeddings)
+        results[f'{size}_jobs'] = {
+            'top_10': measure(lambda: first_page(jobs, embeddings), repeat),
+            'filtered_top_10': measure(lambda: first_page(jobs, embeddings, filters), repeat),
+            'next_page': measure(lambda: session.page(10, 20), repeat)
+        }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ML_ENGINE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def import_match_jobs(data_dir):
+    # Keep runtime data out of ml_engine/data and measure the model, not the embedding cache
+    os.environ.setdefault('EMBEDDING_CACHE_ENABLED', 'false')
+    os.environ.setdefault('JOB_CORPUS_PATH', os.path.join(data_dir, 'job_corpus.sqlite3'))
+    os.environ.setdefault('JOB_INDEX_DIR', os.path.join(data_dir, 'job_index'))
+    os.environ.setdefault('PDF_PROCESS_POOL', 'false')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import match_jobs
+    return match_jobs
+
+
+def run(stages, repeat):
+    with tempfile.TemporaryDirectory() as data_dir:
+        match_jobs = import_match_jobs(data_dir)
+        benchmarks = {
+            'pdf': bench_pdf,
+            'keywords': bench_keywords,
+            'scrapers': bench_scrapers,
+            'dedup': bench_dedup,
+            'embedding': bench_embedding,
+            'ranking': bench_ranking
+        }
+        results = {
+            'commit': git_commit(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config': {
+                'embedding_model': match_jobs.EMBEDDING_MODEL_NAME,
+                'embedding_backend': match_jobs.EMBEDDING_BACKEND,
+                'embed_batching': match_jobs.EMBED_BATCHING,
+                'scrape_streaming_parse': match_jobs.SCRAPE_STREAMING_PARSE,
+                'pdf_process_pool': match_jobs.PDF_PROCESS_POOL
+            },
+            'repeat': repeat,
+            'stages': {}
+        }
+        for stage in stages:
+            print(f"⏱️ Benchmarking {stage}...")
+            results['stages'][stage] = benchmarks[stage](match_jobs, repeat)
+        return results
+
+
+def flatten(results, prefix=''):
+    """{'a': {'b': {'median_ms': 1}}} -> {'a.b': 1} for every timing in a results file."""
+    timings = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            if 'median_ms' in value:
+                timings[prefix + key] = value['median_ms']
+            else:
+                timings.update(flatten(value, f'{prefix}{key}.'))
+    return timings
+
+
+def compare(baseline_path, current_path, threshold):
+    """Prints every timing of two results files side by side; returns True if any regressed by more than threshold."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    old, new = flatten(baseline['stages']), flatten(current['stages'])
+
+    print(f"{'benchmark':<45} {baseline.get('commit') or 'baseline':>12} {current.get('commit') or 'current':>12}   change")
+    regressed = False
+    for name in [name for name in new if name in old]:
+        change = (new[name] - old[name]) / old[name] if old[name] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠️ slower'
+            regressed = True
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{name:<45} {old[name]:>10.2f}ms {new[name]:>10.2f}ms {change:>+8.1%}{flag}")
+    for name in [name for name in old if name not in new] + [name for name in new if name not in old]:
+        print(f"{name:<45} only in {'baseline' if name in old else 'current'}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline ML engine benchmarks or compare two results files.')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark (after one warm-up run)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<time>_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='compare two results files')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown reported as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    results = run(args.stages, args.repeat)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = time.strftime('%Y%m%d-%H%M%S') + (f"_{results['commit']}" if results['commit'] else '')
+        output = os.path.join(RESULTS_DIR, f'{name}.json')
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Saved benchmark results to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# Deterministic inputs for the offline benchmarks: CV texts and PDFs of a given
+# page count, synthetic job corpora of any size and the saved scraper pages in
+# fixtures/. Everything is generated from a seed, so two runs (or two commits)
+# always benchmark exactly the same data.
+
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+SKILLS = [
+    'python', 'django', 'flask', 'fastapi', 'javascript', 'typescript', 'react', 'angular', 'node.js',
+    'java', 'spring boot', 'kotlin', 'c++', 'c#', 'asp.net', 'golang', 'rust', 'sql', 'postgresql',
+    'mysql', 'mongodb', 'redis', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'terraform', 'linux',
+    'git', 'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'machine learning',
+    'deep learning', 'data analysis', 'rest api', 'graphql', 'microservices', 'ci/cd', 'agile'
+]
+ROLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Scientist', 'Data Analyst', 'Machine Learning Engineer', 'DevOps Engineer',
+    'QA Engineer', 'Mobile Developer', 'Product Manager', 'Business Analyst'
+]
+COMPANIES = [
+    'Brain Station 23', 'Therap (BD) Ltd.', 'Kaz Software', 'BJIT Limited', 'Enosis Solutions',
+    'SELISE Digital Platforms', 'Cefalo Bangladesh', 'Pathao Ltd.', 'bKash Limited', 'Grameenphone Ltd.',
+    'Vivasoft Limited', 'Tiger IT Bangladesh', 'Chaldal Ltd.', 'Optimizely', 'Samsung R&D Institute'
+]
+LOCATIONS = ['Dhaka, Bangladesh', 'Chattogram, Bangladesh', 'Sylhet, Bangladesh', 'Remote', 'Gulshan, Dhaka']
+SOURCES = ['BDJobs', 'Indeed', 'LinkedIn']
+FILLER = [
+    'Designed and maintained services used by thousands of customers every day.',
+    'Worked closely with product owners to turn requirements into reliable features.',
+    'Reduced response times by profiling hot paths and removing redundant queries.',
+    'Mentored junior developers and reviewed code for correctness and readability.',
+    'Wrote automated tests and improved the continuous integration pipeline.',
+    'Led the migration of a legacy monolith to smaller independently deployed services.',
+    'Collaborated with designers and QA to ship releases on a two week cadence.',
+    'Documented architecture decisions and onboarding guides for the team.'
+]
+
+LINES_PER_PAGE = 48
+
+
+def cv_lines(pages, seed=0):
+    """Lines of a plausible CV that fills the given number of pages."""
+    rng = random.Random(seed)
+    role = rng.choice(ROLES)
+    lines = [
+        f'Candidate {seed}',
+        f'{role} | candidate{seed}@example.com | {rng.choice(LOCATIONS)}',
+        '',
+        'SUMMARY',
+        f'{role} with {rng.randint(2, 12)} years of experience in {", ".join(rng.sample(SKILLS, 4))}.',
+        '',
+        'SKILLS',
+        ', '.join(rng.sample(SKILLS, 12)),
+        ''
+    ]
+    job = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        job += 1
+        lines.append(f'{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({2024 - job * 2} - {2026 - job * 2})')
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f'- {rng.choice(FILLER)} Used {rng.choice(SKILLS)} and {rng.choice(SKILLS)}.')
+        lines.append('')
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def cv_text(pages, seed=0):
+    return '\n'.join(cv_lines(pages, seed))
+
+
+def _pdf_string(line):
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return '(' + line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def cv_pdf(pages, seed=0):
+    """A text-only PDF (Helvetica, one CV line per text line) with the given number of pages, as bytes."""
+    lines = cv_lines(pages, seed)
+    page_streams = []
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        body = ' Tj T* '.join(_pdf_string(line) for line in lines[start:start + LINES_PER_PAGE])
+        page_streams.append(f'BT /F1 10 Tf 14 TL 50 790 Td {body} Tj ET'.encode('latin-1'))
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    page_ids = [4 + 2 * i for i in range(len(page_streams))]
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{" ".join(f"{i} 0 R" for i in page_ids)}] /Count {len(page_ids)} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+    ]
+    for page_id, stream in zip(page_ids, page_streams):
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>'.encode())
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n'.encode() + stream + b'\nendstream')
+
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    pdf += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(pdf)
+
+
+def job_corpus(size, seed=0):
+    """size job dicts shaped like the scrapers' output."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(size):
+        title = rng.choice(ROLES)
+        company = rng.choice(COMPANIES)
+        skills = rng.sample(SKILLS, 5)
+        source = SOURCES[i % len(SOURCES)]
+        jobs.append({
+            'id': f'{source.lower()}_{i + 1}',
+            'title': title,
+            'company': company,
+            'description': f'{company} is hiring a {title}. {rng.choice(FILLER)} {rng.choice(FILLER)}',
+            'requirements': f'Experience with {", ".join(skills)}.',
+            'location': rng.choice(LOCATIONS),
+            'source': source,
+            'job_url': f'https://example.com/jobs/{i + 1}',
+            'apply_url': f'https://example.com/jobs/{i + 1}/apply'
+        })
+    return jobs
+
+
+def fixture_page(site):
+    """Saved results page for 'bdjobs', 'indeed' or 'linkedin' as bytes."""
+    with open(os.path.join(FIXTURES_DIR, f'{site}.html'), 'rb') as f:
+        return f.read()
@@ -0,0 +1,151 @@
+# Per-source health tracking for the scrapers.
+#
+# Each job site gets a circuit breaker. After failure_threshold consecutive
+# failures (errors, timeouts or blocking responses) it opens and calls to the
+# site are rejected at once instead of each waiting out a timeout. After
+# reset_timeout seconds it lets one probe request through (half-open): a
+# success closes it again, a failure re-opens it for another reset_timeout.
+#
+# The breaker also adapts the request timeout to the site: timeout_factor
+# times the p95 latency of its recent successful requests, clamped to
+# [min_timeout, max_timeout], so a site that normally answers in 800 ms is
+# given up on after a couple of seconds rather than the worst-case maximum.
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """A call was rejected because the source's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with a p95-based adaptive timeout for one source."""
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60.0, min_timeout=2.0, max_timeout=10.0,
+                 timeout_factor=2.0, window=100, min_samples=10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._timeout = max_timeout
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._successes = 0
+        self._failures = 0
+        self._rejected = 0
+        self._trips = 0
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def available(self):
+        """Whether a call would currently be let through (without taking the half-open probe slot)."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    def allow(self):
+        """Admits a call, or returns False (and counts a rejection) while the breaker is open or probing."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def timeout(self):
+        """Seconds to wait for the source's next response."""
+        with self._lock:
+            return self._timeout
+
+    def record_success(self, seconds):
+        with self._lock:
+            self._successes += 1
+            self._consecutive_failures = 0
+            self._state = CLOSED
+            self._probe_in_flight = False
+            self._latencies.append(seconds)
+            if len(self._latencies) >= self.min_samples:
+                p95 = float(np.percentile(self._latencies, 95))
+                self._timeout = min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_factor))
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            self._failures += 1
+            self._consecutive_failures += 1
+            state = self._current_state(now)
+            if state == HALF_OPEN or (state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = now
+                self._probe_in_flight = False
+                self._trips += 1
+
+    def release(self):
+        """Ends an admitted call without an outcome (e.g. abandoned by the caller), freeing the half-open probe slot."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'retry_in_seconds': round(max(0.0, self.reset_timeout - (now - self._opened_at)), 1) if state == OPEN else None,
+                'timeout_seconds': round(self._timeout, 3),
+                'p95_latency_seconds': round(float(np.percentile(self._latencies, 95)), 3) if self._latencies else None,
+                'latency_samples': len(self._latencies),
+                'successes': self._successes,
+                'failures': self._failures,
+                'rejected': self._rejected,
+                'trips': self._trips
+            }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per source name, created on first use with the registry's settings."""
+
+    def __init__(self, **options):
+        self.options = options
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self.options)
+            return breaker
+
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in breakers.items()}
@@ -0,0 +1,318 @@
+# Interchangeable inference backends for the sentence embedding model.
+#
+#   torch      SentenceTransformer on PyTorch (reference implementation, default)
+#   onnx       the same transformer exported to ONNX and run with ONNX Runtime
+#   onnx-int8  the ONNX export with dynamically int8-quantized weights
+#
+# The ONNX files are exported from the PyTorch model on first use (this needs
+# torch, sentence-transformers and onnx once) and cached on disk; at runtime the
+# ONNX backends only need onnxruntime, tokenizers and numpy.
+#
+# Parity check against the reference backend:
+#   python embedding_backends.py parity --backend onnx-int8
+#   python embedding_backends.py parity --backend onnx --texts-file samples.txt
+# Export ahead of time (e.g. in a container build):
+#   python embedding_backends.py export --backend onnx-int8
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger('ml_engine')
+
+
+class TorchBackend:
+    """Runs the model with sentence-transformers on PyTorch."""
+
+    name = 'torch'
+
+    def __init__(self, model_name):
+        # Imported here so that importing the app does not pull in torch
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size=32):
+        """Returns a (len(texts), dim) float32 array of embeddings."""
+        return np.asarray(self.model.encode(list(texts), convert_to_numpy=True, batch_size=batch_size), dtype=np.float32)
+
+    def set_num_threads(self, threads):
+        import torch
+        torch.set_num_threads(threads)
+
+
+def export_onnx(model_name, export_dir, quantize=False):
+    """
+    Exports model_name to export_dir as model.onnx (plus model.int8.onnx when quantize)
+    along with its tokenizer, unless the files already exist. Returns the model path.
+    """
+    model_path = os.path.join(export_dir, 'model.onnx')
+    int8_path = os.path.join(export_dir, 'model.int8.onnx')
+    meta_path = os.path.join(export_dir, 'meta.json')
+
+    if not os.path.exists(meta_path):
+        import onnx
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"📦 Exporting {model_name} to ONNX in {export_dir}...")
+        st_model = SentenceTransformer(model_name, device='cpu')
+        transformer = st_model[0]
+        pooling = st_model[1]
+        # pooling_mode on sentence-transformers >= 5, pooling_mode_mean_tokens before
+        mean_pooling = getattr(pooling, 'pooling_mode', None) == 'mean' or getattr(pooling, 'pooling_mode_mean_tokens', False)
+        if not mean_pooling:
+            raise ValueError(f"{model_name} does not use mean pooling, which the ONNX backend implements")
+        normalize = any(type(module).__name__ == 'Normalize' for module in st_model)
+
+        class TokenEmbeddings(torch.nn.Module):
+            def __init__(self, auto_model):
+                super().__init__()
+                self.auto_model = auto_model
+
+            def forward(self, input_ids, attention_mask, token_type_ids):
+                return self.auto_model(input_ids=input_ids, attention_mask=attention_mask,
+                                       token_type_ids=token_type_ids).last_hidden_state
+
+        os.makedirs(export_dir, exist_ok=True)
+        sample = transformer.tokenizer(['export sample'], return_tensors='pt')
+        inputs = (sample['input_ids'], sample['attention_mask'],
+                  sample.get('token_type_ids', torch.zeros_like(sample['input_ids'])))
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in ('input_ids', 'attention_mask', 'token_type_ids')}
+        dynamic_axes['token_embeddings'] = {0: 'batch', 1: 'sequence'}
+        # Newer torch exporters may split weights into side files; re-save the graph as
+        # one self-contained file so it can be renamed into place atomically
+        with tempfile.TemporaryDirectory(dir=export_dir) as tmp_dir:
+            exported_path = os.path.join(tmp_dir, 'model.onnx')
+            with torch.no_grad():
+                torch.onnx.export(
+                    TokenEmbeddings(transformer.auto_model.eval()), inputs, exported_path,
+                    input_names=['input_ids', 'attention_mask', 'token_type_ids'],
+                    output_names=['token_embeddings'],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=17
+                )
+            tmp_path = model_path + '.tmp'
+            onnx.save(onnx.load(exported_path), tmp_path)
+        os.replace(tmp_path, model_path)
+        transformer.tokenizer.save_pretrained(export_dir)
+
+        # meta.json is written last so a half-finished export is redone
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({
+                'model_name': model_name,
+                'max_seq_length': int(transformer.max_seq_length),
+                'pad_token': transformer.tokenizer.pad_token,
+                'pad_token_id': int(transformer.tokenizer.pad_token_id),
+                'normalize': normalize,
+                'exported_at': time.time()
+            }, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    if quantize and not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info(f"📦 Quantizing {model_path} to int8...")
+        tmp_path = int8_path + '.tmp'
+        quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+
+    return int8_path if quantize else model_path
+
+
+class OnnxBackend:
+    """
+    Runs the exported transformer with ONNX Runtime and applies mean pooling (and
+    L2 normalization, if the original model does) in NumPy.
+
+    The inference session is created lazily in each process, so a pre-fork server
+    can load the backend in its master without handing ONNX Runtime's thread pool
+    to forked workers.
+    """
+
+    name = 'onnx'
+    quantize = False
+
+    def __init__(self, model_name, export_dir, num_threads=0):
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.model_path = export_onnx(model_name, export_dir, quantize=self.quantize)
+        with open(os.path.join(export_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.tokenizer = Tokenizer.from_file(os.path.join(export_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.meta['max_seq_length'])
+        self.tokenizer.enable_padding(pad_id=self.meta['pad_token_id'], pad_token=self.meta['pad_token'])
+        self.num_threads = num_threads
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._input_names = ()
+
+    def set_num_threads(self, threads):
+        self.num_threads = threads
+
+    def _get_session(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                import onnxruntime
+                options = onnxruntime.SessionOptions()
+                options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+                if self.num_threads:
+                    options.intra_op_num_threads = self.num_threads
+                self._session = onnxruntime.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+                self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+                self._pid = os.getpid()
+            return self._session
+
+    def encode(self, texts, batch_size=32):
+        """Returns a (len(texts), dim) float32 array of embeddings."""
+        texts = list(texts)
+        session = self._get_session()
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            feed = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            token_embeddings = session.run(None, {k: v for k, v in feed.items() if k in self._input_names})[0]
+            mask = feed['attention_mask'][:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if self.meta['normalize']:
+                pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            batches.append(pooled.astype(np.float32))
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(batches)
+
+
+class QuantizedOnnxBackend(OnnxBackend):
+    """ONNX backend using weights dynamically quantized to int8 (activations are quantized per call)."""
+
+    name = 'onnx-int8'
+    quantize = True
+
+
+BACKENDS = {'torch': TorchBackend, 'onnx': OnnxBackend, 'onnx-int8': QuantizedOnnxBackend}
+
+
+def default_export_dir(model_name, data_dir):
+    return os.path.join(data_dir, 'onnx', model_name.replace('/', '__'))
+
+
+def load_backend(name, model_name, export_dir=None, num_threads=0):
+    """Creates the backend registered under name for model_name."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    if name == 'torch':
+        return TorchBackend(model_name)
+    return BACKENDS[name](model_name, export_dir, num_threads=num_threads)
+
+
+SAMPLE_TEXTS = [
+    'Senior Python developer with Django, REST APIs and PostgreSQL experience',
+    'Frontend engineer building React and TypeScript single page applications',
+    'Machine learning engineer: PyTorch, scikit-learn, model deployment on AWS',
+    'Data analyst skilled in SQL, Excel, Power BI and statistical reporting',
+    'DevOps engineer with Docker, Kubernetes, Terraform and CI/CD pipelines',
+    'Android developer using Kotlin and Jetpack Compose',
+    'Accountant with IFRS reporting, audit support and tax filing experience',
+    'Graphic designer proficient in Figma, Photoshop and Illustrator',
+    'Customer support specialist handling chat, email and phone tickets',
+    'Java Spring Boot backend developer for microservices on Azure',
+    'Registered nurse with ICU experience and BLS certification',
+    'Digital marketing executive: SEO, Google Ads and social media campaigns',
+    'Embedded C engineer working on ARM microcontrollers and RTOS',
+    'Project manager with Agile, Scrum and stakeholder management skills',
+    'Full stack developer: Node.js, Express, MongoDB and React',
+    'Teacher of mathematics for secondary school students'
+]
+
+
+def parity_report(reference, candidate, texts, batch_size=32, repeats=3):
+    """
+    Compares candidate embeddings with the reference backend on texts.
+
+    Reports the per-text cosine similarity between the two backends (drift is
+    1 - cosine), how often each text keeps the same nearest neighbour among the
+    other texts, and the best-of-repeats encode time of each backend.
+    """
+    def timed_encode(backend):
+        backend.encode(texts[:1])  # exclude one-time session and thread pool setup
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            vectors = backend.encode(texts, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return np.asarray(vectors, dtype=np.float32), best
+
+    ref_vectors, ref_seconds = timed_encode(reference)
+    cand_vectors, cand_seconds = timed_encode(candidate)
+
+    def unit(vectors):
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    ref_unit, cand_unit = unit(ref_vectors), unit(cand_vectors)
+    cosines = np.sum(ref_unit * cand_unit, axis=1)
+    drift = np.maximum(1.0 - cosines, 0.0)
+
+    neighbour_agreement = None
+    if len(texts) > 1:
+        ref_sims = ref_unit @ ref_unit.T
+        cand_sims = cand_unit @ cand_unit.T
+        np.fill_diagonal(ref_sims, -np.inf)
+        np.fill_diagonal(cand_sims, -np.inf)
+        neighbour_agreement = round(float(np.mean(ref_sims.argmax(axis=1) == cand_sims.argmax(axis=1))), 4)
+
+    return {
+        'reference': reference.name,
+        'candidate': candidate.name,
+        'texts': len(texts),
+        'cosine_mean': round(float(cosines.mean()), 6),
+        'cosine_min': round(float(cosines.min()), 6),
+        'drift_mean': round(float(drift.mean()), 6),
+        'drift_p95': round(float(np.percentile(drift, 95)), 6),
+        'drift_max': round(float(drift.max()), 6),
+        'nearest_neighbour_agreement': neighbour_agreement,
+        'reference_ms_per_text': round(ref_seconds * 1000 / len(texts), 3),
+        'candidate_ms_per_text': round(cand_seconds * 1000 / len(texts), 3),
+        'speedup': round(ref_seconds / cand_seconds, 2) if cand_seconds else None
+    }
+
+
+def main():
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    parser = argparse.ArgumentParser(description='Export ONNX embedding backends and check their parity with PyTorch.')
+    parser.add_argument('command', choices=['parity', 'export'])
+    parser.add_argument('--backend', choices=[name for name in BACKENDS if name != 'torch'], default='onnx-int8')
+    parser.add_argument('--model', default=os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2'))
+    parser.add_argument('--export-dir', help='Where ONNX files are cached (default: data/onnx/<model>)')
+    parser.add_argument('--texts-file', help='Texts to compare, one per line (default: built-in samples)')
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    export_dir = args.export_dir or os.environ.get('EMBEDDING_ONNX_DIR') or default_export_dir(args.model, data_dir)
+    candidate = load_backend(args.backend, args.model, export_dir)
+    if args.command == 'export':
+        print(f"✅ {args.backend} backend ready in {export_dir}")
+        return
+
+    texts = SAMPLE_TEXTS
+    if args.texts_file:
+        with open(args.texts_file) as f:
+            texts = [line.strip() for line in f if line.strip()]
+    reference = load_backend('torch', args.model)
+    print(json.dumps(parity_report(reference, candidate, texts, batch_size=args.batch_size), indent=2))
+
+
+if __name__ == '__main__':
+    main()
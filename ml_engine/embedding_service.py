@@ -0,0 +1,196 @@
+# Micro-batching front end for the embedding model.
+# Concurrent requests each encode only a handful of texts; merging them into one
+# model call amortizes per-call overhead and keeps the CPU cores busy on a
+# single large batch instead of several competing small ones.
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class ModelLoader:
+    """
+    Loads the embedding model on first use or in a background thread, and tracks readiness.
+
+    load_fn() returns the model (heavy imports belong inside it so importing the
+    app stays cheap); warmup_fn(model) runs a first inference so the first real
+    request does not pay for lazy initialization inside torch.
+    """
+
+    def __init__(self, load_fn, warmup_fn=None):
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        # Reentrant: warm_up() holds it across load()
+        self._lock = threading.RLock()
+        self._model = None
+        self._state = 'not_loaded'
+        self._error = None
+        self._load_seconds = None
+        self._warmup_seconds = None
+
+    def load(self):
+        """Loads the model if needed (blocking) and returns it."""
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                self._state = 'loading'
+                start = time.perf_counter()
+                try:
+                    self._model = self.load_fn()
+                except Exception as e:
+                    self._state = 'failed'
+                    self._error = str(e)
+                    raise
+                self._load_seconds = round(time.perf_counter() - start, 3)
+                self._state = 'loaded'
+        return self._model
+
+    def warm_up(self):
+        """Loads the model if needed, runs the warm-up inference once and returns the model."""
+        if self._state == 'ready':
+            return self._model
+        # A background warm-up and a request's lazy get() may race; only one loads and warms up
+        with self._lock:
+            model = self.load()
+            if self._state != 'ready':
+                start = time.perf_counter()
+                if self.warmup_fn is not None:
+                    self.warmup_fn(model)
+                self._warmup_seconds = round(time.perf_counter() - start, 3)
+                self._state = 'ready'
+        return model
+
+    def get(self):
+        """Returns a ready model, loading and warming it up first if nobody has yet."""
+        if self._state == 'ready':
+            return self._model
+        return self.warm_up()
+
+    def start_background(self):
+        """Loads and warms up the model in a daemon thread so the server can bind immediately."""
+        def run():
+            try:
+                self.warm_up()
+            except Exception as e:
+                self._state = 'failed'
+                self._error = str(e)
+        threading.Thread(target=run, name='model-loader', daemon=True).start()
+
+    @property
+    def ready(self):
+        return self._state == 'ready'
+
+    def status(self):
+        return {
+            'state': self._state,
+            'loaded': self._model is not None,
+            'ready': self.ready,
+            'load_seconds': self._load_seconds,
+            'warmup_seconds': self._warmup_seconds,
+            'error': self._error
+        }
+
+
+class EmbeddingBatcher:
+    """
+    Merges concurrent encode calls into batched calls to encode_fn.
+
+    Callers block in encode() while a single background thread collects requests
+    from a bounded queue. After the first request arrives it waits at most
+    max_wait_ms for more (or until max_batch_size texts are pending), sorts the
+    merged texts by length to reduce padding, encodes them in one call and hands
+    every caller back its own rows.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=64, max_wait_ms=5, max_queue_size=256):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+
+    def _ensure_worker(self):
+        # Started lazily (and restarted after fork) so pre-fork servers never
+        # hand a dead thread to their workers
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, args=(self._queue,), name='embedding-batcher', daemon=True).start()
+            return self._queue
+
+    def encode(self, texts):
+        """Returns a (len(texts), dim) float32 array of embeddings."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        future = Future()
+        self._ensure_worker().put((texts, future))
+        return future.result()
+
+    def _collect(self, request_queue):
+        batch = [request_queue.get()]
+        pending = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while pending < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = request_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            pending += len(request[0])
+        return batch
+
+    def _run(self, request_queue):
+        while True:
+            batch = self._collect(request_queue)
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+                sorted_vectors = np.asarray(self.encode_fn([texts[i] for i in order]), dtype=np.float32)
+                vectors = np.empty_like(sorted_vectors)
+                vectors[order] = sorted_vectors
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            if len(batch) == 1:
+                batch[0][1].set_result(vectors)
+            else:
+                # Copies, so a caller holding on to its rows does not pin the whole batch
+                start = 0
+                for request_texts, future in batch:
+                    future.set_result(vectors[start:start + len(request_texts)].copy())
+                    start += len(request_texts)
+
+            with self._lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._texts += len(texts)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self._batches,
+                'requests': self._requests,
+                'texts': self._texts,
+                'avg_requests_per_batch': round(self._requests / self._batches, 2) if self._batches else 0.0,
+                'avg_texts_per_batch': round(self._texts / self._batches, 2) if self._batches else 0.0,
+                'queued_requests': self._queue.qsize() if self._queue is not None else 0,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000
+            }
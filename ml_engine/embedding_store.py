@@ -0,0 +1,127 @@
+# Persistent, content-addressed cache for sentence embeddings.
+# Texts are keyed by the SHA-256 of their content and by the model version that
+# produced the vector, so switching models never serves stale embeddings.
+
+import hashlib
+import threading
+
+import numpy as np
+
+from sqlite_db import ThreadLocalConnections
+
+
+class EmbeddingStore:
+    """
+    SQLite-backed embedding cache shared by every request and every worker process.
+
+    Vectors are stored as raw float32 blobs and read back with np.frombuffer, so a
+    cached embedding is never re-parsed or re-encoded. Only texts whose hash is not
+    in the store for the current model version are sent to the encoder.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _QUERY_CHUNK = 500
+
+    def __init__(self, path, model_version):
+        self.path = path
+        self.model_version = model_version
+        self._connections = ThreadLocalConnections(path)
+        self._connection = self._connections.get
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_version TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model_version, content_hash)
+            )
+            """
+        )
+
+    @staticmethod
+    def content_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, hashes):
+        """Returns a dict of content hash -> float32 vector for the hashes already stored."""
+        found = {}
+        hashes = list(hashes)
+        connection = self._connection()
+        for start in range(0, len(hashes), self._QUERY_CHUNK):
+            chunk = hashes[start:start + self._QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = connection.execute(
+                f"SELECT content_hash, vector FROM embeddings WHERE model_version = ? AND content_hash IN ({placeholders})",
+                [self.model_version] + chunk
+            )
+            for content_hash, vector in rows:
+                found[content_hash] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, items):
+        """Stores (content hash, vector) pairs for the current model version."""
+        rows = [
+            (self.model_version, content_hash, int(vector.shape[-1]), np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+            for content_hash, vector in items
+        ]
+        if not rows:
+            return
+        connection = self._connection()
+        connection.execute('BEGIN')
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_version, content_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def encode(self, texts, encode_fn):
+        """
+        Returns an (n, dim) float32 matrix of embeddings for texts.
+
+        encode_fn is called once with the list of distinct texts that are not yet
+        cached and must return their embeddings as a 2-D array in the same order.
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        cached = self.get_many(set(hashes))
+
+        missing = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in cached and content_hash not in missing:
+                missing[content_hash] = text
+
+        if missing:
+            vectors = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            new_items = list(zip(missing.keys(), vectors))
+            self.put_many(new_items)
+            cached.update(new_items)
+
+        with self._lock:
+            self._hits += len(hashes) - len(missing)
+            self._misses += len(missing)
+
+        if not hashes:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([cached[content_hash] for content_hash in hashes])
+
+    def stats(self):
+        count = self._connection().execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model_version = ?", (self.model_version,)
+        ).fetchone()[0]
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'model_version': self.model_version,
+                'stored_embeddings': count,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,153 @@
+# Streaming extraction of job cards from search result pages.
+#
+# The scrapers only need the first few job cards of a results page, but parsing
+# the page into a full BeautifulSoup tree costs time and memory proportional to
+# the whole document. select_cards() runs lxml's incremental parser over the
+# page instead, keeps only the subtrees of matching cards, frees everything else
+# as it goes, and stops reading as soon as enough cards are complete. Each card
+# is handed back as a small BeautifulSoup tag, so scraper code keeps using the
+# familiar find()/get_text() API.
+#
+# A selector is (tag name, attrs) with the same meaning as soup.find_all(name,
+# attrs): a 'class' value matches any one of the element's classes, True only
+# requires the attribute to be present, and any other value must match exactly.
+# Like the scrapers' `find_all(a) or find_all(b)` chains, the first selector
+# that matches anything wins.
+
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Table parts are dropped by lxml's HTML parser when they appear outside a table,
+# so those card fragments are re-parsed with html.parser
+_TABLE_PARTS = {'tr', 'td', 'th', 'thead', 'tbody', 'tfoot'}
+
+
+def _matches(selector, tag, attrib):
+    name, attrs = selector
+    if tag != name:
+        return False
+    for key, expected in attrs.items():
+        value = attrib.get(key)
+        if value is None:
+            return False
+        if expected is True:
+            continue
+        if key == 'class':
+            if expected not in value.split():
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def select_cards_full(content, selectors, limit, parser='html.parser'):
+    """Reference implementation: parses the whole page, then applies the selectors in order."""
+    soup = BeautifulSoup(content, parser)
+    for name, attrs in selectors:
+        cards = soup.find_all(name, attrs=attrs)
+        if cards:
+            return cards[:limit]
+    return []
+
+
+class _Card:
+    __slots__ = ('root', 'html', 'done')
+
+    def __init__(self, root):
+        self.root = root  # outermost matching card of the same selector this card is nested in
+        self.html = None
+        self.done = False
+
+
+def _to_soup(cards, selector):
+    """Builds BeautifulSoup tags for cards, parsing each outermost card's HTML only once."""
+    name, attrs = selector
+    tags = []
+    nested = {}
+    for card in cards:
+        if card.root is None:
+            fragment = BeautifulSoup(card.html, 'html.parser' if name in _TABLE_PARTS else 'lxml')
+            tag = fragment.find(name, attrs=attrs)
+            if tag is None:
+                continue
+            tags.append(tag)
+            nested[card] = iter(tag.find_all(name, attrs=attrs))
+        else:
+            tag = next(nested.get(card.root, iter(())), None)
+            if tag is not None:
+                tags.append(tag)
+    return tags
+
+
+def select_cards(content, selectors, limit, chunk_size=16 * 1024):
+    """
+    Returns up to limit cards (BeautifulSoup tags, document order) for the first
+    selector that matches anything in content (HTML bytes or str).
+
+    Falls back to select_cards_full when lxml is not installed.
+    """
+    if limit <= 0:
+        return []
+    if etree is None:
+        return select_cards_full(content, selectors, limit)
+
+    markup = content if isinstance(content, str) else UnicodeDammit(content, is_html=True).unicode_markup
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    found = [[] for _ in selectors]
+    open_cards = {}
+    open_roots = [None] * len(selectors)
+    first_done = 0
+
+    def handle(events):
+        nonlocal first_done
+        for event, element in events:
+            if event == 'start':
+                for s, selector in enumerate(selectors):
+                    if len(found[s]) < limit and _matches(selector, element.tag, element.attrib):
+                        card = _Card(open_roots[s])
+                        if card.root is None:
+                            open_roots[s] = card
+                        found[s].append(card)
+                        open_cards.setdefault(element, []).append((s, card))
+                continue
+
+            for s, card in open_cards.pop(element, ()):
+                card.done = True
+                if card.root is None:
+                    card.html = etree.tostring(element, method='html', encoding='unicode', with_tail=False)
+                    open_roots[s] = None
+                if s == 0:
+                    first_done += 1
+            if not open_cards:
+                # No card is waiting for this subtree: free it and everything before it
+                element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+            if first_done == limit:
+                return True
+        return False
+
+    finished = False
+    for start in range(0, len(markup), chunk_size):
+        parser.feed(markup[start:start + chunk_size])
+        if handle(parser.read_events()):
+            finished = True
+            break
+    if not finished:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        handle(parser.read_events())
+
+    for selector, cards in zip(selectors, found):
+        complete = [card for card in cards if card.done]
+        if complete:
+            return _to_soup(complete, selector)
+    return []
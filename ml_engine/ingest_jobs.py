@@ -0,0 +1,78 @@
+# Offline ingest pipeline for the job corpus.
+# Runs the live scrapers over many keyword sets, stores normalized and
+# de-duplicated listings in the local corpus, and rebuilds the vector index
+# that /match-jobs queries in index mode.
+#
+# Usage:
+#   python ingest_jobs.py "python django" "react javascript" --depth 30
+#   python ingest_jobs.py --keywords-file keyword_sets.txt --index-type ivf --nlist 256
+#   python ingest_jobs.py --rebuild-only
+
+import argparse
+import time
+
+from job_index import JobCorpus, build_index, job_text
+import match_jobs
+
+
+def read_keyword_sets(args):
+    keyword_sets = list(args.keywords)
+    if args.keywords_file:
+        with open(args.keywords_file) as f:
+            keyword_sets.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return keyword_sets
+
+
+def ingest(keyword_sets, corpus, depth):
+    """Scrapes every keyword set and upserts the results into the corpus."""
+    for i, keywords in enumerate(keyword_sets, 1):
+        print(f"🌐 [{i}/{len(keyword_sets)}] Scraping jobs for: {keywords}")
+        jobs = match_jobs.scrape_sources(keywords, depth)
+        added = corpus.upsert(jobs)
+        print(f"✅ {len(jobs)} jobs scraped, {added} new (corpus size: {corpus.count()})")
+
+
+def rebuild_index(corpus, index_dir, index_type, nlist=None):
+    """Embeds the whole corpus (reusing cached embeddings) and writes a fresh index."""
+    job_keys, jobs = corpus.all_jobs()
+    if not jobs:
+        print("❌ Corpus is empty, nothing to index")
+        return
+
+    print(f"🤖 Embedding {len(jobs)} jobs...")
+    start = time.perf_counter()
+    embeddings = match_jobs.get_job_embeddings([job_text(job) for job in jobs])
+    print(f"✅ Embeddings ready in {time.perf_counter() - start:.1f}s")
+
+    print(f"🗂️ Building {index_type} index...")
+    start = time.perf_counter()
+    index = build_index(embeddings, job_keys, kind=index_type, nlist=nlist)
+    version_dir = index.save(index_dir, match_jobs.EMBEDDING_MODEL_VERSION)
+    print(f"✅ Index with {len(index)} jobs written to {version_dir} in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape job listings into the local corpus and rebuild the vector index.')
+    parser.add_argument('keywords', nargs='*', help='Keyword sets to scrape, e.g. "python django"')
+    parser.add_argument('--keywords-file', help='File with one keyword set per line')
+    parser.add_argument('--depth', type=int, default=30, help='Jobs to scrape per source and keyword set')
+    parser.add_argument('--corpus', default=match_jobs.JOB_CORPUS_PATH, help='Path of the corpus SQLite file')
+    parser.add_argument('--index-dir', default=match_jobs.JOB_INDEX_DIR, help='Directory the index is written to')
+    parser.add_argument('--index-type', choices=['flat', 'ivf'], default='flat', help='Exact (flat) or approximate (ivf) index')
+    parser.add_argument('--nlist', type=int, help='Number of IVF lists (default: sqrt of corpus size)')
+    parser.add_argument('--rebuild-only', action='store_true', help='Skip scraping and only rebuild the index')
+    args = parser.parse_args()
+
+    match_jobs.warm_up()
+    corpus = JobCorpus(args.corpus)
+    if not args.rebuild_only:
+        keyword_sets = read_keyword_sets(args)
+        if not keyword_sets:
+            parser.error('provide keyword sets or --keywords-file (or use --rebuild-only)')
+        ingest(keyword_sets, corpus, args.depth)
+
+    rebuild_index(corpus, args.index_dir, args.index_type, nlist=args.nlist)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+# Collapsing of duplicate job listings scraped from several sources.
+#
+# The same posting often appears on BDJobs, Indeed and LinkedIn, and the
+# scrapers' fallback searches add more copies. Two listings are the same job if
+#   - their normalized listing URLs and titles are equal (search result page
+#     URLs, which scrapers use when a card has no link, do not count), or
+#   - their normalized titles and companies are equal (titles ignore words such
+#     as "remote" or "urgent" that sites add around the same posting), or
+#   - they are near-duplicates: nearly identical titles, similar company names
+#     and texts (title, company, description, requirements) whose word 1- and
+#     2-gram sets have a Jaccard similarity of at least `threshold`. The title
+#     and company checks matter because the scrapers fill descriptions from a
+#     per-site template, so text alone would merge different roles or
+#     companies. Candidates are found with MinHash signatures of the
+#     "title company" character 3-grams in LSH buckets, so each listing is only
+#     compared with the few that look alike rather than with every other one.
+# Listings whose company is a scraper placeholder ("Tech Company 3") only match
+# on URL and title, since their company says nothing about the posting.
+#
+# Duplicates collapse into the first listing seen, which records every source
+# it was found on.
+
+import re
+import urllib.parse
+import zlib
+
+import numpy as np
+
+# Query parameters that only track the click, not the posting
+TRACKING_PARAMS = {'refid', 'trackingid', 'trk', 'position', 'pagenum', 'from', 'tk', 'xkcb', 'bb', 'fccid', 'vjs', 'sid'}
+COMPANY_SUFFIXES = {'ltd', 'limited', 'inc', 'llc', 'plc', 'pvt', 'private', 'co', 'corp', 'corporation', 'company', 'bd', 'pte'}
+# Words that sites add to the same title
+TITLE_NOISE = {'remote', 'hybrid', 'onsite', 'urgent', 'hiring', 'immediate', 'full', 'part', 'time', 'contract',
+               'permanent', 'job', 'position', 'vacancy', 'opening', 'bangladesh', 'dhaka'}
+SEARCH_PAGE_URL = re.compile(r'/jobs(/search)?(\?|$)|jobsearch\.asp')
+PLACEHOLDER_COMPANY = re.compile(r'^(tech|technology|hiring|leading|professional) (company|organization|services) \d+$')
+
+_PRIME = (1 << 31) - 1
+
+
+def normalize_title(title):
+    return ' '.join(re.sub(r'[^a-z0-9+#]+', ' ', (title or '').lower().replace('&', ' and ')).split())
+
+
+def title_key(title):
+    """Normalized title without TITLE_NOISE words (the title itself if nothing else is left)."""
+    words = normalize_title(title).split()
+    return ' '.join(word for word in words if word not in TITLE_NOISE) or ' '.join(words)
+
+
+def char_ngrams(text, n=3):
+    text = f' {text} '
+    return {text[i:i + n] for i in range(max(1, len(text) - n + 1))}
+
+
+def word_shingles(text):
+    words = normalize_title(text).split()
+    return set(words) | {f'{first} {second}' for first, second in zip(words, words[1:])}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def normalize_company(company):
+    words = normalize_title(company).split()
+    while words and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def normalize_url(url):
+    """Lower-cased host + path + non-tracking query parameters, without scheme, www. or fragment."""
+    if not url:
+        return ''
+    parts = urllib.parse.urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    query = sorted((key, value) for key, value in urllib.parse.parse_qsl(parts.query)
+                   if key not in TRACKING_PARAMS and not key.startswith('utm_'))
+    return host + parts.path.rstrip('/') + ('?' + urllib.parse.urlencode(query) if query else '')
+
+
+def is_placeholder_company(company):
+    return not company or PLACEHOLDER_COMPANY.match(company) is not None
+
+
+class MinHasher:
+    """MinHash signatures of string sets with num_perm universal hash functions."""
+
+    def __init__(self, num_perm=64, seed=1):
+        self.num_perm = num_perm
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, shingles):
+        shingles = shingles or {''}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) % _PRIME for shingle in shingles), dtype=np.uint64,
+                             count=len(shingles))
+        # (a * x + b) mod p with a, x < 2^31, so the products fit in uint64
+        values = (hashes[:, None] * self._a + self._b) % np.uint64(_PRIME)
+        return values.min(axis=0)
+
+    @staticmethod
+    def similarity(signature, other):
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return float(np.mean(signature == other))
+
+
+class JobDeduplicator:
+    """
+    Incrementally collapses duplicate listings.
+
+    add() takes a batch of scraped jobs and returns the ones that are new
+    (copies carrying 'sources' and 'listings'); duplicates of jobs already seen
+    are merged into them instead. jobs holds every unique job so far.
+    """
+
+    def __init__(self, threshold=0.7, title_threshold=0.8, company_threshold=0.5, num_perm=64, bands=8):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.threshold = threshold
+        self.title_threshold = title_threshold
+        self.company_threshold = company_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.jobs = []
+        self.duplicates = 0
+        self._keys = {}
+        self._titles = []
+        self._companies = []
+        self._texts = []
+        self._buckets = {}
+
+    def _exact_keys(self, job, title, company):
+        keys = []
+        url = normalize_url(job.get('job_url'))
+        if url and title and not SEARCH_PAGE_URL.search(url):
+            keys.append(('url', url, title))
+        if title and not is_placeholder_company(company):
+            keys.append(('title_company', title, company))
+        return keys
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _find_near_duplicate(self, signature, title_ngrams, company_ngrams, text_shingles):
+        seen = set()
+        for key in self._band_keys(signature):
+            for index in self._buckets.get(key, ()):
+                if index not in seen:
+                    seen.add(index)
+                    if (jaccard(title_ngrams, self._titles[index]) >= self.title_threshold
+                            and jaccard(company_ngrams, self._companies[index]) >= self.company_threshold
+                            and jaccard(text_shingles, self._texts[index]) >= self.threshold):
+                        return index
+        return None
+
+    @staticmethod
+    def _sources(job):
+        # A job collapsed earlier already carries its sources and listings
+        return job.get('sources') or ([job['source']] if job.get('source') else [])
+
+    @staticmethod
+    def _listings(job):
+        return job.get('listings') or [{field: job.get(field) for field in ('source', 'id', 'job_url', 'apply_url')}]
+
+    def _merge(self, index, job):
+        existing = self.jobs[index]
+        for listing in self._listings(job):
+            if listing not in existing['listings']:
+                existing['listings'].append(dict(listing))
+        for source in self._sources(job):
+            if source not in existing['sources']:
+                existing['sources'].append(source)
+        self.duplicates += 1
+
+    def add(self, jobs):
+        new_jobs = []
+        for job in jobs:
+            title = title_key(job.get('title'))
+            company = normalize_company(job.get('company'))
+            keys = self._exact_keys(job, title, company)
+
+            index = next((self._keys[key] for key in keys if key in self._keys), None)
+            signature = title_ngrams = company_ngrams = text_shingles = None
+            if index is None and title and not is_placeholder_company(company):
+                title_ngrams, company_ngrams = char_ngrams(title), char_ngrams(company)
+                text_shingles = word_shingles(' '.join(
+                    job.get(field) or '' for field in ('title', 'company', 'description', 'requirements')))
+                signature = self.hasher.signature(char_ngrams(f'{title} {company}'))
+                index = self._find_near_duplicate(signature, title_ngrams, company_ngrams, text_shingles)
+            if index is not None:
+                self._merge(index, job)
+                for key in keys:
+                    self._keys.setdefault(key, index)
+                continue
+
+            index = len(self.jobs)
+            unique = dict(job)
+            unique['sources'] = list(self._sources(job))
+            unique['listings'] = [dict(listing) for listing in self._listings(job)]
+            self.jobs.append(unique)
+            self._titles.append(title_ngrams)
+            self._companies.append(company_ngrams)
+            self._texts.append(text_shingles)
+            for key in keys:
+                self._keys.setdefault(key, index)
+            if signature is not None:
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, []).append(index)
+            new_jobs.append(unique)
+        return new_jobs
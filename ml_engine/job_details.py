@@ -0,0 +1,123 @@
+# Detail pages for matched jobs.
+#
+# The scrapers only read the search result cards, so a job's details come from
+# a per-source template: the templates are built once at import and a job's
+# details are the template for its source plus its id. The source is the
+# job id's prefix ("bdjobs_1_1700000000" -> "bdjobs") unless the caller knows
+# it, e.g. from the job's 'source' field.
+
+JOB_DETAIL_TEMPLATES = {
+    'bdjobs': {
+        'detailed_description': "This position offers an excellent opportunity to work with a leading technology company in Bangladesh. You'll be part of a dynamic team working on cutting-edge projects that impact thousands of users. The role involves developing scalable solutions, collaborating with cross-functional teams, and contributing to the company's digital transformation initiatives.",
+        'company_info': "A prominent technology company in Bangladesh with over 5 years of experience in delivering innovative software solutions. Known for fostering a collaborative work environment and investing in employee growth and development.",
+        'benefits': [
+            "Competitive salary package (40,000 - 80,000 BDT)",
+            "Comprehensive health insurance for employee & family",
+            "Flexible working hours & remote work options",
+            "Annual performance bonuses & salary reviews",
+            "Professional development budget (20,000 BDT/year)",
+            "Festival bonuses (2 bonuses per year)",
+            "Friendly work environment & team building activities"
+        ],
+        'skills_required': [
+            "Strong programming skills in relevant technologies",
+            "Problem-solving and analytical thinking",
+            "Team collaboration and communication skills",
+            "Ability to work in agile development environment",
+            "Continuous learning mindset and adaptability"
+        ],
+        'employment_type': "Full-time",
+        'experience_level': "Mid to Senior level (2-5 years)",
+        'source': 'BDJobs',
+        'posted_date': "Posted within last 7 days",
+        'application_deadline': "Open until filled"
+    },
+    'linkedin': {
+        'detailed_description': "Join a forward-thinking organization that values innovation, creativity, and professional growth. This role offers the opportunity to work on challenging projects while developing your career in a supportive environment. You'll collaborate with talented professionals and contribute to meaningful business outcomes.",
+        'company_info': "A growing company focused on leveraging technology to solve real-world problems. We pride ourselves on maintaining a culture of innovation, respect, and continuous improvement.",
+        'benefits': [
+            "Competitive compensation package",
+            "Comprehensive health and dental insurance",
+            "Flexible work arrangements",
+            "Professional development opportunities",
+            "Employee stock options (if applicable)",
+            "Modern office facilities",
+            "Work-life balance initiatives"
+        ],
+        'skills_required': [
+            "Technical expertise in relevant domains",
+            "Strong communication and interpersonal skills",
+            "Project management capabilities",
+            "Innovation and creative thinking",
+            "Leadership potential and team collaboration"
+        ],
+        'employment_type': "Full-time",
+        'experience_level': "Mid to Senior level",
+        'source': 'LinkedIn',
+        'posted_date': "Recently posted",
+        'application_deadline': "Apply soon for consideration"
+    },
+    'indeed': {
+        'detailed_description': "Excellent opportunity to join a reputable organization that offers career advancement, competitive compensation, and a positive work environment. The successful candidate will contribute to important projects while developing professionally and personally.",
+        'company_info': "An established company with a strong reputation in the industry. We are committed to employee satisfaction, innovation, and delivering quality results for our clients and stakeholders.",
+        'benefits': [
+            "Attractive salary package",
+            "Health insurance coverage",
+            "Paid time off and vacation days",
+            "Training and skill development programs",
+            "Employee recognition programs",
+            "Collaborative work environment",
+            "Career advancement opportunities"
+        ],
+        'skills_required': [
+            "Relevant technical and professional skills",
+            "Strong work ethic and reliability",
+            "Effective communication abilities",
+            "Adaptability to changing requirements",
+            "Commitment to quality and excellence"
+        ],
+        'employment_type': "Full-time",
+        'experience_level': "Entry to Senior level",
+        'source': 'Indeed',
+        'posted_date': "Recently posted",
+        'application_deadline': "Open for applications"
+    }
+}
+
+# Details for unknown sources; 'source' is filled in from the job
+GENERIC_JOB_DETAILS = {
+    'detailed_description': "This is a comprehensive job opportunity that requires technical expertise and professional skills. The role involves working with modern technologies and collaborating with experienced teams to deliver high-quality solutions.",
+    'company_info': "A technology-focused company committed to innovation and employee development. We offer a dynamic work environment with opportunities for professional growth.",
+    'benefits': [
+        "Competitive salary package",
+        "Health insurance coverage",
+        "Flexible working arrangements",
+        "Professional development opportunities",
+        "Performance-based bonuses",
+        "Supportive work environment"
+    ],
+    'skills_required': [
+        "Technical expertise in relevant technologies",
+        "Problem-solving abilities",
+        "Team collaboration skills",
+        "Communication skills",
+        "Learning and adaptation mindset"
+    ],
+    'employment_type': "Full-time",
+    'experience_level': "Mid level",
+    'posted_date': "Recently posted",
+    'application_deadline': "Apply soon"
+}
+
+
+def job_source(job_id, source=None):
+    """Lower-cased source of a job: source if given, else the job id's prefix."""
+    return (source or job_id.split('_')[0]).lower()
+
+
+def build_job_details(job_id, source):
+    """Details for one job from its source's template (source as returned by job_source())."""
+    template = JOB_DETAIL_TEMPLATES.get(source)
+    if template is None:
+        return dict(GENERIC_JOB_DETAILS, id=job_id, source=source.title())
+    return dict(template, id=job_id)
@@ -0,0 +1,351 @@
+# Local job corpus and persistent vector index used by the offline ingest
+# pipeline (ingest_jobs.py) and by the index mode of /match-jobs.
+#
+# Every index build is written to a fresh version directory inside the index
+# directory, and the CURRENT file there names the version to serve. Serving
+# processes memory-map the vectors, so a build never rewrites the files of an
+# existing version (truncating a mapped file kills its readers with SIGBUS);
+# it switches CURRENT over with an atomic rename once the new version is
+# complete, so readers see either the old index or the new one, never a mix.
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from sqlite_db import ThreadLocalConnections
+
+
+def _normalize_text(value):
+    return re.sub(r'\s+', ' ', (value or '').strip())
+
+
+def job_text(job):
+    """The text that is embedded for a job."""
+    return f"{job['title']} {job['description']} {job['requirements']}"
+
+
+def normalize_job(job):
+    """
+    Returns a cleaned copy of a scraped job plus its stable corpus key.
+
+    The key is derived from the source, title, company and listing URL so that the
+    same posting scraped under different keyword sets is stored only once.
+    """
+    normalized = {field: _normalize_text(job.get(field)) for field in
+                  ('title', 'company', 'description', 'requirements', 'location', 'source', 'job_url', 'apply_url')}
+    identity = '|'.join([
+        normalized['source'].lower(),
+        normalized['title'].lower(),
+        normalized['company'].lower(),
+        normalized['job_url'].lower().rstrip('/')
+    ])
+    job_key = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    normalized['id'] = f"{normalized['source'].lower() or 'job'}_{job_key[:16]}"
+    return job_key, normalized
+
+
+class JobCorpus:
+    """SQLite store of normalized, de-duplicated job listings."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connections = ThreadLocalConnections(path)
+        self._connection = self._connections.get
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+            """
+        )
+
+    def upsert(self, jobs):
+        """Adds or refreshes jobs; returns the number of postings not seen before."""
+        now = time.time()
+        connection = self._connection()
+        before = self.count()
+        connection.execute('BEGIN')
+        try:
+            for job in jobs:
+                job_key, normalized = normalize_job(job)
+                connection.execute(
+                    """
+                    INSERT INTO jobs (job_key, source, data, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(job_key) DO UPDATE SET data = excluded.data, last_seen = excluded.last_seen
+                    """,
+                    (job_key, normalized['source'], json.dumps(normalized), now, now)
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return self.count() - before
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def all_jobs(self):
+        """Returns (job_keys, jobs) for the whole corpus in a stable order."""
+        rows = self._connection().execute("SELECT job_key, data FROM jobs ORDER BY job_key").fetchall()
+        return [row[0] for row in rows], [json.loads(row[1]) for row in rows]
+
+    def get_many(self, job_keys):
+        """Returns a dict of job_key -> job for the given keys."""
+        found = {}
+        job_keys = list(job_keys)
+        connection = self._connection()
+        for start in range(0, len(job_keys), 500):
+            chunk = job_keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = connection.execute(f"SELECT job_key, data FROM jobs WHERE job_key IN ({placeholders})", chunk)
+            for job_key, data in rows:
+                found[job_key] = json.loads(data)
+        return found
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores, best first, without sorting the whole array."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class FlatIndex:
+    """Exact inner-product search over a dense, L2-normalized embedding matrix."""
+
+    kind = 'flat'
+
+    def __init__(self, vectors, ids):
+        self.vectors = vectors
+        self.ids = ids
+
+    @classmethod
+    def build(cls, vectors, ids, **options):
+        return cls(normalize_rows(vectors), list(ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query, k=10, **options):
+        """Returns [(id, cosine score)] for the k nearest vectors."""
+        query = normalize_rows(np.atleast_2d(query))[0]
+        scores = self.vectors @ query
+        return [(self.ids[i], float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def _extra_arrays(self):
+        return {}
+
+    def save(self, directory, model_version, keep=2):
+        """
+        Writes the index as a new version in directory and makes it CURRENT;
+        returns the version directory. Only the keep newest versions are kept.
+        """
+        os.makedirs(directory, exist_ok=True)
+        # Version names sort by build time
+        version_dir = tempfile.mkdtemp(prefix=f'{INDEX_VERSION_PREFIX}{time.time_ns():020d}-', dir=directory)
+        np.save(os.path.join(version_dir, 'vectors.npy'), np.ascontiguousarray(self.vectors))
+        for name, array in self._extra_arrays().items():
+            np.save(os.path.join(version_dir, f'{name}.npy'), array)
+        with open(os.path.join(version_dir, 'ids.json'), 'w') as f:
+            json.dump(self.ids, f)
+        with open(os.path.join(version_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'kind': self.kind,
+                'model_version': model_version,
+                'count': len(self.ids),
+                'dim': int(self.vectors.shape[1]) if len(self.ids) else 0,
+                'built_at': time.time()
+            }, f)
+
+        pointer_tmp = os.path.join(directory, f'{CURRENT_POINTER}.{os.getpid()}.tmp')
+        with open(pointer_tmp, 'w') as f:
+            f.write(os.path.basename(version_dir))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(directory, CURRENT_POINTER))
+        prune_index_versions(directory, keep)
+        return version_dir
+
+
+class IVFIndex(FlatIndex):
+    """
+    Inverted-file approximate index.
+
+    Vectors are clustered with spherical k-means into nlist lists and stored
+    contiguously per list; a query only scans the nprobe lists whose centroids are
+    closest to it.
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, vectors, ids, centroids, offsets, nprobe=8):
+        super().__init__(vectors, ids)
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk_size=65536):
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            assignments[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+        return assignments
+
+    @classmethod
+    def build(cls, vectors, ids, nlist=None, iterations=10, seed=0, nprobe=8, **options):
+        vectors = normalize_rows(vectors)
+        count = len(vectors)
+        nlist = min(nlist or max(1, int(np.sqrt(count))), max(count, 1))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(count, nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = cls._assign(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            non_empty = np.bincount(assignments, minlength=nlist) > 0
+            centroids[non_empty] = normalize_rows(sums[non_empty])
+
+        assignments = cls._assign(vectors, centroids)
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=nlist))]).astype(np.int64)
+        return cls(vectors[order], [ids[i] for i in order], centroids, offsets, nprobe=nprobe)
+
+    def search(self, query, k=10, nprobe=None, **options):
+        query = normalize_rows(np.atleast_2d(query))[0]
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes = top_k_indices(self.centroids @ query, nprobe)
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+        if len(rows) == 0:
+            return []
+        scores = self.vectors[rows] @ query
+        return [(self.ids[rows[i]], float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def _extra_arrays(self):
+        return {'centroids': self.centroids, 'offsets': self.offsets}
+
+
+INDEX_TYPES = {'flat': FlatIndex, 'ivf': IVFIndex}
+CURRENT_POINTER = 'CURRENT'
+INDEX_VERSION_PREFIX = 'v'
+
+
+def build_index(vectors, ids, kind='flat', **options):
+    return INDEX_TYPES[kind].build(vectors, ids, **options)
+
+
+def current_index_dir(directory):
+    """The version directory that directory's CURRENT pointer names, or None if no index was saved there."""
+    try:
+        with open(os.path.join(directory, CURRENT_POINTER)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, version) if version else None
+
+
+def prune_index_versions(directory, keep=2):
+    """
+    Removes all but the keep newest index versions (never the CURRENT one).
+    Processes still mapping a removed version keep their mapping: the files are
+    unlinked, not truncated.
+    """
+    current = current_index_dir(directory)
+    versions = sorted(name for name in os.listdir(directory)
+                      if name.startswith(INDEX_VERSION_PREFIX) and os.path.isdir(os.path.join(directory, name)))
+    for name in versions[:-keep] if keep > 0 else versions:
+        path = os.path.join(directory, name)
+        if path != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_index(directory):
+    """
+    Loads the CURRENT index in directory, memory-mapping its vectors; returns
+    (index, meta) where meta['path'] is the version directory that was loaded.
+    """
+    path = current_index_dir(directory)
+    if path is None:
+        raise FileNotFoundError(f'no index has been saved in {directory}')
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    meta['path'] = path
+    with open(os.path.join(path, 'ids.json')) as f:
+        ids = json.load(f)
+    vectors = np.load(os.path.join(path, 'vectors.npy'), mmap_mode='r')
+    if meta['kind'] == 'ivf':
+        centroids = np.load(os.path.join(path, 'centroids.npy'))
+        offsets = np.load(os.path.join(path, 'offsets.npy'))
+        return IVFIndex(vectors, ids, centroids, offsets), meta
+    return FlatIndex(vectors, ids), meta
+
+
+class JobTable:
+    """
+    Columnar view over a pool of candidate jobs.
+
+    Source, location and score live in parallel NumPy arrays next to the
+    L2-normalized embedding matrix, so filters are boolean masks and ranking is a
+    partial selection instead of sorting a list of dicts.
+    """
+
+    __slots__ = ('jobs', 'sources', 'locations', 'embeddings', 'scores')
+
+    def __init__(self, jobs, embeddings):
+        self.jobs = jobs
+        # '|bdjobs|indeed|': every source a (possibly collapsed, see job_dedup.py) job was found on
+        self.sources = np.array(['|' + '|'.join(source.lower() for source in (job.get('sources') or [job.get('source') or '']))
+                                 + '|' for job in jobs], dtype=str)
+        self.locations = np.array([(job.get('location') or '').lower() for job in jobs], dtype=str)
+        self.embeddings = normalize_rows(embeddings) if len(jobs) else np.zeros((0, 0), dtype=np.float32)
+        self.scores = np.zeros(len(jobs), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def score(self, query_embedding):
+        """Sets each job's cosine similarity to the query embedding."""
+        if len(self.jobs):
+            self.scores = self.embeddings @ normalize_rows(np.atleast_2d(query_embedding))[0]
+        return self.scores
+
+    def mask(self, sources=None, location=None, min_score=None):
+        """Boolean mask of jobs from any of sources, whose location contains location, scoring >= min_score (%)."""
+        selected = np.ones(len(self.jobs), dtype=bool)
+        if sources:
+            selected &= np.logical_or.reduce([np.char.find(self.sources, f'|{source.lower()}|') >= 0 for source in sources])
+        if location:
+            selected &= np.char.find(self.locations, location.lower()) >= 0
+        if min_score is not None:
+            selected &= self.scores * 100 >= min_score
+        return selected
+
+    def top_k(self, k=None, mask=None):
+        """Returns copies of the k best-scoring jobs (all if k is None) with similarity scores, best first."""
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(self.jobs))
+        k = len(candidates) if k is None else k
+        order = candidates[top_k_indices(self.scores[candidates], k)]
+        ranked = []
+        for i in order:
+            job = dict(self.jobs[i])
+            job['similarity_score'] = round(float(self.scores[i]) * 100, 1)
+            ranked.append(job)
+        return ranked
@@ -2,87 +2,778 @@
 # It will use sentence-transformers to generate embeddings for resumes and job descriptions.
 # Now includes web scraping for live job postings from BDJobs, Indeed, and LinkedIn.
 
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
-import PyPDF2
-import io
 import requests
-from flask import Flask, request, jsonify
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+import contextvars
 import json
+import logging
 import time
-from bs4 import BeautifulSoup
 import urllib.parse
 import re
+import os
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from circuit_breaker import CircuitBreakers, CircuitOpenError
+from embedding_backends import default_export_dir, load_backend
+from embedding_service import EmbeddingBatcher, ModelLoader
+from embedding_store import EmbeddingStore
+from html_cards import select_cards, select_cards_full
+from job_dedup import JobDeduplicator
+from job_details import build_job_details, job_source
+from job_index import JobCorpus, JobTable, current_index_dir, job_text, load_index, normalize_job, normalize_rows
+from pdf_extract import PDFExtractionError, PDFTooLargeError, PdfWorkerPool, extract_pdf, spool_upload
+from refresh_scheduler import RefreshScheduler
+from result_sessions import RankedResults, ResultSessionStore, decode_cursor, encode_cursor
+from skill_taxonomy import DEFAULT_TAXONOMY_PATH, SkillTaxonomy
+from telemetry import MetricsRegistry, setup_queue_logging, span
 
 app = Flask(__name__)
 CORS(app, origins=['http://localhost:3000'])  # Allow requests from React frontend
 
-# Load a pre-trained model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Log records go through a bounded queue to a background writer thread, so request threads
+# never wait on stdout (records are dropped, and counted, if the queue is full).
+# LOG_LEVEL=DEBUG also logs the duration of every timing span. The writer is started by warm_up().
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+logger = logging.getLogger('ml_engine')
+queue_logging = None
+
+# Runtime data (embedding cache, job corpus, index and ONNX exports) lives under ml_engine/data by default
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Pre-trained model, loaded on first use or in the background at startup
+# EMBEDDING_BACKEND is 'torch' (reference), 'onnx' or 'onnx-int8' (see embedding_backends.py)
+EMBEDDING_MODEL_NAME = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'torch')
+EMBEDDING_ONNX_DIR = os.environ.get('EMBEDDING_ONNX_DIR', default_export_dir(EMBEDDING_MODEL_NAME, DATA_DIR))
+EMBEDDING_ONNX_THREADS = int(os.environ.get('EMBEDDING_ONNX_THREADS', '0'))
+
+def load_embedding_backend():
+    # Backends import torch / onnxruntime themselves, so importing this module stays cheap
+    return load_backend(EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR, num_threads=EMBEDDING_ONNX_THREADS)
+
+model_loader = ModelLoader(
+    load_embedding_backend,
+    warmup_fn=lambda backend: backend.encode(['Warm-up: python developer with machine learning experience'])
+)
+
+# Micro-batching of concurrent encode calls (EMBED_BATCH_MAX_WAIT_MS caps the added latency)
+EMBED_BATCHING = os.environ.get('EMBED_BATCHING', 'true').lower() in ('1', 'true', 'yes')
+EMBED_BATCH_MAX_SIZE = int(os.environ.get('EMBED_BATCH_MAX_SIZE', '64'))
+EMBED_BATCH_MAX_WAIT_MS = float(os.environ.get('EMBED_BATCH_MAX_WAIT_MS', '5'))
+EMBED_QUEUE_SIZE = int(os.environ.get('EMBED_QUEUE_SIZE', '256'))
+embedding_batcher = EmbeddingBatcher(
+    lambda texts: model_loader.get().encode(texts, batch_size=EMBED_BATCH_MAX_SIZE),
+    max_batch_size=EMBED_BATCH_MAX_SIZE,
+    max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+    max_queue_size=EMBED_QUEUE_SIZE
+) if EMBED_BATCHING else None
+
+# Persistent job embedding cache (bump EMBEDDING_MODEL_VERSION to invalidate it)
+# Non-reference backends produce slightly different vectors, so they get their own version tag
+EMBEDDING_CACHE_ENABLED = os.environ.get('EMBEDDING_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+EMBEDDING_CACHE_PATH = os.environ.get('EMBEDDING_CACHE_PATH', os.path.join(DATA_DIR, 'embeddings.sqlite3'))
+EMBEDDING_MODEL_VERSION = os.environ.get(
+    'EMBEDDING_MODEL_VERSION',
+    EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == 'torch' else f'{EMBEDDING_MODEL_NAME}:{EMBEDDING_BACKEND}'
+)
+job_embedding_store = None
+
+# Offline job corpus and vector index built by ingest_jobs.py
+# MATCH_MODE is 'live' (scrape per request) or 'index' (query the prebuilt index)
+JOB_CORPUS_PATH = os.environ.get('JOB_CORPUS_PATH', os.path.join(DATA_DIR, 'job_corpus.sqlite3'))
+JOB_INDEX_DIR = os.environ.get('JOB_INDEX_DIR', os.path.join(DATA_DIR, 'job_index'))
+JOB_INDEX_NPROBE = int(os.environ.get('JOB_INDEX_NPROBE', '8'))
+MATCH_MODE = os.environ.get('MATCH_MODE', 'live')
+job_corpus = None
+
+_warm_up_lock = threading.Lock()
+_warmed_up = False
+
+@app.before_request
+def warm_up():
+    """
+    Starts the log writer and opens the embedding cache, job corpus and result
+    session store, once per process. Importing this module does neither, so tools and benchmarks that
+    only use its helpers create no files or threads; create_app() and the first
+    request call it.
+    """
+    global queue_logging, job_embedding_store, job_corpus, result_sessions, _warmed_up
+    if _warmed_up:
+        return
+    with _warm_up_lock:
+        if _warmed_up:
+            return
+        queue_logging = setup_queue_logging(LOG_LEVEL, max_queue_size=LOG_QUEUE_SIZE)
+        if EMBEDDING_CACHE_ENABLED:
+            job_embedding_store = EmbeddingStore(EMBEDDING_CACHE_PATH, EMBEDDING_MODEL_VERSION)
+        job_corpus = JobCorpus(JOB_CORPUS_PATH)
+        result_sessions = ResultSessionStore(RESULT_SESSION_PATH, max_entries=RESULT_SESSION_MAX_ENTRIES,
+                                             max_bytes=RESULT_SESSION_MAX_BYTES, ttl=RESULT_SESSION_TTL)
+        _warmed_up = True
+
+def create_app():
+    """Returns the Flask app with its logging and stores set up (see warm_up())."""
+    warm_up()
+    return app
+
+# Skill taxonomy used for CV keyword extraction, compiled once at startup
+SKILL_TAXONOMY_PATH = os.environ.get('SKILL_TAXONOMY_PATH', DEFAULT_TAXONOMY_PATH)
+skill_taxonomy = SkillTaxonomy.load(SKILL_TAXONOMY_PATH)
+
+# Scraping configuration (override with environment variables)
+SCRAPE_CONCURRENT = os.environ.get('SCRAPE_CONCURRENT', 'true').lower() in ('1', 'true', 'yes')
+SCRAPE_MAX_WORKERS = int(os.environ.get('SCRAPE_MAX_WORKERS', '8'))
+SCRAPE_HOST_MIN_INTERVAL = float(os.environ.get('SCRAPE_HOST_MIN_INTERVAL', '1.0'))
+# Stream result pages through lxml and stop once enough job cards are parsed
+# (false builds a full html.parser tree of every page)
+SCRAPE_STREAMING_PARSE = os.environ.get('SCRAPE_STREAMING_PARSE', 'true').lower() in ('1', 'true', 'yes')
+
+# Collapse the same posting found on several sites (or by a fallback search) into one job
+# before encoding; JOB_DEDUP_THRESHOLD is the text similarity for near-duplicates
+JOB_DEDUP = os.environ.get('JOB_DEDUP', 'true').lower() in ('1', 'true', 'yes')
+JOB_DEDUP_THRESHOLD = float(os.environ.get('JOB_DEDUP_THRESHOLD', '0.7'))
+
+# Per-source circuit breakers (see circuit_breaker.py): a source is skipped for
+# SCRAPE_BREAKER_RESET_SECONDS after SCRAPE_BREAKER_FAILURES consecutive failed
+# requests, and each request waits SCRAPE_TIMEOUT_P95_FACTOR x the source's p95
+# latency, between SCRAPE_TIMEOUT_MIN and SCRAPE_TIMEOUT_MAX seconds
+SCRAPE_BREAKER_FAILURES = int(os.environ.get('SCRAPE_BREAKER_FAILURES', '3'))
+SCRAPE_BREAKER_RESET_SECONDS = float(os.environ.get('SCRAPE_BREAKER_RESET_SECONDS', '60'))
+SCRAPE_TIMEOUT_MIN = float(os.environ.get('SCRAPE_TIMEOUT_MIN', '2'))
+SCRAPE_TIMEOUT_MAX = float(os.environ.get('SCRAPE_TIMEOUT_MAX', '10'))
+SCRAPE_TIMEOUT_P95_FACTOR = float(os.environ.get('SCRAPE_TIMEOUT_P95_FACTOR', '2.0'))
+# Responses that mean the source is blocking us or down, not that the search found nothing
+SCRAPE_FAILURE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+# HTTP client configuration
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', str(SCRAPE_MAX_WORKERS)))
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '2'))
+HTTP_BACKOFF_BASE = float(os.environ.get('HTTP_BACKOFF_BASE', '0.5'))
+HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', '8.0'))
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Scrape result cache configuration
+SCRAPE_CACHE_TTL = float(os.environ.get('SCRAPE_CACHE_TTL', '900'))
+SCRAPE_CACHE_MAX_BYTES = int(os.environ.get('SCRAPE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Expired entries are kept this many seconds longer and served while the
+# refresh scheduler re-scrapes them (only when REFRESH_ENABLED)
+SCRAPE_CACHE_STALE_TTL = float(os.environ.get('SCRAPE_CACHE_STALE_TTL', '3600'))
+MORE_JOBS_SCRAPE_DEPTH = int(os.environ.get('MORE_JOBS_SCRAPE_DEPTH', '30'))
+# Larger per_page values sent to /more-jobs are capped to this
+MORE_JOBS_MAX_PER_PAGE = 100
+
+# Background refresh of popular keyword sets (see refresh_scheduler.py): every
+# REFRESH_INTERVAL seconds the REFRESH_TOP_N most requested sets with at least
+# REFRESH_MIN_REQUESTS recent requests are re-scraped and re-embedded, at most
+# REFRESH_MAX_CONCURRENT at a time
+REFRESH_ENABLED = os.environ.get('REFRESH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+REFRESH_INTERVAL = float(os.environ.get('REFRESH_INTERVAL', '600'))
+REFRESH_TOP_N = int(os.environ.get('REFRESH_TOP_N', '20'))
+REFRESH_MIN_REQUESTS = float(os.environ.get('REFRESH_MIN_REQUESTS', '2'))
+REFRESH_MAX_CONCURRENT = int(os.environ.get('REFRESH_MAX_CONCURRENT', '1'))
+
+# Default latency budget for /match-jobs (callers may send their own as budget_ms):
+# sources that have not answered when it runs out are abandoned and the jobs
+# that did arrive are ranked. 0 disables the budget.
+MATCH_LATENCY_BUDGET_MS = float(os.environ.get('MATCH_LATENCY_BUDGET_MS', '20000'))
+
+# Ranked result sessions behind /more-jobs cursors (see result_sessions.py), shared by
+# every worker process: at most RESULT_SESSION_MAX_ENTRIES sessions /
+# RESULT_SESSION_MAX_BYTES in total, each dropped after RESULT_SESSION_TTL seconds
+# without a request. A request scraping deeper for a session holds it for at most
+# RESULT_SESSION_SCRAPE_LEASE seconds (longer only matters if its worker dies)
+RESULT_SESSION_PATH = os.environ.get('RESULT_SESSION_PATH', os.path.join(DATA_DIR, 'result_sessions.sqlite3'))
+RESULT_SESSION_MAX_ENTRIES = int(os.environ.get('RESULT_SESSION_MAX_ENTRIES', '1000'))
+RESULT_SESSION_MAX_BYTES = int(os.environ.get('RESULT_SESSION_MAX_BYTES', str(64 * 1024 * 1024)))
+RESULT_SESSION_TTL = float(os.environ.get('RESULT_SESSION_TTL', '1800'))
+RESULT_SESSION_SCRAPE_LEASE = float(os.environ.get('RESULT_SESSION_SCRAPE_LEASE', '120'))
+result_sessions = None
+
+# Most job ids a /job-details/batch request may ask for
+JOB_DETAILS_BATCH_MAX = int(os.environ.get('JOB_DETAILS_BATCH_MAX', '50'))
+
+# Resume artifact cache configuration
+RESUME_CACHE_MAX_ENTRIES = int(os.environ.get('RESUME_CACHE_MAX_ENTRIES', '256'))
+RESUME_CACHE_MAX_BYTES = int(os.environ.get('RESUME_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# PDF upload limits: uploads above PDF_SPOOL_MEMORY_BYTES are spooled to disk, and extraction
+# stops after PDF_MAX_PAGES pages or PDF_MAX_CHARS characters (plenty for keywords and matching)
+PDF_MAX_UPLOAD_BYTES = int(os.environ.get('PDF_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+PDF_SPOOL_MEMORY_BYTES = int(os.environ.get('PDF_SPOOL_MEMORY_BYTES', str(1024 * 1024)))
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', '10'))
+PDF_MAX_CHARS = int(os.environ.get('PDF_MAX_CHARS', '30000'))
+PDF_SLOW_PAGE_MS = float(os.environ.get('PDF_SLOW_PAGE_MS', '500'))
+
+# PDFs are parsed in separate processes with a hard per-document timeout and memory limit
+# (set PDF_PROCESS_POOL=false to parse in the request thread instead)
+PDF_PROCESS_POOL = os.environ.get('PDF_PROCESS_POOL', 'true').lower() in ('1', 'true', 'yes')
+PDF_POOL_WORKERS = int(os.environ.get('PDF_POOL_WORKERS', str(min(4, os.cpu_count() or 2))))
+PDF_TIMEOUT_SECONDS = float(os.environ.get('PDF_TIMEOUT_SECONDS', '15'))
+PDF_WORKER_MEMORY_MB = int(os.environ.get('PDF_WORKER_MEMORY_MB', '512'))
+PDF_WORKER_MAX_DOCUMENTS = int(os.environ.get('PDF_WORKER_MAX_DOCUMENTS', '50'))
+
+# Batch matching configuration
+PDF_MAX_WORKERS = int(os.environ.get('PDF_MAX_WORKERS', str(os.cpu_count() or 4)))
+BATCH_MAX_RESUMES = int(os.environ.get('BATCH_MAX_RESUMES', '50'))
+BATCH_SCRAPE_PARALLELISM = int(os.environ.get('BATCH_SCRAPE_PARALLELISM', '4'))
+
+# Request bodies are rejected with 413 from their Content-Length, before Werkzeug
+# buffers or spools them: one CV upload (or BATCH_MAX_RESUMES for /match-jobs/batch)
+# plus this much for the other form fields and the multipart framing
+UPLOAD_FORM_OVERHEAD_BYTES = int(os.environ.get('UPLOAD_FORM_OVERHEAD_BYTES', str(64 * 1024)))
+# Hard cap on any body, also for chunked uploads that send no Content-Length
+app.config['MAX_CONTENT_LENGTH'] = BATCH_MAX_RESUMES * PDF_MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by a minimum interval.
+
+    Each caller reserves the next free slot for its host under a lock and then
+    sleeps outside of it, so requests to different hosts never wait on each other.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url, max_delay=None):
+        """
+        Waits for the host's next slot. Returns False at once, without taking
+        the slot, if that would mean waiting max_delay seconds or longer.
+        """
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            if max_delay is not None and slot - now >= max_delay:
+                return False
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client used by all scrapers.
+
+    One requests.Session holds a urllib3 pool per host, so repeated requests to the
+    same site reuse open TCP/TLS connections instead of paying a new handshake.
+    Connection errors (refused or reset) and retryable status codes are retried a
+    bounded number of times with full-jitter exponential backoff. Timeouts are not
+    retried: a site that did not answer in time would most likely make every
+    retry wait out the timeout again.
+    """
+
+    def __init__(self, headers=None, pool_connections=10, pool_maxsize=8, max_retries=2,
+                 backoff_base=0.5, backoff_max=8.0, rate_limiter=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        self._lock = threading.Lock()
+        self._host_counters = {}
+
+    def _count(self, host, counter):
+        with self._lock:
+            counters = self._host_counters.setdefault(host, {'retries': 0, 'errors': 0})
+            counters[counter] += 1
+
+    def _backoff_delay(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _budget_left(deadline, delay=0.0):
+        # Whether the deadline leaves time for an attempt after waiting delay seconds
+        return deadline is None or delay < deadline.remaining()
+
+    def get(self, url, on_attempt=None, deadline=None, timeout=None, **kwargs):
+        """
+        GET a URL through the shared session, retrying transient failures.
+
+        on_attempt(seconds, response), if given, is called after every attempt
+        with its network round-trip time (without the rate limiter's wait or the
+        backoff) and its response, or None if the attempt raised. Only connection
+        errors and retryable statuses are retried.
+
+        With a deadline, each attempt's timeout is capped to the time left, and
+        no rate-limit wait or retry backoff is started that the deadline would
+        not leave time after: the call raises DeadlineExceeded instead (or, for
+        a retryable status, returns that response).
+        """
+        host = urllib.parse.urlsplit(url).hostname or ''
+        for attempt in range(self.max_retries + 1):
+            if not self._budget_left(deadline):
+                raise DeadlineExceeded(f'{host}: latency budget used up')
+            if self.rate_limiter and not self.rate_limiter.wait(
+                    url, max_delay=deadline.remaining() if deadline is not None else None):
+                raise DeadlineExceeded(f'{host}: latency budget used up waiting for the rate limiter')
+            attempt_timeout = timeout
+            if deadline is not None:
+                attempt_timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+                if attempt_timeout <= 0:
+                    raise DeadlineExceeded(f'{host}: latency budget used up')
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=attempt_timeout, **kwargs)
+            except requests.Timeout:
+                # Includes ConnectTimeout, which is also a ConnectionError
+                self._count(host, 'errors')
+                if on_attempt:
+                    on_attempt(time.perf_counter() - start, None)
+                raise
+            except requests.ConnectionError:
+                self._count(host, 'errors')
+                if on_attempt:
+                    on_attempt(time.perf_counter() - start, None)
+                delay = self._backoff_delay(attempt)
+                if attempt == self.max_retries or not self._budget_left(deadline, delay):
+                    raise
+                self._count(host, 'retries')
+                time.sleep(delay)
+                continue
+            except requests.RequestException:
+                # Too many redirects, a broken chunked or compressed body, ...: not transient
+                self._count(host, 'errors')
+                if on_attempt:
+                    on_attempt(time.perf_counter() - start, None)
+                raise
+
+            if on_attempt:
+                on_attempt(time.perf_counter() - start, response)
+            if response.status_code in HTTP_RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._backoff_delay(attempt)
+                if self._budget_left(deadline, delay):
+                    self._count(host, 'retries')
+                    response.close()
+                    time.sleep(delay)
+                    continue
+            return response
+
+    def stats(self):
+        """Per-host request counters, including connection reuse versus new connections."""
+        stats = {}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats[pool.host] = {
+                'requests': pool.num_requests,
+                'new_connections': pool.num_connections,
+                'reused_connections': max(0, pool.num_requests - pool.num_connections)
+            }
+        with self._lock:
+            for host, counters in self._host_counters.items():
+                stats.setdefault(host, {}).update(counters)
+        return stats
+
+host_rate_limiter = HostRateLimiter(SCRAPE_HOST_MIN_INTERVAL)
+http_client = HttpClient(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    max_retries=HTTP_MAX_RETRIES,
+    backoff_base=HTTP_BACKOFF_BASE,
+    backoff_max=HTTP_BACKOFF_MAX,
+    rate_limiter=host_rate_limiter
+)
+source_breakers = CircuitBreakers(
+    failure_threshold=SCRAPE_BREAKER_FAILURES,
+    reset_timeout=SCRAPE_BREAKER_RESET_SECONDS,
+    min_timeout=SCRAPE_TIMEOUT_MIN,
+    max_timeout=SCRAPE_TIMEOUT_MAX,
+    timeout_factor=SCRAPE_TIMEOUT_P95_FACTOR
+)
+
+class Deadline:
+    """A request's latency budget; scrapes running on its behalf stop once it has passed."""
+
+    def __init__(self, seconds, start=None):
+        self.seconds = seconds
+        self.expires_at = (time.perf_counter() if start is None else start) + seconds
+        # Sources whose scrape was cut short by the deadline
+        self.cut_short = set()
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.perf_counter())
+
+    def expired(self):
+        return time.perf_counter() >= self.expires_at
+
+class DeadlineExceeded(Exception):
+    """A scrape request was not made (or was abandoned) because the latency budget ran out."""
+
+# Deadline of the request a scrape runs for (set in the scraper threads by with_deadline)
+scrape_deadline = contextvars.ContextVar('scrape_deadline', default=None)
+
+def with_deadline(deadline, fn, *args):
+    token = scrape_deadline.set(deadline)
+    try:
+        return fn(*args)
+    finally:
+        scrape_deadline.reset(token)
+
+def source_get(source, url):
+    """
+    GETs a URL for a scraper through its source's circuit breaker, with the
+    source's adaptive timeout (capped to what is left of the request's latency
+    budget). Every attempt (including retries) counts as a success, with its
+    round-trip time as latency sample, or a failure for the breaker. Raises
+    CircuitOpenError while the source is tripped and DeadlineExceeded once the
+    budget has run out.
+    """
+    deadline = scrape_deadline.get()
+    breaker = source_breakers.get(source)
+    if deadline is not None and deadline.expired():
+        deadline.cut_short.add(source)
+        raise DeadlineExceeded(f'{source}: latency budget used up')
+    if not breaker.allow():
+        raise CircuitOpenError(f'{source} is unavailable (circuit open)')
+
+    def record_attempt(seconds, response):
+        if response is None:
+            # An attempt cut off by our budget says nothing about the source
+            if deadline is None or not deadline.expired():
+                breaker.record_failure()
+        elif response.status_code in SCRAPE_FAILURE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success(seconds)
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from PDF file."""
     try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text.strip()
+        return http_client.get(url, on_attempt=record_attempt, deadline=deadline, timeout=breaker.timeout())
+    except DeadlineExceeded:
+        breaker.release()
+        deadline.cut_short.add(source)
+        raise
     except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return ""
+        if deadline is not None and deadline.expired():
+            # Our budget ran out, not necessarily the source's patience
+            breaker.release()
+            deadline.cut_short.add(source)
+            raise DeadlineExceeded(f'{source}: latency budget used up') from e
+        # Errors the client raised without reporting the attempt must not keep a half-open
+        # probe in flight (reported failures have already freed it)
+        breaker.release()
+        raise
+
+scrape_executor = ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS, thread_name_prefix='scraper')
+pdf_executor = ThreadPoolExecutor(max_workers=PDF_MAX_WORKERS, thread_name_prefix='pdf')
+pdf_pool = PdfWorkerPool(
+    workers=PDF_POOL_WORKERS,
+    timeout=PDF_TIMEOUT_SECONDS,
+    memory_limit_mb=PDF_WORKER_MEMORY_MB,
+    max_documents=PDF_WORKER_MAX_DOCUMENTS,
+    max_pages=PDF_MAX_PAGES,
+    max_chars=PDF_MAX_CHARS
+) if PDF_PROCESS_POOL else None
+
+class ScrapeResultCache:
+    """
+    In-process TTL + LRU cache for scraped listings.
+
+    Entries are keyed by (source, normalized keywords) and remember the depth
+    (num_jobs) they were scraped with, so a request for depth N is served by any
+    fresh entry scraped with depth >= N. Total size is bounded by max_bytes, using
+    the JSON size of the listings as an estimate; least recently used entries are
+    evicted first. Entries older than ttl are stale and are dropped after
+    stale_ttl more seconds; lookup() can still return them until then.
+    """
+
+    def __init__(self, ttl=900, max_bytes=32 * 1024 * 1024, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def normalize_keywords(keywords):
+        return ' '.join(sorted(set((keywords or '').lower().split())))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+
+    def lookup(self, source, keywords, depth, allow_stale=False):
+        """Returns (jobs, stale) for an entry at least depth deep, or (None, False); stale entries only with allow_stale."""
+        key = (source, self.normalize_keywords(keywords))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] <= now:
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            stale = entry is not None and entry['fresh_until'] <= now
+            if entry is None or entry['depth'] < depth or (stale and not allow_stale):
+                self._misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._stale_hits += stale
+            return [dict(job) for job in entry['jobs'][:depth]], stale
+
+    def fresh_for(self, source, keywords, depth):
+        """Seconds until the entry for (source, keywords) goes stale; 0 if there is none at least depth deep."""
+        with self._lock:
+            entry = self._entries.get((source, self.normalize_keywords(keywords)))
+            if entry is None or entry['depth'] < depth:
+                return 0.0
+            return max(0.0, entry['fresh_until'] - time.monotonic())
+
+    def put(self, source, keywords, depth, jobs):
+        key = (source, self.normalize_keywords(keywords))
+        size = len(json.dumps(jobs))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                if existing['depth'] > depth and existing['fresh_until'] > time.monotonic():
+                    return
+                self._remove(key)
+            fresh_until = time.monotonic() + self.ttl
+            self._entries[key] = {
+                'depth': depth,
+                'jobs': [dict(job) for job in jobs],
+                'size': size,
+                'fresh_until': fresh_until,
+                'expires_at': fresh_until + self.stale_ttl
+            }
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'stale_ttl_seconds': self.stale_ttl,
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+scrape_cache = ScrapeResultCache(ttl=SCRAPE_CACHE_TTL, max_bytes=SCRAPE_CACHE_MAX_BYTES,
+                                 stale_ttl=SCRAPE_CACHE_STALE_TTL if REFRESH_ENABLED else 0)
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and, optionally, by total size.
+
+    sizeof(value) estimates the memory held by an entry; when max_bytes is set,
+    least recently used entries are evicted until the total fits again.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions
+            }
+
+resume_cache = LRUCache(
+    max_entries=RESUME_CACHE_MAX_ENTRIES,
+    max_bytes=RESUME_CACHE_MAX_BYTES,
+    sizeof=lambda artifacts: len(artifacts['text']) + len(artifacts['keywords']) + artifacts['embedding'].nbytes
+)
+
+# Prometheus metrics, served on /metrics
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    'ml_engine_stage_duration_seconds', 'Time spent in each matching pipeline stage', ['stage'])
+scrape_seconds = metrics.histogram(
+    'ml_engine_scrape_duration_seconds', 'Time spent in each scrape attempt (primary or fallback search)', ['source', 'attempt'])
+scrape_attempts = metrics.counter(
+    'ml_engine_scrape_attempts_total', 'Scrape attempts by outcome (success, empty, failure or deadline)', ['source', 'attempt', 'outcome'])
+scrape_jobs_found = metrics.counter(
+    'ml_engine_scrape_jobs_found_total', 'Jobs found by scrape attempts', ['source', 'attempt'])
+scrape_cache_lookups = metrics.counter(
+    'ml_engine_scrape_cache_lookups_total', 'Scrape cache lookups by result (hit, stale or miss)', ['source', 'result'])
+scrape_skips = metrics.counter(
+    'ml_engine_scrape_skips_total', 'Scrapes skipped because the source\'s circuit breaker was open', ['source'])
+duplicate_jobs = metrics.counter(
+    'ml_engine_duplicate_jobs_total', 'Scraped listings collapsed into another listing of the same job')
+encoded_texts = metrics.counter(
+    'ml_engine_encoded_texts_total', 'Texts encoded by the embedding model')
+request_seconds = metrics.histogram(
+    'ml_engine_http_request_duration_seconds', 'HTTP request latency until the response starts',
+    ['endpoint', 'method', 'status'])
+
+class ScrapeAttempt:
+    """
+    Times one scrape attempt and counts its outcome and the jobs it added to jobs.
+
+    The attempt is a failure if it raised or set failed = True (scrapers catch
+    their own errors), otherwise a success or empty depending on the jobs found.
+    A failure because the request's latency budget ran out counts as 'deadline'.
+    """
+
+    def __init__(self, source, attempt, jobs):
+        self.source = source
+        self.attempt = attempt
+        self.jobs = jobs
+        self.failed = False
+        self._jobs_before = len(jobs)
+        self._span = span(scrape_seconds, source=source, attempt=attempt)
+
+    def __enter__(self):
+        self._span.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._span.__exit__(exc_type, exc, tb)
+        found = len(self.jobs) - self._jobs_before
+        if self.failed or exc_type:
+            deadline = scrape_deadline.get()
+            outcome = 'deadline' if deadline is not None and self.source in deadline.cut_short else 'failure'
+        else:
+            outcome = 'success' if found else 'empty'
+        scrape_attempts.inc(source=self.source, attempt=self.attempt, outcome=outcome)
+        scrape_jobs_found.inc(found, source=self.source, attempt=self.attempt)
+        return False
+
+def extract_text_from_pdf(pdf_file):
+    """Extract text from PDF file (within the page and character budgets)."""
+    return extract_resume_pdf(pdf_file).text
+
+@span(stage_seconds, stage='pdf_extraction')
+def extract_resume_pdf(pdf_file):
+    """
+    Extracts a CV page by page within the configured budgets and reports slow documents.
+
+    Raises PDFExtractionError (PDFTimeoutError on timeout) if the parser process gives up on it.
+    """
+    if pdf_pool is not None:
+        extraction = pdf_pool.extract(pdf_file)
+    else:
+        extraction = extract_pdf(pdf_file, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS)
+    summary = extraction.summary()
+    logger.info(f"📄 Extracted {summary['characters']} characters from {summary['pages_read']}/{summary['total_pages']} pages "
+                f"in {summary['extract_ms']}ms" + (" (budget reached)" if extraction.truncated else ""))
+    slow_pages = [(number, ms) for number, ms in enumerate(summary['page_ms'], 1) if ms >= PDF_SLOW_PAGE_MS]
+    if slow_pages:
+        logger.warning(f"🐢 Slow PDF pages: {', '.join(f'page {number} {ms}ms' for number, ms in slow_pages)}")
+    return extraction
+
+def spool_resume(resume_file):
+    """Spools an uploaded CV (to disk if it is large); returns (SHA-256 fingerprint, file)."""
+    return spool_upload(resume_file.stream, PDF_MAX_UPLOAD_BYTES, memory_bytes=PDF_SPOOL_MEMORY_BYTES)
+
+@span(stage_seconds, stage='encode')
+def encode_texts(texts):
+    """Encodes a list of texts into a NumPy matrix, through the micro-batcher when enabled."""
+    texts = list(texts)
+    encoded_texts.inc(len(texts))
+    if embedding_batcher is not None:
+        return embedding_batcher.encode(texts)
+    return model_loader.get().encode(texts)
 
 def get_embedding(text):
-    """Generates an embedding for a given text."""
-    return model.encode(text, convert_to_tensor=True)
+    """Generates an embedding for a given text (or a matrix for a list of texts)."""
+    if isinstance(text, str):
+        return encode_texts([text])[0]
+    return encode_texts(text)
+
+def get_job_embeddings(job_texts):
+    """Embeddings for job texts as a NumPy matrix, encoding only those not already in the embedding store."""
+    if job_embedding_store is None:
+        return encode_texts(job_texts)
+    return job_embedding_store.encode(job_texts, encode_texts)
+
+def embedding_to_numpy(embedding):
+    """Converts a model embedding (tensor or array) to a NumPy array."""
+    if hasattr(embedding, 'cpu'):
+        return embedding.cpu().numpy()
+    return np.asarray(embedding)
 
+@span(stage_seconds, stage='keyword_extraction')
 def extract_keywords_from_resume(resume_text):
     """Extract relevant keywords from resume for job searching using intelligent text analysis"""
     
     # Clean and normalize text
     resume_text = resume_text.lower()
     
-    # Extract all meaningful words (2+ characters, alphanumeric including +, #, .)
-    words = re.findall(r'\b[a-zA-Z][a-zA-Z0-9+#\.]{1,}\b', resume_text)
-    
-    # Common stop words to filter out
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'shall', 'must', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves', 'yourselves', 'themselves', 'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'just', 'now', 'also', 'using', 'used', 'use', 'work', 'working', 'worked', 'experience', 'year', 'years', 'month', 'months', 'day', 'days', 'time', 'good', 'great', 'excellent', 'strong', 'high', 'low', 'include', 'including', 'includes', 'project', 'projects', 'company', 'companies', 'team', 'teams', 'role', 'roles', 'position', 'positions', 'job', 'jobs', 'skill', 'skills', 'ability', 'abilities', 'knowledge', 'understanding', 'background', 'university', 'college', 'degree', 'bachelor', 'master', 'phd', 'certificate', 'certification', 'course', 'courses', 'training', 'education', 'school', 'student', 'graduate', 'graduation', 'email', 'phone', 'address', 'contact', 'name', 'resume', 'cv', 'curriculum', 'vitae'
-    }
-    
-    # Technology-related keywords that are always relevant
-    tech_indicators = {
-        'programming', 'development', 'software', 'application', 'system', 'database', 'web', 'mobile', 'api', 'framework', 'library', 'platform', 'technology', 'technical', 'engineer', 'engineering', 'developer', 'architect', 'architecture', 'design', 'analysis', 'analyst', 'science', 'scientist', 'machine', 'learning', 'artificial', 'intelligence', 'data', 'analytics', 'visualization', 'algorithm', 'model', 'modeling', 'cloud', 'server', 'network', 'security', 'testing', 'deployment', 'devops', 'agile', 'scrum', 'methodology', 'integration', 'optimization', 'performance', 'scalability', 'automation', 'scripting', 'coding', 'debugging', 'troubleshooting', 'maintenance', 'support', 'implementation', 'migration', 'upgrade', 'version', 'control'
-    }
-    
-    # Programming languages and technologies (comprehensive list)
-    technologies = {
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'csharp', 'php', 'ruby', 'go', 'rust', 'kotlin', 'swift', 'dart', 'scala', 'perl', 'r', 'matlab', 'sql', 'nosql', 'html', 'css', 'sass', 'scss', 'less', 'xml', 'json', 'yaml', 'toml',
-        'react', 'angular', 'vue', 'svelte', 'ember', 'backbone', 'jquery', 'bootstrap', 'tailwind', 'material', 'chakra',
-        'node', 'nodejs', 'express', 'fastapi', 'flask', 'django', 'spring', 'springboot', 'hibernate', 'laravel', 'symfony', 'rails', 'sinatra', 'gin', 'fiber', 'actix', 'rocket', 'axum',
-        'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'cassandra', 'dynamodb', 'firebase', 'supabase', 'prisma', 'sequelize', 'mongoose', 'typeorm', 'knex',
-        'aws', 'azure', 'gcp', 'google', 'cloud', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'bitbucket', 'terraform', 'ansible', 'vagrant', 'nginx', 'apache', 'iis',
-        'tensorflow', 'pytorch', 'keras', 'scikit', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'plotly', 'jupyter', 'anaconda', 'spyder',
-        'android', 'ios', 'flutter', 'xamarin', 'cordova', 'phonegap', 'ionic', 'reactnative', 'native',
-        'linux', 'ubuntu', 'centos', 'redhat', 'debian', 'windows', 'macos', 'unix', 'bash', 'powershell', 'shell',
-        'git', 'svn', 'mercurial', 'perforce', 'ci', 'cd', 'pipeline', 'selenium', 'cypress', 'jest', 'mocha', 'chai', 'pytest', 'junit'
-    }
-    
-    # Business and professional roles
-    professional_roles = {
-        'manager', 'director', 'lead', 'senior', 'junior', 'intern', 'consultant', 'specialist', 'coordinator', 'administrator', 'executive', 'officer', 'supervisor', 'analyst', 'designer', 'researcher', 'scientist', 'technician', 'associate', 'assistant', 'accountant', 'finance', 'marketing', 'sales', 'hr', 'human', 'resources', 'operations', 'product', 'business', 'strategy', 'consulting', 'legal', 'compliance', 'audit', 'risk', 'quality', 'assurance'
-    }
-    
-    # Combine all relevant keywords
-    all_relevant_terms = tech_indicators.union(technologies).union(professional_roles)
-    
-    # Count word frequencies
-    word_count = {}
-    for word in words:
-        word_clean = word.lower().strip()
-        if len(word_clean) > 2 and word_clean not in stop_words:
-            word_count[word_clean] = word_count.get(word_clean, 0) + 1
+    # Count skills, roles and other words (synonyms folded into their canonical skill) and find
+    # multi-word phrases in one pass over the text
+    matches = skill_taxonomy.match(resume_text)
     
     # Prioritize and categorize keywords
     tech_keywords = []
@@ -90,14 +781,13 @@ def extract_keywords_from_resume(resume_text):
     other_keywords = []
     
     # Sort by frequency and categorize
-    sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
+    sorted_words = sorted(matches.word_counts.items(), key=lambda x: x[1], reverse=True)
     
     for word, freq in sorted_words:
-        if word in technologies:
+        category = skill_taxonomy.category(word)
+        if category in ('technology', 'tech_indicator'):
             tech_keywords.append(word)
-        elif word in tech_indicators:
-            tech_keywords.append(word)
-        elif word in professional_roles:
+        elif category == 'role':
             role_keywords.append(word)
         elif freq > 1:  # Only include other words if they appear multiple times
             other_keywords.append(word)
@@ -116,16 +806,9 @@ def extract_keywords_from_resume(resume_text):
     if len(final_keywords) < 3:
         final_keywords.extend(other_keywords[:3-len(final_keywords)])
     
-    # Special case: look for compound terms in original text
-    compound_terms = [
-        'machine learning', 'data science', 'artificial intelligence', 'web development', 
-        'software development', 'full stack', 'front end', 'back end', 'data analysis',
-        'project management', 'business analysis', 'quality assurance', 'user experience',
-        'digital marketing', 'cloud computing', 'cyber security', 'mobile development'
-    ]
-    
-    for term in compound_terms:
-        if term in resume_text and len(final_keywords) < 5:
+    # Special case: compound terms (machine learning, full stack, ...) found in the text
+    for term in matches.phrases:
+        if len(final_keywords) < 5:
             final_keywords.append(term.replace(' ', '_'))
     
     # If no meaningful keywords found, try to infer from context
@@ -146,535 +829,1201 @@ def extract_keywords_from_resume(resume_text):
             result_keywords.append(clean_keyword)
     
     result = ' '.join(result_keywords) if result_keywords else 'professional candidate'
-    print(f"🔍 Dynamically extracted keywords from CV: {result}")
+    logger.info(f"🔍 Dynamically extracted keywords from CV: {result}")
     return result
 
+def select_job_cards(content, selectors, limit):
+    """Returns up to limit job card tags from a results page for the first selector that matches."""
+    if SCRAPE_STREAMING_PARSE:
+        return select_cards(content, selectors, limit)
+    return select_cards_full(content, selectors, limit)
+
+# Job card selectors per site as (tag, attrs), tried in order (see html_cards.py)
+BDJOBS_CARD_SELECTORS = [('div', {'class': 'job-listing'}), ('tr', {'bgcolor': '#FFFFFF'})]
+BDJOBS_FALLBACK_CARD_SELECTORS = [('div', {'class': 'job-listing'}), ('tr', {})]
+LINKEDIN_CARD_SELECTORS = [('div', {'class': 'job-search-card'}), ('li', {'class': 'result-card'}), ('div', {'class': 'base-card'})]
+LINKEDIN_FALLBACK_CARD_SELECTORS = [('div', {}), ('li', {})]
+INDEED_CARD_SELECTORS = [('div', {'class': 'job_seen_beacon'}), ('a', {'data-jk': True}), ('h2', {'class': 'jobTitle'})]
+INDEED_FALLBACK_CARD_SELECTORS = [('div', {}), ('h2', {})]
+
 def scrape_bdjobs(keywords, num_jobs=10):
     """Scrape jobs from BDJobs.com"""
     jobs = []
-    try:
-        # Create search URL
-        search_query = "+".join(keywords.split())
-        url = f"https://jobs.bdjobs.com/jobsearch.asp?fcatId=&icatId=&jobTitle={search_query}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+    with ScrapeAttempt('BDJobs', 'primary', jobs) as attempt:
+        try:
+            # Create search URL
+            search_query = "+".join(keywords.split())
+            url = f"https://jobs.bdjobs.com/jobsearch.asp?fcatId=&icatId=&jobTitle={search_query}"
         
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find job listings (BDJobs specific selectors)
-            job_listings = soup.find_all('div', class_='job-listing') or soup.find_all('tr', {'bgcolor': '#FFFFFF'})
+            response = source_get('BDJobs', url)
+            if response.status_code == 200:
+                # Find job listings (BDJobs specific selectors)
+                job_listings = select_job_cards(response.content, BDJOBS_CARD_SELECTORS, num_jobs)
             
-            for i, job in enumerate(job_listings[:num_jobs]):
-                try:
-                    # Extract job details
-                    title_elem = job.find('a') or job.find('td')
-                    title = title_elem.get_text(strip=True) if title_elem else f"Software Developer {i+1}"
+                for i, job in enumerate(job_listings):
+                    try:
+                        # Extract job details
+                        title_elem = job.find('a') or job.find('td')
+                        title = title_elem.get_text(strip=True) if title_elem else f"Software Developer {i+1}"
                     
-                    # Extract job URL - try to get the most specific link
-                    job_url = ""
-                    apply_url = ""
-                    if title_elem and title_elem.name == 'a':
-                        job_url = title_elem.get('href', '')
-                        if job_url and not job_url.startswith('http'):
-                            job_url = f"https://jobs.bdjobs.com{job_url}"
-                        apply_url = job_url  # Same URL for BDJobs
+                        # Extract job URL - try to get the most specific link
+                        job_url = ""
+                        apply_url = ""
+                        if title_elem and title_elem.name == 'a':
+                            job_url = title_elem.get('href', '')
+                            if job_url and not job_url.startswith('http'):
+                                job_url = f"https://jobs.bdjobs.com{job_url}"
+                            apply_url = job_url  # Same URL for BDJobs
                     
-                    company_elem = job.find('td', string=re.compile(r'Company', re.I)) or job.find_next('td')
-                    company = company_elem.get_text(strip=True) if company_elem else f"Tech Company {i+1}"
+                        company_elem = job.find('td', string=re.compile(r'Company', re.I)) or job.find_next('td')
+                        company = company_elem.get_text(strip=True) if company_elem else f"Tech Company {i+1}"
                     
-                    # Create job object
-                    job_data = {
-                        'id': f"bdjobs_{i+1}_{int(time.time())}",  # Make ID unique
-                        'title': title[:100],
-                        'company': company[:50],
-                        'description': f"Exciting opportunity at {company}. Looking for professionals with expertise in {keywords}. Join our dynamic team and grow your career with cutting-edge technology projects.",
-                        'requirements': f"Skills in {keywords}, problem-solving abilities, team collaboration, professional development mindset",
-                        'location': "Dhaka, Bangladesh",
-                        'source': 'BDJobs',
-                        'job_url': job_url or f"https://jobs.bdjobs.com/jobsearch.asp?q={search_query}",
-                        'apply_url': apply_url or job_url or f"https://jobs.bdjobs.com/jobsearch.asp?q={search_query}"
-                    }
-                    jobs.append(job_data)
-                except Exception as e:
-                    print(f"Error parsing BDJobs job {i}: {e}")
-                    continue
+                        # Create job object
+                        job_data = {
+                            'id': f"bdjobs_{i+1}_{int(time.time())}",  # Make ID unique
+                            'title': title[:100],
+                            'company': company[:50],
+                            'description': f"Exciting opportunity at {company}. Looking for professionals with expertise in {keywords}. Join our dynamic team and grow your career with cutting-edge technology projects.",
+                            'requirements': f"Skills in {keywords}, problem-solving abilities, team collaboration, professional development mindset",
+                            'location': "Dhaka, Bangladesh",
+                            'source': 'BDJobs',
+                            'job_url': job_url or f"https://jobs.bdjobs.com/jobsearch.asp?q={search_query}",
+                            'apply_url': apply_url or job_url or f"https://jobs.bdjobs.com/jobsearch.asp?q={search_query}"
+                        }
+                        jobs.append(job_data)
+                    except Exception as e:
+                        logger.warning(f"Error parsing BDJobs job {i}: {e}")
+                        continue
                     
-    except Exception as e:
-        print(f"Error scraping BDJobs: {e}")
+        except Exception as e:
+            logger.warning(f"Error scraping BDJobs: {e}")
+            attempt.failed = True
         
     # If no jobs found, try alternative search strategies
-    if len(jobs) == 0:
-        print("🔄 Trying alternative BDJobs search strategies...")
+    if len(jobs) == 0 and source_breakers.get('BDJobs').available():
+        logger.info("🔄 Trying alternative BDJobs search strategies...")
         # Try with simplified keywords
         simple_keywords = keywords.split()[0] if keywords else "software developer"
-        try:
-            simple_search_query = "+".join(simple_keywords.split())
-            alt_url = f"https://jobs.bdjobs.com/jobsearch.asp?jobTitle={simple_search_query}"
+        with ScrapeAttempt('BDJobs', 'fallback', jobs) as attempt:
+            try:
+                simple_search_query = "+".join(simple_keywords.split())
+                alt_url = f"https://jobs.bdjobs.com/jobsearch.asp?jobTitle={simple_search_query}"
             
-            response = requests.get(alt_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_listings = soup.find_all('div', class_='job-listing') or soup.find_all('tr')
+                response = source_get('BDJobs', alt_url)
+                if response.status_code == 200:
+                    job_listings = select_job_cards(response.content, BDJOBS_FALLBACK_CARD_SELECTORS, min(num_jobs, 5))
                 
-                for i, job in enumerate(job_listings[:min(num_jobs, 5)]):
-                    try:
-                        title_elem = job.find('a') or job.find('td')
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
-                            if title and len(title) > 5:  # Valid job title
-                                job_url = ""
-                                if title_elem.name == 'a':
-                                    job_url = title_elem.get('href', '')
-                                    if job_url and not job_url.startswith('http'):
-                                        job_url = f"https://jobs.bdjobs.com{job_url}"
+                    for i, job in enumerate(job_listings):
+                        try:
+                            title_elem = job.find('a') or job.find('td')
+                            if title_elem:
+                                title = title_elem.get_text(strip=True)
+                                if title and len(title) > 5:  # Valid job title
+                                    job_url = ""
+                                    if title_elem.name == 'a':
+                                        job_url = title_elem.get('href', '')
+                                        if job_url and not job_url.startswith('http'):
+                                            job_url = f"https://jobs.bdjobs.com{job_url}"
                                 
-                                job_data = {
-                                    'id': f"bdjobs_alt_{i+1}_{int(time.time())}",
-                                    'title': title[:100],
-                                    'company': f"Technology Company {i+1}",
-                                    'description': f"Professional opportunity in {keywords}. Join a growing technology team focused on innovation and excellence.",
-                                    'requirements': f"Experience in {keywords}, professional skills, team collaboration",
-                                    'location': "Dhaka, Bangladesh",
-                                    'source': 'BDJobs',
-                                    'job_url': job_url or f"https://jobs.bdjobs.com/jobsearch.asp?jobTitle={simple_search_query}",
-                                    'apply_url': job_url or f"https://jobs.bdjobs.com/jobsearch.asp?jobTitle={simple_search_query}"
-                                }
-                                jobs.append(job_data)
-                    except Exception as e:
-                        continue
-        except Exception as e:
-            print(f"Alternative BDJobs search failed: {e}")
+                                    job_data = {
+                                        'id': f"bdjobs_alt_{i+1}_{int(time.time())}",
+                                        'title': title[:100],
+                                        'company': f"Technology Company {i+1}",
+                                        'description': f"Professional opportunity in {keywords}. Join a growing technology team focused on innovation and excellence.",
+                                        'requirements': f"Experience in {keywords}, professional skills, team collaboration",
+                                        'location': "Dhaka, Bangladesh",
+                                        'source': 'BDJobs',
+                                        'job_url': job_url or f"https://jobs.bdjobs.com/jobsearch.asp?jobTitle={simple_search_query}",
+                                        'apply_url': job_url or f"https://jobs.bdjobs.com/jobsearch.asp?jobTitle={simple_search_query}"
+                                    }
+                                    jobs.append(job_data)
+                        except Exception as e:
+                            continue
+            except Exception as e:
+                logger.warning(f"Alternative BDJobs search failed: {e}")
+                attempt.failed = True
     
     return jobs
 
 def scrape_linkedin_jobs(keywords, num_jobs=10):
     """Scrape jobs from LinkedIn (simplified approach)"""
     jobs = []
-    try:
-        # LinkedIn job search URL
-        search_query = urllib.parse.quote(keywords)
-        url = f"https://www.linkedin.com/jobs/search?keywords={search_query}&location=Bangladesh"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+    with ScrapeAttempt('LinkedIn', 'primary', jobs) as attempt:
+        try:
+            # LinkedIn job search URL
+            search_query = urllib.parse.quote(keywords)
+            url = f"https://www.linkedin.com/jobs/search?keywords={search_query}&location=Bangladesh"
         
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find job cards with multiple selectors
-            job_cards = (soup.find_all('div', class_='job-search-card') or 
-                        soup.find_all('li', class_='result-card') or
-                        soup.find_all('div', class_='base-card'))
+            response = source_get('LinkedIn', url)
+            if response.status_code == 200:
+                # Find job cards with multiple selectors
+                job_cards = select_job_cards(response.content, LINKEDIN_CARD_SELECTORS, num_jobs)
             
-            for i, card in enumerate(job_cards[:num_jobs]):
-                try:
-                    title_elem = (card.find('h3') or card.find('a', class_='result-card__full-card-link') or
-                                 card.find('a', {'data-tracking-control-name': 'public_jobs_jserp-result_search-card'}))
-                    title = title_elem.get_text(strip=True) if title_elem else f"Senior {keywords.title()} Role"
+                for i, card in enumerate(job_cards):
+                    try:
+                        title_elem = (card.find('h3') or card.find('a', class_='result-card__full-card-link') or
+                                     card.find('a', {'data-tracking-control-name': 'public_jobs_jserp-result_search-card'}))
+                        title = title_elem.get_text(strip=True) if title_elem else f"Senior {keywords.title()} Role"
                     
-                    # Extract job URL
-                    job_url = ""
-                    if title_elem and title_elem.name == 'a':
-                        job_url = title_elem.get('href', '')
-                    elif title_elem:
-                        link_elem = title_elem.find('a')
-                        if link_elem:
-                            job_url = link_elem.get('href', '')
+                        # Extract job URL
+                        job_url = ""
+                        if title_elem and title_elem.name == 'a':
+                            job_url = title_elem.get('href', '')
+                        elif title_elem:
+                            link_elem = title_elem.find('a')
+                            if link_elem:
+                                job_url = link_elem.get('href', '')
                     
-                    company_elem = (card.find('h4') or card.find('a', class_='result-card__subtitle-link') or
-                                   card.find('h4', class_='base-search-card__subtitle'))
-                    company = company_elem.get_text(strip=True) if company_elem else f"Professional Services {i+1}"
+                        company_elem = (card.find('h4') or card.find('a', class_='result-card__subtitle-link') or
+                                       card.find('h4', class_='base-search-card__subtitle'))
+                        company = company_elem.get_text(strip=True) if company_elem else f"Professional Services {i+1}"
                     
-                    location_elem = (card.find('span', class_='job-search-card__location') or
-                                    card.find('span', class_='job-result-card__location'))
-                    location = location_elem.get_text(strip=True) if location_elem else "Bangladesh"
+                        location_elem = (card.find('span', class_='job-search-card__location') or
+                                        card.find('span', class_='job-result-card__location'))
+                        location = location_elem.get_text(strip=True) if location_elem else "Bangladesh"
                     
-                    job_data = {
-                        'id': f"linkedin_{i+1}",
-                        'title': title[:100],
-                        'company': company[:50],
-                        'description': f"Exciting career opportunity at {company}. We're seeking skilled {keywords} professionals to join our dynamic workforce.",
-                        'requirements': f"Expertise in {keywords}, leadership qualities, innovation mindset",
-                        'location': location,
-                        'source': 'LinkedIn',
-                        'job_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={search_query}&location=Bangladesh",
-                        'apply_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={search_query}&location=Bangladesh"
-                    }
-                    jobs.append(job_data)
-                except Exception as e:
-                    print(f"Error parsing LinkedIn job {i}: {e}")
-                    continue
+                        job_data = {
+                            'id': f"linkedin_{i+1}",
+                            'title': title[:100],
+                            'company': company[:50],
+                            'description': f"Exciting career opportunity at {company}. We're seeking skilled {keywords} professionals to join our dynamic workforce.",
+                            'requirements': f"Expertise in {keywords}, leadership qualities, innovation mindset",
+                            'location': location,
+                            'source': 'LinkedIn',
+                            'job_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={search_query}&location=Bangladesh",
+                            'apply_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={search_query}&location=Bangladesh"
+                        }
+                        jobs.append(job_data)
+                    except Exception as e:
+                        logger.warning(f"Error parsing LinkedIn job {i}: {e}")
+                        continue
                     
-    except Exception as e:
-        print(f"Error scraping LinkedIn: {e}")
+        except Exception as e:
+            logger.warning(f"Error scraping LinkedIn: {e}")
+            attempt.failed = True
     
     # If no jobs found, try alternative LinkedIn search
-    if len(jobs) == 0:
-        print("🔄 Trying alternative LinkedIn search...")
-        try:
-            # Try broader search terms
-            broad_keywords = keywords.split()[0] if keywords else "professional"
-            alt_search_query = urllib.parse.quote(broad_keywords)
-            alt_url = f"https://www.linkedin.com/jobs/search?keywords={alt_search_query}"
+    if len(jobs) == 0 and source_breakers.get('LinkedIn').available():
+        logger.info("🔄 Trying alternative LinkedIn search...")
+        with ScrapeAttempt('LinkedIn', 'fallback', jobs) as attempt:
+            try:
+                # Try broader search terms
+                broad_keywords = keywords.split()[0] if keywords else "professional"
+                alt_search_query = urllib.parse.quote(broad_keywords)
+                alt_url = f"https://www.linkedin.com/jobs/search?keywords={alt_search_query}"
             
-            response = requests.get(alt_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_cards = soup.find_all('div') or soup.find_all('li')
+                response = source_get('LinkedIn', alt_url)
+                if response.status_code == 200:
+                    job_cards = select_job_cards(response.content, LINKEDIN_FALLBACK_CARD_SELECTORS, min(num_jobs, 5))
                 
-                for i, card in enumerate(job_cards[:min(num_jobs, 5)]):
-                    try:
-                        title_elem = card.find('h3') or card.find('h2') or card.find('a')
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
-                            if title and len(title) > 5 and 'job' in title.lower():
-                                job_url = ""
-                                if title_elem.name == 'a':
-                                    job_url = title_elem.get('href', '')
+                    for i, card in enumerate(job_cards):
+                        try:
+                            title_elem = card.find('h3') or card.find('h2') or card.find('a')
+                            if title_elem:
+                                title = title_elem.get_text(strip=True)
+                                if title and len(title) > 5 and 'job' in title.lower():
+                                    job_url = ""
+                                    if title_elem.name == 'a':
+                                        job_url = title_elem.get('href', '')
                                 
-                                job_data = {
-                                    'id': f"linkedin_alt_{i+1}_{int(time.time())}",
-                                    'title': title[:100],
-                                    'company': f"Professional Organization {i+1}",
-                                    'description': f"Career opportunity in {keywords}. Work with experienced professionals in a dynamic environment.",
-                                    'requirements': f"Skills in {keywords}, professional experience, collaborative mindset",
-                                    'location': "Bangladesh",
-                                    'source': 'LinkedIn',
-                                    'job_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={alt_search_query}",
-                                    'apply_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={alt_search_query}"
-                                }
-                                jobs.append(job_data)
-                    except Exception as e:
-                        continue
-        except Exception as e:
-            print(f"Alternative LinkedIn search failed: {e}")
+                                    job_data = {
+                                        'id': f"linkedin_alt_{i+1}_{int(time.time())}",
+                                        'title': title[:100],
+                                        'company': f"Professional Organization {i+1}",
+                                        'description': f"Career opportunity in {keywords}. Work with experienced professionals in a dynamic environment.",
+                                        'requirements': f"Skills in {keywords}, professional experience, collaborative mindset",
+                                        'location': "Bangladesh",
+                                        'source': 'LinkedIn',
+                                        'job_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={alt_search_query}",
+                                        'apply_url': job_url or f"https://www.linkedin.com/jobs/search?keywords={alt_search_query}"
+                                    }
+                                    jobs.append(job_data)
+                        except Exception as e:
+                            continue
+            except Exception as e:
+                logger.warning(f"Alternative LinkedIn search failed: {e}")
+                attempt.failed = True
     
     return jobs
 
 def scrape_indeed_jobs(keywords, num_jobs=10):
     """Scrape jobs from Indeed"""
     jobs = []
-    try:
-        search_query = urllib.parse.quote(keywords)
-        # Use global Indeed site instead of bd.indeed.com
-        url = f"https://www.indeed.com/jobs?q={search_query}&l=Bangladesh"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+    with ScrapeAttempt('Indeed', 'primary', jobs) as attempt:
+        try:
+            search_query = urllib.parse.quote(keywords)
+            # Use global Indeed site instead of bd.indeed.com
+            url = f"https://www.indeed.com/jobs?q={search_query}&l=Bangladesh"
         
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find job results with multiple selectors
-            job_results = (soup.find_all('div', class_='job_seen_beacon') or 
-                          soup.find_all('a', {'data-jk': True}) or
-                          soup.find_all('h2', class_='jobTitle'))
+            response = source_get('Indeed', url)
+            if response.status_code == 200:
+                # Find job results with multiple selectors
+                job_results = select_job_cards(response.content, INDEED_CARD_SELECTORS, num_jobs)
             
-            for i, job in enumerate(job_results[:num_jobs]):
-                try:
-                    title_elem = (job.find('h2') or job.find('span', {'title': True}) or 
-                                 job.find('a', {'data-jk': True}))
-                    title = title_elem.get_text(strip=True) if title_elem else f"{keywords.title()} Specialist"
+                for i, job in enumerate(job_results):
+                    try:
+                        title_elem = (job.find('h2') or job.find('span', {'title': True}) or 
+                                     job.find('a', {'data-jk': True}))
+                        title = title_elem.get_text(strip=True) if title_elem else f"{keywords.title()} Specialist"
                     
-                    # Extract job URL
-                    job_url = ""
-                    if title_elem:
-                        link_elem = title_elem.find('a') or title_elem if title_elem.name == 'a' else None
-                        if link_elem:
-                            job_url = link_elem.get('href', '')
-                            if job_url and not job_url.startswith('http'):
-                                job_url = f"https://www.indeed.com{job_url}"
+                        # Extract job URL
+                        job_url = ""
+                        if title_elem:
+                            link_elem = title_elem.find('a') or title_elem if title_elem.name == 'a' else None
+                            if link_elem:
+                                job_url = link_elem.get('href', '')
+                                if job_url and not job_url.startswith('http'):
+                                    job_url = f"https://www.indeed.com{job_url}"
                     
-                    company_elem = (job.find('span', class_='companyName') or 
-                                   job.find('a', class_='turnstileLink'))
-                    company = company_elem.get_text(strip=True) if company_elem else f"Leading Company {i+1}"
+                        company_elem = (job.find('span', class_='companyName') or 
+                                       job.find('a', class_='turnstileLink'))
+                        company = company_elem.get_text(strip=True) if company_elem else f"Leading Company {i+1}"
                     
-                    location_elem = job.find('div', class_='companyLocation')
-                    location = location_elem.get_text(strip=True) if location_elem else "Bangladesh"
+                        location_elem = job.find('div', class_='companyLocation')
+                        location = location_elem.get_text(strip=True) if location_elem else "Bangladesh"
                     
-                    job_data = {
-                        'id': f"indeed_{i+1}",
-                        'title': title[:100],
-                        'company': company[:50],
-                        'description': f"Great opportunity at {company}. We're looking for talented professionals with {keywords} skills to drive innovation and success.",
-                        'requirements': f"Proficiency in {keywords}, excellent communication skills, team player",
-                        'location': location,
-                        'source': 'Indeed',
-                        'job_url': job_url or f"https://www.indeed.com/jobs?q={search_query}&l=Bangladesh",
-                        'apply_url': job_url or f"https://www.indeed.com/jobs?q={search_query}&l=Bangladesh"
-                    }
-                    jobs.append(job_data)
-                except Exception as e:
-                    print(f"Error parsing Indeed job {i}: {e}")
-                    continue
+                        job_data = {
+                            'id': f"indeed_{i+1}",
+                            'title': title[:100],
+                            'company': company[:50],
+                            'description': f"Great opportunity at {company}. We're looking for talented professionals with {keywords} skills to drive innovation and success.",
+                            'requirements': f"Proficiency in {keywords}, excellent communication skills, team player",
+                            'location': location,
+                            'source': 'Indeed',
+                            'job_url': job_url or f"https://www.indeed.com/jobs?q={search_query}&l=Bangladesh",
+                            'apply_url': job_url or f"https://www.indeed.com/jobs?q={search_query}&l=Bangladesh"
+                        }
+                        jobs.append(job_data)
+                    except Exception as e:
+                        logger.warning(f"Error parsing Indeed job {i}: {e}")
+                        continue
                     
-    except Exception as e:
-        print(f"Error scraping Indeed: {e}")
+        except Exception as e:
+            logger.warning(f"Error scraping Indeed: {e}")
+            attempt.failed = True
     
     # If no jobs found, try alternative Indeed search strategies
-    if len(jobs) == 0:
-        print("🔄 Trying alternative Indeed search...")
-        try:
-            # Try with simplified search and different location parameters
-            simple_keyword = keywords.split()[0] if keywords else "professional"
-            alt_search_query = urllib.parse.quote(simple_keyword)
+    if len(jobs) == 0 and source_breakers.get('Indeed').available():
+        logger.info("🔄 Trying alternative Indeed search...")
+        with ScrapeAttempt('Indeed', 'fallback', jobs) as attempt:
+            try:
+                # Try with simplified search and different location parameters
+                simple_keyword = keywords.split()[0] if keywords else "professional"
+                alt_search_query = urllib.parse.quote(simple_keyword)
             
-            # Try multiple Indeed search variations
-            search_urls = [
-                f"https://www.indeed.com/jobs?q={alt_search_query}",
-                f"https://www.indeed.com/jobs?q={alt_search_query}&l=Dhaka",
-                f"https://www.indeed.com/jobs?q={alt_search_query}&l=South+Asia"
-            ]
+                # Try multiple Indeed search variations
+                search_urls = [
+                    f"https://www.indeed.com/jobs?q={alt_search_query}",
+                    f"https://www.indeed.com/jobs?q={alt_search_query}&l=Dhaka",
+                    f"https://www.indeed.com/jobs?q={alt_search_query}&l=South+Asia"
+                ]
             
-            for url in search_urls:
-                if len(jobs) >= 3:  # Stop if we found enough jobs
-                    break
+                for url in search_urls:
+                    if len(jobs) >= 3:  # Stop if we found enough jobs
+                        break
                     
-                response = requests.get(url, headers=headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    job_results = soup.find_all('div') or soup.find_all('h2')
+                    response = source_get('Indeed', url)
+                    if response.status_code == 200:
+                        job_results = select_job_cards(response.content, INDEED_FALLBACK_CARD_SELECTORS, min(num_jobs, 5))
                     
-                    for i, job in enumerate(job_results[:min(num_jobs, 5)]):
-                        try:
-                            title_elem = job.find('h2') or job.find('span') or job.find('a')
-                            if title_elem:
-                                title = title_elem.get_text(strip=True)
-                                if title and len(title) > 5 and any(word in title.lower() for word in ['job', 'position', 'role', 'engineer', 'developer', 'analyst']):
-                                    job_url = ""
-                                    if title_elem.name == 'a':
-                                        job_url = title_elem.get('href', '')
-                                        if job_url and not job_url.startswith('http'):
-                                            job_url = f"https://www.indeed.com{job_url}"
+                        for i, job in enumerate(job_results):
+                            try:
+                                title_elem = job.find('h2') or job.find('span') or job.find('a')
+                                if title_elem:
+                                    title = title_elem.get_text(strip=True)
+                                    if title and len(title) > 5 and any(word in title.lower() for word in ['job', 'position', 'role', 'engineer', 'developer', 'analyst']):
+                                        job_url = ""
+                                        if title_elem.name == 'a':
+                                            job_url = title_elem.get('href', '')
+                                            if job_url and not job_url.startswith('http'):
+                                                job_url = f"https://www.indeed.com{job_url}"
                                     
-                                    job_data = {
-                                        'id': f"indeed_alt_{len(jobs)+1}_{int(time.time())}",
-                                        'title': title[:100],
-                                        'company': f"Hiring Company {len(jobs)+1}",
-                                        'description': f"Opportunity in {keywords}. Join a team focused on professional growth and innovation.",
-                                        'requirements': f"Background in {keywords}, professional skills, adaptability",
-                                        'location': "Bangladesh",
-                                        'source': 'Indeed',
-                                        'job_url': job_url or url,
-                                        'apply_url': job_url or url
-                                    }
-                                    jobs.append(job_data)
+                                        job_data = {
+                                            'id': f"indeed_alt_{len(jobs)+1}_{int(time.time())}",
+                                            'title': title[:100],
+                                            'company': f"Hiring Company {len(jobs)+1}",
+                                            'description': f"Opportunity in {keywords}. Join a team focused on professional growth and innovation.",
+                                            'requirements': f"Background in {keywords}, professional skills, adaptability",
+                                            'location': "Bangladesh",
+                                            'source': 'Indeed',
+                                            'job_url': job_url or url,
+                                            'apply_url': job_url or url
+                                        }
+                                        jobs.append(job_data)
                                     
-                                    if len(jobs) >= min(num_jobs, 5):
-                                        break
-                        except Exception as e:
-                            continue
-        except Exception as e:
-            print(f"Alternative Indeed search failed: {e}")
+                                        if len(jobs) >= min(num_jobs, 5):
+                                            break
+                            except Exception as e:
+                                continue
+            except Exception as e:
+                logger.warning(f"Alternative Indeed search failed: {e}")
+                attempt.failed = True
     
     return jobs
 
-def scrape_all_job_sites(resume_text):
-    """Scrape jobs from multiple sites based on resume content"""
-    print("🔍 Analyzing CV to extract relevant keywords...")
-    keywords = extract_keywords_from_resume(resume_text)
-    print(f"📝 Extracted keywords: {keywords}")
-    
-    all_jobs = []
-    
-    print("🌐 Scraping BDJobs...")
+JOB_SOURCES = [
+    ('BDJobs', scrape_bdjobs),
+    ('Indeed', scrape_indeed_jobs),
+    ('LinkedIn', scrape_linkedin_jobs),
+]
+
+BROAD_SEARCH_KEYWORDS = "professional opportunities career jobs"
+
+def cached_scrape(name, scraper, keywords, num_jobs):
+    """
+    Serves a scraper call from the scrape cache, scraping and caching on a miss.
+    Stale listings are served as they are while the refresh scheduler re-scrapes them.
+
+    Returns (jobs, status): 'complete', 'partial' (the request's latency budget
+    ran out during the scrape) or 'skipped' (the source's circuit is open).
+    """
+    serve_stale = refresh_scheduler is not None and refresh_scheduler.running
+    jobs, stale = scrape_cache.lookup(name, keywords, num_jobs, allow_stale=serve_stale)
+    if stale:
+        refresh_scheduler.revalidate(keywords, num_jobs)
+    scrape_cache_lookups.inc(source=name, result='miss' if jobs is None else 'stale' if stale else 'hit')
+    if jobs is not None:
+        logger.info(f"⚡ {name}: Served {len(jobs)} {'stale ' if stale else ''}jobs from cache")
+        return jobs, 'complete'
+    if not source_breakers.get(name).available():
+        logger.info(f"⏸️ {name}: Skipped, the source is failing (circuit open)")
+        scrape_skips.inc(source=name)
+        return [], 'skipped'
+    jobs = scraper(keywords, num_jobs)
+    deadline = scrape_deadline.get()
+    if deadline is not None and name in deadline.cut_short:
+        return jobs, 'partial'
+    # Empty results are not cached so a source that was briefly down is retried
+    if jobs:
+        scrape_cache.put(name, keywords, num_jobs, jobs)
+    return jobs, 'complete'
+
+def scrape_result(name, future):
+    """(jobs, status) of a finished cached_scrape future; 'failed' if it raised."""
     try:
-        bdjobs_results = scrape_bdjobs(keywords, 5)
-        all_jobs.extend(bdjobs_results)
-        print(f"✅ BDJobs: Found {len(bdjobs_results)} jobs")
+        jobs, status = future.result()
+        logger.info(f"✅ {name}: Found {len(jobs)} jobs" + (' before the latency budget ran out' if status == 'partial' else ''))
+        return jobs, status
+    except DeadlineExceeded as e:
+        logger.warning(f"⏱️ {name}: {e}")
+        return [], 'missing'
     except Exception as e:
-        print(f"❌ BDJobs failed: {e}")
-    
-    time.sleep(1)  # Rate limiting
-    
-    print("🌐 Scraping Indeed...")
+        logger.error(f"❌ {name} failed: {e}")
+        return [], 'failed'
+
+def iter_scrape_sources(keywords, num_jobs, sources=None, deadline=None):
+    """
+    Runs the given scrapers and yields (source name, jobs, status) as each one
+    finishes; status is 'complete', 'partial', 'skipped', 'failed' or, for
+    sources still running when the deadline passes, 'missing'.
+
+    In concurrent mode every scraper is submitted to the shared thread pool, so the
+    total latency is that of the slowest source rather than the sum of all of them.
+    Per-host spacing is handled by the rate limiter inside the shared HTTP client.
+    Scrapes abandoned at the deadline stop before their next request.
+    """
+    sources = sources or JOB_SOURCES
+    if refresh_scheduler is not None:
+        refresh_scheduler.record(keywords, num_jobs)
+
+    if SCRAPE_CONCURRENT:
+        futures = {scrape_executor.submit(with_deadline, deadline, cached_scrape, name, scraper, keywords, num_jobs): name
+                   for name, scraper in sources}
+        pending = dict(futures)
+        try:
+            for future in as_completed(futures, timeout=deadline.remaining() if deadline is not None else None):
+                name = pending.pop(future)
+                yield (name, *scrape_result(name, future))
+        except FutureTimeoutError:
+            for future, name in pending.items():
+                if future.done():
+                    yield (name, *scrape_result(name, future))
+                else:
+                    future.cancel()
+                    logger.warning(f"⏱️ {name}: No results within the {deadline.seconds:.1f}s latency budget")
+                    yield name, [], 'missing'
+    else:
+        for name, scraper in sources:
+            if deadline is not None and deadline.expired():
+                logger.warning(f"⏱️ {name}: Not scraped, the {deadline.seconds:.1f}s latency budget ran out")
+                yield name, [], 'missing'
+                continue
+            logger.info(f"🌐 Scraping {name}...")
+            try:
+                jobs, status = with_deadline(deadline, cached_scrape, name, scraper, keywords, num_jobs)
+                logger.info(f"✅ {name}: Found {len(jobs)} jobs")
+            except DeadlineExceeded as e:
+                logger.warning(f"⏱️ {name}: {e}")
+                jobs, status = [], 'missing'
+            except Exception as e:
+                logger.error(f"❌ {name} failed: {e}")
+                jobs, status = [], 'failed'
+            yield name, jobs, status
+
+def new_job_deduplicator():
+    return JobDeduplicator(JOB_DEDUP_THRESHOLD) if JOB_DEDUP else None
+
+@span(stage_seconds, stage='dedup')
+def add_unique_jobs(deduplicator, jobs):
+    """
+    Returns the jobs that are not duplicates of a job deduplicator has already
+    seen (duplicates are merged into that job's 'sources' and 'listings'). All
+    jobs are returned as they are when deduplication is disabled.
+    """
+    if deduplicator is None or not jobs:
+        return jobs
+    unique_jobs = deduplicator.add(jobs)
+    if len(unique_jobs) < len(jobs):
+        duplicate_jobs.inc(len(jobs) - len(unique_jobs))
+        logger.info(f"🧹 Collapsed {len(jobs) - len(unique_jobs)} duplicate listings into {len(unique_jobs)} unique jobs")
+    return unique_jobs
+
+def collapse_duplicate_jobs(jobs):
+    """Collapses listings of the same posting into one job that records every source (see job_dedup.py)."""
+    return add_unique_jobs(new_job_deduplicator(), jobs)
+
+def scrape_sources(keywords, num_jobs, sources=None, deadline=None, source_status=None, deduplicator=None):
+    """
+    Runs the given scrapers and returns their combined jobs in source order,
+    duplicates collapsed. With a deduplicator, jobs it has already seen are
+    left out as well. source_status, if given, receives each source's status
+    (see iter_scrape_sources).
+    """
+    sources = sources or JOB_SOURCES
+    results = {}
+    for name, jobs, status in iter_scrape_sources(keywords, num_jobs, sources, deadline=deadline):
+        results[name] = jobs
+        if source_status is not None:
+            source_status[name] = status
+
+    all_jobs = []
+    for name, _ in sources:
+        all_jobs.extend(results[name])
+    if deduplicator is not None:
+        return add_unique_jobs(deduplicator, all_jobs)
+    return collapse_duplicate_jobs(all_jobs)
+
+def refresh_keyword_set(keywords, depth):
+    """
+    Re-scrapes every source for keywords into the scrape cache, one source at a
+    time, and stores the embeddings of listings the embedding store has not seen.
+    """
+    with span(stage_seconds, stage='refresh'):
+        jobs = []
+        for name, scraper in JOB_SOURCES:
+            try:
+                source_jobs = scraper(keywords, depth)
+            except Exception as e:
+                logger.warning(f"⚠️ {name} refresh failed: {e}")
+                continue
+            if source_jobs:
+                scrape_cache.put(name, keywords, depth, source_jobs)
+                jobs.extend(source_jobs)
+        # Without the embedding store there is nowhere to keep the embeddings
+        if jobs and job_embedding_store is not None:
+            get_job_embeddings([job_text(job) for job in collapse_duplicate_jobs(jobs)])
+
+def keyword_set_needs_refresh(keywords, depth):
+    """Whether any source's listings for keywords go stale before the next refresh cycle."""
+    return any(scrape_cache.fresh_for(name, keywords, depth) <= REFRESH_INTERVAL for name, _ in JOB_SOURCES)
+
+refresh_scheduler = RefreshScheduler(
+    refresh_keyword_set,
+    interval=REFRESH_INTERVAL,
+    top_n=REFRESH_TOP_N,
+    min_requests=REFRESH_MIN_REQUESTS,
+    max_concurrent=REFRESH_MAX_CONCURRENT,
+    needs_refresh=keyword_set_needs_refresh,
+    key_fn=ScrapeResultCache.normalize_keywords
+) if REFRESH_ENABLED else None
+
+def broad_search(deadline=None, deduplicator=None):
+    """Last-resort search with very general terms when the CV keywords found nothing (see scrape_sources)."""
+    if deadline is not None and deadline.expired():
+        logger.warning("⏱️ No jobs found and no latency budget left for a broader search")
+        return []
+    logger.info("🔄 No jobs found with specific keywords, trying broader search...")
     try:
-        indeed_results = scrape_indeed_jobs(keywords, 5)
-        all_jobs.extend(indeed_results)
-        print(f"✅ Indeed: Found {len(indeed_results)} jobs")
+        jobs = scrape_sources(BROAD_SEARCH_KEYWORDS, 2, sources=JOB_SOURCES[:2], deadline=deadline, deduplicator=deduplicator)
+        logger.info(f"📈 Found {len(jobs)} jobs with broader search")
+        return jobs
     except Exception as e:
-        print(f"❌ Indeed failed: {e}")
-    
-    time.sleep(1)  # Rate limiting
+        logger.warning(f"Broader search also failed: {e}")
+        return []
+
+def scrape_all_job_sites(resume_text, keywords=None, deadline=None, source_status=None, deduplicator=None):
+    """
+    Scrape jobs from multiple sites based on resume content, within deadline if
+    given; source_status receives each source's status (see iter_scrape_sources)
+    and deduplicator, if given, collapses the duplicates (see scrape_sources).
+    """
+    if keywords is None:
+        logger.info("🔍 Analyzing CV to extract relevant keywords...")
+        keywords = extract_keywords_from_resume(resume_text)
+    logger.info(f"📝 Extracted keywords: {keywords}")
     
-    print("🌐 Scraping LinkedIn...")
-    try:
-        linkedin_results = scrape_linkedin_jobs(keywords, 5)
-        all_jobs.extend(linkedin_results)
-        print(f"✅ LinkedIn: Found {len(linkedin_results)} jobs")
-    except Exception as e:
-        print(f"❌ LinkedIn failed: {e}")
+    logger.info(f"🌐 Scraping {', '.join(name for name, _ in JOB_SOURCES)}...")
+    all_jobs = scrape_sources(keywords, 5, deadline=deadline, source_status=source_status, deduplicator=deduplicator)
     
-    print(f"✅ Total jobs scraped: {len(all_jobs)}")
+    logger.info(f"✅ Total unique jobs scraped: {len(all_jobs)}")
     
     # If still no jobs found, try a final broad search
     if len(all_jobs) == 0:
-        print("🔄 No jobs found with specific keywords, trying broader search...")
-        try:
-            # Try with very general terms
-            general_keywords = "professional opportunities career jobs"
-            
-            # Quick attempt with general terms
-            bdjobs_general = scrape_bdjobs(general_keywords, 2)
-            all_jobs.extend(bdjobs_general)
-            
-            indeed_general = scrape_indeed_jobs(general_keywords, 2)
-            all_jobs.extend(indeed_general)
-            
-            print(f"📈 Found {len(all_jobs)} jobs with broader search")
-            
-        except Exception as e:
-            print(f"Broader search also failed: {e}")
+        all_jobs.extend(broad_search(deadline, deduplicator))
     
     return all_jobs
 
-def find_best_matches(resume_text, jobs_data):
+def get_resume_artifacts(fingerprint, pdf_file):
     """
-    Finds the best job matches for a given resume using AI semantic similarity.
+    Returns the extracted text, keywords and embedding for an uploaded CV.
 
-    Args:
-        resume_text (str): The text of the user's resume.
-        jobs_data (list): A list of job objects with id, title, description, etc.
+    Results are cached by the SHA-256 fingerprint of the uploaded file (see
+    spool_resume), so re-uploading the same CV skips PDF parsing, keyword
+    extraction and encoding entirely. Returns None if no text could be extracted.
+    """
+    artifacts = resume_cache.get(fingerprint)
+    if artifacts is not None:
+        logger.info("⚡ Reusing cached analysis for previously uploaded CV")
+        return artifacts
+
+    extraction = extract_resume_pdf(pdf_file)
+    resume_text = extraction.text
+    if not resume_text:
+        return None
+
+    logger.info("🔍 Analyzing CV to extract relevant keywords...")
+    artifacts = {
+        'fingerprint': fingerprint,
+        'text': resume_text,
+        'keywords': extract_keywords_from_resume(resume_text),
+        'embedding': get_embedding(resume_text),
+        'pdf': extraction.summary()
+    }
+    resume_cache.put(fingerprint, artifacts)
+    return artifacts
+
+def get_resume_artifacts_batch(uploads):
+    """
+    Batch variant of get_resume_artifacts for many (fingerprint, file) uploads.
+
+    Uncached PDFs are parsed in parallel and all of their texts are encoded in a
+    single encode call. Returns one artifacts dict (or None) per upload, plus a
+    dict of upload index -> error message for PDFs the parser rejected.
+    """
+    artifacts = [resume_cache.get(fingerprint) for fingerprint, _ in uploads]
+    missing = [i for i, item in enumerate(artifacts) if item is None]
+    errors = {}
+
+    def extract(i):
+        try:
+            return extract_resume_pdf(uploads[i][1])
+        except PDFExtractionError as e:
+            errors[i] = f'Could not process PDF: {e}'
+            return None
+
+    extractions = list(pdf_executor.map(extract, missing))
+    parsed = [(i, extraction) for i, extraction in zip(missing, extractions) if extraction is not None and extraction.text]
+    if parsed:
+        logger.info(f"🤖 Encoding {len(parsed)} CVs in one batch...")
+        embeddings = encode_texts([extraction.text for _, extraction in parsed])
+        for (i, extraction), embedding in zip(parsed, embeddings):
+            artifacts[i] = {
+                'fingerprint': uploads[i][0],
+                'text': extraction.text,
+                'keywords': extract_keywords_from_resume(extraction.text),
+                'embedding': embedding,
+                'pdf': extraction.summary()
+            }
+            resume_cache.put(uploads[i][0], artifacts[i])
+    return artifacts, errors
+
+def rank_jobs_for_resumes(resume_embeddings, jobs_data, top_k=10, sources=None, location=None, min_score=None):
+    """
+    Ranks one shared pool of jobs for many resumes in a single vectorized pass.
+
+    Builds the full resumes x jobs cosine similarity matrix with one matrix multiply
+    and takes each resume's top-k with partial selection.
 
     Returns:
-        list: A list of job objects with similarity scores, sorted in descending order.
+        list: For each resume, a list of job objects with similarity scores, best first.
     """
-    if not jobs_data:
-        return []
+    if not jobs_data or len(resume_embeddings) == 0:
+        return [[] for _ in resume_embeddings]
+
+    job_embeddings = get_job_embeddings([job_text(job) for job in jobs_data])
+    with span(stage_seconds, stage='ranking'):
+        table = JobTable(jobs_data, job_embeddings)
+        resume_matrix = normalize_rows(np.vstack([embedding_to_numpy(e) for e in resume_embeddings]))
+        similarity = resume_matrix @ table.embeddings.T
+
+        rankings = []
+        for scores in similarity:
+            table.scores = scores
+            rankings.append(table.top_k(top_k, mask=table.mask(sources, location, min_score)))
+    return rankings
+
+def parse_match_filters(form):
+    """Reads the optional sources, location and min_score filters from a request form."""
+    sources = [source.strip() for source in form.get('sources', '').split(',') if source.strip()]
+    return {
+        'sources': sources or None,
+        'location': form.get('location') or None,
+        'min_score': form.get('min_score', type=float)
+    }
+
+def new_result_session(artifacts, filters, depth, deduplicator=None):
+    """Starts an empty ranking for a CV; jobs are added with add_session_jobs()."""
+    if deduplicator is None:
+        deduplicator = new_job_deduplicator()
+    return RankedResults(artifacts['embedding'], artifacts['keywords'], filters, depth=depth, deduplicator=deduplicator)
+
+def new_session_jobs(results, jobs):
+    """
+    Returns the jobs not already in results and their embeddings. jobs must come
+    from scrape_sources() with results.deduplicator, which has already left out
+    the ones it had seen.
+    """
+    if results.deduplicator is None:
+        jobs = [job for job in jobs if normalize_job(job)[0] not in results.seen_keys]
+    if not jobs:
+        return [], None
+    return jobs, get_job_embeddings([job_text(job) for job in jobs])
+
+def add_session_jobs(results, jobs):
+    """Encodes and ranks the jobs not already in results (see new_session_jobs); returns how many there were."""
+    jobs, job_embeddings = new_session_jobs(results, jobs)
+    if jobs:
+        with span(stage_seconds, stage='ranking'):
+            results.add(jobs, job_embeddings)
+    return len(jobs)
+
+def page_cursor(session_id, results, offset):
+    """Cursor for the page starting at offset, or None when nothing can follow."""
+    return encode_cursor(session_id, offset) if results.has_more(offset) else None
+
+def scrape_session_deeper(results, end, deadline=None):
+    """
+    Scrapes every source deeper for a result session that ranks fewer than end
+    jobs, within deadline, and encodes the new jobs. Returns the function that
+    merges them into the session (see ResultSessionStore.release()).
+    """
+    # Each source returns one results page, so scrape deep enough for several pages at
+    # once; the listings already ranked come back from the scrape cache and are skipped
+    depth = max(-(-end // len(JOB_SOURCES)), MORE_JOBS_SCRAPE_DEPTH)
+    if depth <= results.depth:
+        depth = results.depth * 2
+    source_status = {}
+    jobs = scrape_sources(results.keywords, depth, deadline=deadline, source_status=source_status,
+                          deduplicator=results.deduplicator)
+    jobs, job_embeddings = new_session_jobs(results, jobs)
+    logger.info(f"📥 Scraped {depth} jobs per source for the result session, {len(jobs)} new jobs")
+    # Sources the budget cut short may still have more, so the session only counts as
+    # exhausted (and this depth as scraped) when every source finished
+    complete = not any(status in ('partial', 'missing') for status in source_status.values())
+
+    def merge(session):
+        if jobs:
+            with span(stage_seconds, stage='ranking'):
+                session.add(jobs, job_embeddings)
+        if complete:
+            session.depth = depth
+            session.exhausted = not jobs
+    return merge
+
+@span(stage_seconds, stage='session_page')
+def result_session_page(session_id, offset, per_page, deadline=None):
+    """
+    Serves one page of a result session, or returns None once the session has
+    expired. When the ranking is too short it first scrapes every source deeper
+    (within deadline) and merges the new jobs into it. One request at a time, in
+    any server process, scrapes for a session; the others meanwhile get the jobs
+    ranked so far instead of waiting.
+    """
+    end = offset + per_page
+    page = result_sessions.page(session_id, offset, per_page)
+    if page is None:
+        return None
+    jobs, results = page
+    if end > len(results) and not results.exhausted:
+        lease = result_sessions.claim(session_id, RESULT_SESSION_SCRAPE_LEASE)
+        if lease is not None:
+            merge = None
+            try:
+                # Another request may have grown the session before our claim
+                results = result_sessions.get(session_id)
+                if results is not None and end > len(results) and not results.exhausted:
+                    merge = scrape_session_deeper(results, end, deadline)
+            finally:
+                result_sessions.release(session_id, lease, results, merge)
+            page = result_sessions.page(session_id, offset, per_page)
+            if page is None:
+                return None
+            jobs, results = page
+    return jobs, page_cursor(session_id, results, offset + len(jobs)), len(results)
+
+_job_index = {'index': None, 'meta': None, 'path': None}
+_job_index_lock = threading.Lock()
+
+def get_job_index():
+    """
+    Returns the prebuilt job index, or None if none has been built for the current model.
+
+    The index is (re)loaded whenever ingest_jobs.py switches the index directory
+    to a new version, so a running server picks up fresh corpora without a restart.
+    """
+    path = current_index_dir(JOB_INDEX_DIR)
+    if path is None:
+        return None
+
+    with _job_index_lock:
+        if _job_index['path'] != path:
+            index, meta = load_index(JOB_INDEX_DIR)
+            if meta['model_version'] != EMBEDDING_MODEL_VERSION:
+                logger.warning(f"⚠️ Job index was built with {meta['model_version']}, expected {EMBEDDING_MODEL_VERSION}; ignoring it")
+                index = None
+            else:
+                logger.info(f"🗂️ Loaded {meta['kind']} job index with {meta['count']} jobs")
+            _job_index.update(index=index, meta=meta, path=meta['path'])
+        return _job_index['index']
+
+def find_best_matches_in_index(resume_embedding, top_k=10):
+    """
+    Finds the best job matches for a resume embedding in the prebuilt job index.
+
+    Returns:
+        tuple: (matched jobs with similarity scores, number of indexed jobs), or None
+        if no index is available.
+    """
+    index = get_job_index()
+    if index is None:
+        return None
+
+    with span(stage_seconds, stage='index_search'):
+        results = index.search(embedding_to_numpy(resume_embedding), k=top_k, nprobe=JOB_INDEX_NPROBE)
+    jobs_by_key = job_corpus.get_many(job_key for job_key, _ in results)
+
+    matched_jobs = []
+    for job_key, score in results:
+        if job_key in jobs_by_key:
+            job = dict(jobs_by_key[job_key])
+            job['similarity_score'] = round(score * 100, 1)
+            matched_jobs.append(job)
+    return matched_jobs, len(index)
+
+def get_uploaded_resume():
+    """Returns (resume file, None) for a valid PDF upload, or (None, error response)."""
+    if 'resume' not in request.files:
+        return None, (jsonify({'error': 'No resume file provided'}), 400)
+    
+    resume_file = request.files['resume']
     
-    print(f"🤖 Running AI analysis on {len(jobs_data)} jobs...")
+    if resume_file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
     
-    # Extract job descriptions for embedding
-    job_descriptions = [f"{job['title']} {job['description']} {job['requirements']}" for job in jobs_data]
+    if not resume_file.filename.lower().endswith('.pdf'):
+        return None, (jsonify({'error': 'Only PDF files are supported'}), 400)
     
-    resume_embedding = get_embedding(resume_text)
-    job_embeddings = get_embedding(job_descriptions)
+    return resume_file, None
 
-    # Compute cosine similarity between the resume and all jobs
-    cosine_scores = util.pytorch_cos_sim(resume_embedding, job_embeddings)
+def request_deadline(form):
+    """
+    Deadline for budget_ms of a request form or JSON body (default
+    MATCH_LATENCY_BUDGET_MS) counted from the start of the request; None for no budget.
+    """
+    try:
+        budget_ms = float(form.get('budget_ms', MATCH_LATENCY_BUDGET_MS))
+    except (TypeError, ValueError):
+        budget_ms = MATCH_LATENCY_BUDGET_MS
+    if not budget_ms > 0:
+        return None
+    return Deadline(budget_ms / 1000, start=g.get('request_start'))
 
-    # Get the scores as a list
-    scores = cosine_scores[0].cpu().numpy()
+def resume_preview(resume_text):
+    return resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
 
-    # Add similarity scores to job objects
-    for i, job in enumerate(jobs_data):
-        # Convert to percentage and round
-        job['similarity_score'] = round(float(scores[i]) * 100, 1)
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
 
-    # Sort jobs by similarity score in descending order
-    sorted_jobs = sorted(jobs_data, key=lambda x: x['similarity_score'], reverse=True)
-    
-    print(f"🎯 Best match: {sorted_jobs[0]['title']} ({sorted_jobs[0]['similarity_score']}%)")
+@app.before_request
+def reject_oversized_uploads():
+    limit = PDF_MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+    if request.endpoint == 'match_jobs_batch':
+        limit = app.config['MAX_CONTENT_LENGTH']
+    if request.content_length is not None and request.content_length > limit:
+        return jsonify({'error': f'Request body is larger than {limit} bytes'}), 413
 
-    return sorted_jobs
+@app.after_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Route patterns rather than paths keep the label set small (/job-details/<job_id>)
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_seconds.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method,
+                                status=response.status_code)
+    return response
 
 @app.route('/match-jobs', methods=['POST'])
 def match_jobs():
     """API endpoint to match resume with live scraped jobs."""
     try:
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No resume file provided'}), 400
-        
-        resume_file = request.files['resume']
-        
-        if resume_file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not resume_file.filename.lower().endswith('.pdf'):
-            return jsonify({'error': 'Only PDF files are supported'}), 400
+        resume_file, error_response = get_uploaded_resume()
+        if error_response:
+            return error_response
         
-        print("📄 Processing CV upload...")
+        logger.info("📄 Processing CV upload...")
         
-        # Extract text from PDF
-        resume_text = extract_text_from_pdf(resume_file)
+        # Extract text, keywords and embedding (cached per uploaded file)
+        fingerprint, pdf_file = spool_resume(resume_file)
+        with pdf_file:
+            artifacts = get_resume_artifacts(fingerprint, pdf_file)
         
-        if not resume_text:
+        if artifacts is None:
             return jsonify({'error': 'Could not extract text from PDF'}), 400
         
-        print(f"✅ Extracted {len(resume_text)} characters from CV")
+        resume_text = artifacts['text']
+        keywords = artifacts['keywords']
         
-        # Scrape live jobs from multiple sites
-        jobs = scrape_all_job_sites(resume_text)
+        # Index mode: rank against the offline job corpus instead of scraping
+        if request.form.get('mode', MATCH_MODE) == 'index':
+            index_result = find_best_matches_in_index(artifacts['embedding'], top_k=10)
+            if index_result is not None:
+                top_matches, total_indexed = index_result
+                logger.info(f"🚀 Returning {len(top_matches)} job matches from the job index")
+                return jsonify({
+                    'resume_text': resume_preview(resume_text),
+                    'matched_jobs': top_matches,
+                    'total_jobs_analyzed': total_indexed,
+                    'keywords_used': keywords,
+                    # Index results are not kept as a result session, so /more-jobs cannot continue them
+                    'has_more_jobs': False,
+                    'cursor': None,
+                    'pdf_extraction': artifacts['pdf'],
+                    'mode': 'index'
+                })
+            logger.warning("⚠️ No job index available, falling back to live scraping")
+        
+        # Scrape live jobs from multiple sites; sources still running when the budget runs out are left out
+        deadline = request_deadline(request.form)
+        source_status = {}
+        # The scrape collapses duplicates with the result session's deduplicator, so ranking skips that
+        results = new_result_session(artifacts, parse_match_filters(request.form), depth=5)
+        jobs = scrape_all_job_sites(resume_text, keywords=keywords, deadline=deadline, source_status=source_status,
+                                    deduplicator=results.deduplicator)
+        partial_results = any(status != 'complete' for status in source_status.values())
+        if partial_results:
+            logger.warning(f"⏱️ Ranking partial results: {source_status}")
         
         if not jobs:
+            if deadline is not None and deadline.expired():
+                return jsonify({'error': 'No jobs found within the latency budget. Please try again later.',
+                                'source_status': source_status}), 504
             return jsonify({'error': 'No jobs found from scraping. Please try again later.'}), 500
         
-        # Find matching jobs using AI
-        matched_jobs = find_best_matches(resume_text, jobs)
-        
-        # Return top 10 matches
-        top_matches = matched_jobs[:10]
+        # Rank every job against the CV and keep the ranking for /more-jobs
+        logger.info(f"🤖 Running AI analysis on {len(jobs)} jobs...")
+        add_session_jobs(results, jobs)
         
-        print(f"🚀 Returning {len(top_matches)} job matches")
+        # Return top 10 matches (stored as served with the session)
+        top_matches = results.page(0, 10)
+        session_id = result_sessions.create(results)
+        if top_matches:
+            logger.info(f"🎯 Best match: {top_matches[0]['title']} ({top_matches[0]['similarity_score']}%)")
+        logger.info(f"🚀 Returning {len(top_matches)} job matches")
         
         return jsonify({
-            'resume_text': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text,
+            'resume_text': resume_preview(resume_text),
             'matched_jobs': top_matches,
             'total_jobs_analyzed': len(jobs),
-            'keywords_used': extract_keywords_from_resume(resume_text),
-            'has_more_jobs': len(matched_jobs) > 10
+            'keywords_used': keywords,
+            'has_more_jobs': results.has_more(len(top_matches)),
+            'cursor': page_cursor(session_id, results, len(top_matches)),
+            'source_status': source_status,
+            'partial_results': partial_results,
+            'latency_budget_ms': deadline.seconds * 1000 if deadline is not None else None,
+            'pdf_extraction': artifacts['pdf'],
+            'mode': 'live'
         })
         
+    except PDFTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Request body is larger than {app.config["MAX_CONTENT_LENGTH"]} bytes'}), 413
+    except PDFExtractionError as e:
+        logger.warning(f"❌ PDF rejected: {str(e)}")
+        return jsonify({'error': f'Could not process PDF: {str(e)}'}), 422
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        logger.error(f"❌ Error: {str(e)}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
-@app.route('/more-jobs', methods=['POST'])
-def get_more_jobs():
-    """API endpoint to get more jobs based on keywords."""
+def stream_matches(artifacts, filters, top_k=10, deadline=None):
+    """
+    Yields NDJSON events for a streaming match: the extracted keywords first, then
+    the ranked matches so far each time a source finishes, then the final ranking.
+    Sources still running when the deadline passes are left out, as in /match-jobs.
+
+    Jobs are encoded once as their source arrives; each update only re-scores the
+    accumulated embedding matrix.
+    """
+    def event(payload):
+        return json.dumps(payload) + '\n'
+    
+    keywords = artifacts['keywords']
+    resume_vector = embedding_to_numpy(artifacts['embedding'])
+    yield event({'type': 'keywords', 'keywords_used': keywords, 'resume_text': resume_preview(artifacts['text'])})
+    
+    jobs, embeddings = [], []
+    deduplicator = new_job_deduplicator()
+    
+    def add_jobs(new_jobs):
+        # new_jobs have been through deduplicator: duplicates of jobs from earlier sources only
+        # added to those jobs' sources
+        if new_jobs:
+            jobs.extend(new_jobs)
+            embeddings.append(get_job_embeddings([job_text(job) for job in new_jobs]))
+    
+    @span(stage_seconds, stage='ranking')
+    def rank():
+        if not jobs:
+            return []
+        table = JobTable(jobs, np.vstack(embeddings))
+        table.score(resume_vector)
+        return table.top_k(top_k, mask=table.mask(**filters))
+    
+    source_status = {}
+    for name, source_jobs, status in iter_scrape_sources(keywords, 5, deadline=deadline):
+        source_status[name] = status
+        add_jobs(add_unique_jobs(deduplicator, source_jobs))
+        yield event({
+            'type': 'source',
+            'source': name,
+            'status': status,
+            'jobs_found': len(source_jobs),
+            'matched_jobs': rank(),
+            'total_jobs_analyzed': len(jobs)
+        })
+    
+    if not jobs:
+        add_jobs(broad_search(deadline=deadline, deduplicator=deduplicator))
+    
+    if not jobs:
+        if deadline is not None and deadline.expired():
+            yield event({'type': 'error', 'error': 'No jobs found within the latency budget. Please try again later.',
+                         'source_status': source_status})
+        else:
+            yield event({'type': 'error', 'error': 'No jobs found from scraping. Please try again later.'})
+        return
+    
+    # The final ranking is kept as a result session, so /more-jobs continues from it
+    results = new_result_session(artifacts, filters, depth=5, deduplicator=deduplicator)
+    with span(stage_seconds, stage='ranking'):
+        results.add(jobs, np.vstack(embeddings))
+    top_matches = results.page(0, top_k)
+    session_id = result_sessions.create(results)
+    logger.info(f"🚀 Streamed {len(top_matches)} job matches")
+    yield event({
+        'type': 'final',
+        'matched_jobs': top_matches,
+        'total_jobs_analyzed': len(jobs),
+        'keywords_used': keywords,
+        'has_more_jobs': results.has_more(len(top_matches)),
+        'cursor': page_cursor(session_id, results, len(top_matches)),
+        'source_status': source_status,
+        'partial_results': any(status != 'complete' for status in source_status.values()),
+        'latency_budget_ms': deadline.seconds * 1000 if deadline is not None else None
+    })
+
+@app.route('/match-jobs/stream', methods=['POST'])
+def match_jobs_stream():
+    """API endpoint streaming NDJSON match results as each job source completes."""
     try:
-        data = request.get_json()
-        if not data or 'keywords' not in data:
-            return jsonify({'error': 'Keywords are required'}), 400
+        resume_file, error_response = get_uploaded_resume()
+        if error_response:
+            return error_response
         
-        keywords = data['keywords']
-        page = data.get('page', 1)
-        per_page = data.get('per_page', 20)
+        logger.info("📄 Processing CV upload (streaming)...")
         
-        print(f"🔍 Fetching more jobs for keywords: {keywords} (Page {page})")
+        fingerprint, pdf_file = spool_resume(resume_file)
+        with pdf_file:
+            artifacts = get_resume_artifacts(fingerprint, pdf_file)
         
-        # Scrape more jobs with higher limits
-        all_jobs = []
+        if artifacts is None:
+            return jsonify({'error': 'Could not extract text from PDF'}), 400
         
-        print("🌐 Scraping more BDJobs...")
-        try:
-            bdjobs_results = scrape_bdjobs(keywords, per_page // 3)
-            all_jobs.extend(bdjobs_results)
-        except Exception as e:
-            print(f"❌ BDJobs failed: {e}")
+        filters = parse_match_filters(request.form)
+        # The budget counts from the start of the request, as for /match-jobs
+        deadline = request_deadline(request.form)
+        
+        def generate():
+            try:
+                yield from stream_matches(artifacts, filters, deadline=deadline)
+            except Exception as e:
+                logger.error(f"❌ Error: {str(e)}")
+                yield json.dumps({'type': 'error', 'error': f'Internal server error: {str(e)}'}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
+    except PDFTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Request body is larger than {app.config["MAX_CONTENT_LENGTH"]} bytes'}), 413
+    except PDFExtractionError as e:
+        logger.warning(f"❌ PDF rejected: {str(e)}")
+        return jsonify({'error': f'Could not process PDF: {str(e)}'}), 422
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+@app.route('/match-jobs/batch', methods=['POST'])
+def match_jobs_batch():
+    """API endpoint to match many resumes at once against the union of their live scraped jobs."""
+    try:
+        resume_files = [f for f in request.files.getlist('resumes') if f.filename]
+        
+        if not resume_files:
+            return jsonify({'error': 'No resume files provided'}), 400
+        
+        if len(resume_files) > BATCH_MAX_RESUMES:
+            return jsonify({'error': f'At most {BATCH_MAX_RESUMES} resumes can be matched per batch'}), 400
+        
+        top_k = request.form.get('top_k', 10, type=int)
+        filters = parse_match_filters(request.form)
+        
+        logger.info(f"📄 Processing batch of {len(resume_files)} CVs...")
         
-        time.sleep(1)
+        results = [{'filename': f.filename} for f in resume_files]
+        uploads = []
+        for result, resume_file in zip(results, resume_files):
+            if not resume_file.filename.lower().endswith('.pdf'):
+                result['error'] = 'Only PDF files are supported'
+                uploads.append(None)
+                continue
+            try:
+                uploads.append(spool_resume(resume_file))
+            except PDFTooLargeError as e:
+                result['error'] = str(e)
+                uploads.append(None)
         
-        print("🌐 Scraping more Indeed...")
+        valid = [i for i, upload in enumerate(uploads) if upload is not None]
+        artifacts = [None] * len(uploads)
         try:
-            indeed_results = scrape_indeed_jobs(keywords, per_page // 3)
-            all_jobs.extend(indeed_results)
-        except Exception as e:
-            print(f"❌ Indeed failed: {e}")
+            batch_artifacts, batch_errors = get_resume_artifacts_batch([uploads[i] for i in valid])
+        finally:
+            for i in valid:
+                uploads[i][1].close()
+        for position, i in enumerate(valid):
+            artifacts[i] = batch_artifacts[position]
+            if artifacts[i] is None:
+                results[i]['error'] = batch_errors.get(position, 'Could not extract text from PDF')
+        parsed = [i for i in valid if artifacts[i] is not None]
+        
+        # Scrape each distinct keyword set once and pool the jobs for all resumes
+        keyword_sets = list(dict.fromkeys(artifacts[i]['keywords'] for i in parsed))
+        logger.info(f"🌐 Scraping jobs for {len(keyword_sets)} distinct keyword sets...")
+        with ThreadPoolExecutor(max_workers=max(1, min(len(keyword_sets), BATCH_SCRAPE_PARALLELISM))) as executor:
+            scraped = list(executor.map(lambda keywords: scrape_all_job_sites('', keywords=keywords), keyword_sets))
+        
+        jobs = [job for job_list in scraped for job in job_list]
+        if JOB_DEDUP:
+            jobs = collapse_duplicate_jobs(jobs)
+        else:
+            # Still drop the identical listings that overlapping keyword sets find
+            unique_jobs = {}
+            for job in jobs:
+                unique_jobs.setdefault(normalize_job(job)[0], job)
+            jobs = list(unique_jobs.values())
         
-        time.sleep(1)
+        logger.info(f"🤖 Ranking {len(jobs)} jobs for {len(parsed)} CVs...")
+        rankings = rank_jobs_for_resumes([artifacts[i]['embedding'] for i in parsed], jobs, top_k=top_k, **filters)
         
-        print("🌐 Scraping more LinkedIn...")
+        for i, ranked in zip(parsed, rankings):
+            results[i]['keywords_used'] = artifacts[i]['keywords']
+            results[i]['matched_jobs'] = ranked
+        
+        logger.info(f"🚀 Returning matches for {len(parsed)} of {len(resume_files)} CVs")
+        
+        return jsonify({
+            'results': results,
+            'total_resumes': len(resume_files),
+            'total_jobs_analyzed': len(jobs)
+        })
+        
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Request body is larger than {app.config["MAX_CONTENT_LENGTH"]} bytes'}), 413
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+def positive_int(data, name, default, maximum=None):
+    """A positive integer field of a JSON body, capped at maximum; raises ValueError for anything else."""
+    value = data.get(name, default)
+    try:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a positive integer') from None
+    if value < 1:
+        raise ValueError(f'{name} must be a positive integer')
+    return min(value, maximum) if maximum is not None else value
+
+def more_ranked_jobs(cursor, per_page, deadline=None):
+    """Response for /more-jobs with a cursor from /match-jobs (or from an earlier page)."""
+    try:
+        session_id, offset = decode_cursor(cursor)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    logger.info(f"🔍 Fetching ranked jobs {offset + 1}-{offset + per_page} of a result session")
+    page = result_session_page(session_id, offset, per_page, deadline)
+    if page is None:
+        # Expired or evicted: the client can start over
+        return jsonify({'error': 'Result session expired, please match your CV again', 'expired': True}), 410
+    jobs, next_cursor, total = page
+    logger.info(f"✅ Returning {len(jobs)} more jobs")
+    return jsonify({
+        'jobs': jobs,
+        'per_page': per_page,
+        'total_jobs': total,
+        'has_more': next_cursor is not None,
+        'cursor': next_cursor
+    })
+
+@app.route('/more-jobs', methods=['POST'])
+def get_more_jobs():
+    """
+    API endpoint to get more jobs: the next ranked page of a /match-jobs result
+    session for a cursor, or unranked jobs for keywords and a page number.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'A cursor or keywords are required'}), 400
         try:
-            linkedin_results = scrape_linkedin_jobs(keywords, per_page // 3)
-            all_jobs.extend(linkedin_results)
-        except Exception as e:
-            print(f"❌ LinkedIn failed: {e}")
+            per_page = positive_int(data, 'per_page', 20, maximum=MORE_JOBS_MAX_PER_PAGE)
+            page = positive_int(data, 'page', 1)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if data.get('cursor'):
+            return more_ranked_jobs(data['cursor'], per_page, request_deadline(data))
+        if 'keywords' not in data:
+            return jsonify({'error': 'A cursor or keywords are required'}), 400
+        
+        keywords = data['keywords']
+        
+        logger.info(f"🔍 Fetching more jobs for keywords: {keywords} (Page {page})")
         
-        # Simple pagination simulation (in real app, you'd cache results)
         start_idx = (page - 1) * per_page
         end_idx = start_idx + per_page
+        
+        # Each source returns one results page, so scrape it deep enough to cover
+        # several pages at once; later pages are then slices of the cached listings
+        depth = max(-(-end_idx // len(JOB_SOURCES)), MORE_JOBS_SCRAPE_DEPTH)
+        all_jobs = scrape_sources(keywords, depth)
         paginated_jobs = all_jobs[start_idx:end_idx]
         
-        print(f"✅ Returning {len(paginated_jobs)} more jobs")
+        logger.info(f"✅ Returning {len(paginated_jobs)} more jobs")
         
         return jsonify({
             'jobs': paginated_jobs,
@@ -685,142 +2034,153 @@ def get_more_jobs():
         })
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        logger.error(f"❌ Error: {str(e)}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 @app.route('/job-details/<job_id>', methods=['GET'])
 def get_job_details(job_id):
     """API endpoint to get detailed information about a specific job."""
     try:
-        # Extract source from job_id (e.g., "bdjobs_1" -> "bdjobs")
-        source = job_id.split('_')[0].lower()
-        
-        # Generate detailed information based on source
-        if source == 'bdjobs':
-            job_details = {
-                'id': job_id,
-                'detailed_description': f"This position offers an excellent opportunity to work with a leading technology company in Bangladesh. You'll be part of a dynamic team working on cutting-edge projects that impact thousands of users. The role involves developing scalable solutions, collaborating with cross-functional teams, and contributing to the company's digital transformation initiatives.",
-                'company_info': f"A prominent technology company in Bangladesh with over 5 years of experience in delivering innovative software solutions. Known for fostering a collaborative work environment and investing in employee growth and development.",
-                'benefits': [
-                    "Competitive salary package (40,000 - 80,000 BDT)",
-                    "Comprehensive health insurance for employee & family",
-                    "Flexible working hours & remote work options",
-                    "Annual performance bonuses & salary reviews",
-                    "Professional development budget (20,000 BDT/year)",
-                    "Festival bonuses (2 bonuses per year)",
-                    "Friendly work environment & team building activities"
-                ],
-                'skills_required': [
-                    "Strong programming skills in relevant technologies",
-                    "Problem-solving and analytical thinking",
-                    "Team collaboration and communication skills",
-                    "Ability to work in agile development environment",
-                    "Continuous learning mindset and adaptability"
-                ],
-                'employment_type': "Full-time",
-                'experience_level': "Mid to Senior level (2-5 years)",
-                'source': 'BDJobs',
-                'posted_date': "Posted within last 7 days",
-                'application_deadline': "Open until filled"
-            }
-        elif source == 'linkedin':
-            job_details = {
-                'id': job_id,
-                'detailed_description': f"Join a forward-thinking organization that values innovation, creativity, and professional growth. This role offers the opportunity to work on challenging projects while developing your career in a supportive environment. You'll collaborate with talented professionals and contribute to meaningful business outcomes.",
-                'company_info': f"A growing company focused on leveraging technology to solve real-world problems. We pride ourselves on maintaining a culture of innovation, respect, and continuous improvement.",
-                'benefits': [
-                    "Competitive compensation package",
-                    "Comprehensive health and dental insurance",
-                    "Flexible work arrangements",
-                    "Professional development opportunities",
-                    "Employee stock options (if applicable)",
-                    "Modern office facilities",
-                    "Work-life balance initiatives"
-                ],
-                'skills_required': [
-                    "Technical expertise in relevant domains",
-                    "Strong communication and interpersonal skills",
-                    "Project management capabilities",
-                    "Innovation and creative thinking",
-                    "Leadership potential and team collaboration"
-                ],
-                'employment_type': "Full-time",
-                'experience_level': "Mid to Senior level",
-                'source': 'LinkedIn',
-                'posted_date': "Recently posted",
-                'application_deadline': "Apply soon for consideration"
-            }
-        elif source == 'indeed':
-            job_details = {
-                'id': job_id,
-                'detailed_description': f"Excellent opportunity to join a reputable organization that offers career advancement, competitive compensation, and a positive work environment. The successful candidate will contribute to important projects while developing professionally and personally.",
-                'company_info': f"An established company with a strong reputation in the industry. We are committed to employee satisfaction, innovation, and delivering quality results for our clients and stakeholders.",
-                'benefits': [
-                    "Attractive salary package",
-                    "Health insurance coverage",
-                    "Paid time off and vacation days",
-                    "Training and skill development programs",
-                    "Employee recognition programs",
-                    "Collaborative work environment",
-                    "Career advancement opportunities"
-                ],
-                'skills_required': [
-                    "Relevant technical and professional skills",
-                    "Strong work ethic and reliability",
-                    "Effective communication abilities",
-                    "Adaptability to changing requirements",
-                    "Commitment to quality and excellence"
-                ],
-                'employment_type': "Full-time",
-                'experience_level': "Entry to Senior level",
-                'source': 'Indeed',
-                'posted_date': "Recently posted",
-                'application_deadline': "Open for applications"
-            }
-        else:
-            # Generic details for unknown sources
-            job_details = {
-                'id': job_id,
-                'detailed_description': f"This is a comprehensive job opportunity that requires technical expertise and professional skills. The role involves working with modern technologies and collaborating with experienced teams to deliver high-quality solutions.",
-                'company_info': f"A technology-focused company committed to innovation and employee development. We offer a dynamic work environment with opportunities for professional growth.",
-                'benefits': [
-                    "Competitive salary package",
-                    "Health insurance coverage",
-                    "Flexible working arrangements",
-                    "Professional development opportunities",
-                    "Performance-based bonuses",
-                    "Supportive work environment"
-                ],
-                'skills_required': [
-                    "Technical expertise in relevant technologies",
-                    "Problem-solving abilities",
-                    "Team collaboration skills",
-                    "Communication skills",
-                    "Learning and adaptation mindset"
-                ],
-                'employment_type': "Full-time",
-                'experience_level': "Mid level",
-                'source': source.title(),
-                'posted_date': "Recently posted",
-                'application_deadline': "Apply soon"
-            }
+        # The source defaults to the job_id prefix (e.g. "bdjobs_1" -> "bdjobs")
+        return jsonify(build_job_details(job_id, job_source(job_id, request.args.get('source'))))
         
-        return jsonify(job_details)
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+@app.route('/job-details/batch', methods=['POST'])
+def get_job_details_batch():
+    """
+    API endpoint to get the details of many jobs at once. Takes job_ids, each a
+    job id or a {"id", "source"} object; returns the details keyed by job id.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('job_ids'), list):
+            return jsonify({'error': 'job_ids must be a list'}), 400
+        job_ids = data['job_ids']
+        if len(job_ids) > JOB_DETAILS_BATCH_MAX:
+            return jsonify({'error': f'At most {JOB_DETAILS_BATCH_MAX} job_ids per request'}), 400
+        
+        details, invalid = {}, []
+        for item in job_ids:
+            job_id, source = (item.get('id'), item.get('source')) if isinstance(item, dict) else (item, None)
+            if not isinstance(job_id, str) or not job_id or not isinstance(source, (str, type(None))):
+                invalid.append(item)
+                continue
+            details[job_id] = build_job_details(job_id, job_source(job_id, source))
+        
+        return jsonify({'job_details': details, 'invalid': invalid})
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        logger.error(f"❌ Error: {str(e)}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
+@app.route('/http-stats', methods=['GET'])
+def http_stats():
+    """Per-host connection reuse and retry counters for the scraper HTTP client."""
+    return jsonify(http_client.stats())
+
+@app.route('/scraper-health', methods=['GET'])
+def scraper_health():
+    """Circuit breaker state, adaptive timeout and p95 latency of every job source."""
+    return jsonify({name: source_breakers.get(name).stats() for name, _ in JOB_SOURCES})
+
+@app.route('/pdf-stats', methods=['GET'])
+def pdf_stats():
+    """Document, timeout and worker recycling counters for the PDF parser process pool."""
+    if pdf_pool is None:
+        return jsonify({'process_pool': False})
+    return jsonify(dict(pdf_pool.stats(), process_pool=True))
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss and size statistics for the in-process caches."""
+    stats = {'scrape': scrape_cache.stats(), 'resumes': resume_cache.stats(), 'result_sessions': result_sessions.stats()}
+    if job_embedding_store is not None:
+        stats['job_embeddings'] = job_embedding_store.stats()
+    return jsonify(stats)
+
+@app.route('/refresh-stats', methods=['GET'])
+def refresh_stats():
+    """Popular keyword sets and refresh counters for the background refresh scheduler."""
+    if refresh_scheduler is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(refresh_scheduler.stats(), enabled=True))
+
+@app.route('/embedding-stats', methods=['GET'])
+def embedding_stats():
+    """Embedding backend plus batch size and queue statistics for the embedding micro-batcher."""
+    backend = {'backend': EMBEDDING_BACKEND, 'model': EMBEDDING_MODEL_NAME, 'model_version': EMBEDDING_MODEL_VERSION}
+    if embedding_batcher is None:
+        return jsonify(dict(backend, batching=False))
+    return jsonify(dict(embedding_batcher.stats(), batching=True, **backend))
+
+metrics.callback('ml_engine_model_ready', 'Whether the embedding model is loaded and warmed up',
+                 lambda: int(model_loader.ready))
+metrics.callback('ml_engine_embedding_queue_requests', 'Encode requests waiting for the micro-batcher',
+                 lambda: embedding_batcher.stats()['queued_requests'] if embedding_batcher is not None else 0)
+metrics.callback('ml_engine_pdf_busy_workers', 'PDF parser processes currently parsing a document',
+                 lambda: pdf_pool.stats()['busy_workers'] if pdf_pool is not None else 0)
+metrics.callback('ml_engine_cache_hits_total', 'In-process cache hits', lambda: {
+    ('scrape',): scrape_cache.stats()['hits'], ('resumes',): resume_cache.stats()['hits']
+}, kind='counter', labelnames=['cache'])
+metrics.callback('ml_engine_cache_misses_total', 'In-process cache misses', lambda: {
+    ('scrape',): scrape_cache.stats()['misses'], ('resumes',): resume_cache.stats()['misses']
+}, kind='counter', labelnames=['cache'])
+metrics.callback('ml_engine_keyword_refreshes_total', 'Background refreshes of popular keyword sets by outcome',
+                 lambda: {('success',): refresh_scheduler.stats()['refreshed'], ('failure',): refresh_scheduler.stats()['failed']}
+                 if refresh_scheduler is not None else {}, kind='counter', labelnames=['outcome'])
+metrics.callback('ml_engine_source_circuit_state', 'Scraper circuit breaker state per source (0 closed, 1 half-open, 2 open)',
+                 lambda: {(name,): {'closed': 0, 'half_open': 1, 'open': 2}[stats['state']]
+                          for name, stats in source_breakers.stats().items()}, labelnames=['source'])
+metrics.callback('ml_engine_source_timeout_seconds', 'Adaptive request timeout per source',
+                 lambda: {(name,): stats['timeout_seconds'] for name, stats in source_breakers.stats().items()},
+                 labelnames=['source'])
+metrics.callback('ml_engine_log_records_dropped_total', 'Log records dropped because the log queue was full',
+                 lambda: queue_logging.dropped if queue_logging is not None else 0, kind='counter')
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency histograms, per-source scrape counters and cache/queue gauges in the Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'model_loaded': model is not None})
+    """Health check endpoint with separate liveness and readiness, plus model load timings."""
+    model_status = model_loader.status()
+    return jsonify({
+        'status': 'healthy',
+        'live': True,
+        'ready': model_status['ready'],
+        'model_loaded': model_status['loaded'],
+        'embedding_backend': EMBEDDING_BACKEND,
+        'model': model_status
+    })
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process is up and serving HTTP."""
+    return jsonify({'live': True})
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: 200 only once the model is loaded and warmed up."""
+    model_status = model_loader.status()
+    return jsonify({'ready': model_status['ready'], 'model': model_status}), 200 if model_status['ready'] else 503
 
 if __name__ == '__main__':
-    print("🚀 Starting AI-Powered Job Matching Engine with Web Scraping...")
-    print("📚 Loading sentence transformer model...")
-    # The model is already loaded above
-    print("✅ Model loaded successfully!")
-    print("🌐 Web scraping enabled for BDJobs, Indeed, and LinkedIn")
-    print("🎯 Starting Flask server on http://localhost:5000")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app()
+    logger.info("🚀 Starting AI-Powered Job Matching Engine with Web Scraping...")
+    logger.info(f"📚 Loading {EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND} backend) in the background (see /health/ready)...")
+    model_loader.start_background()
+    if refresh_scheduler is not None:
+        refresh_scheduler.start()
+        logger.info(f"🔄 Refreshing the {REFRESH_TOP_N} most popular keyword sets every {REFRESH_INTERVAL:.0f}s")
+    logger.info("🌐 Web scraping enabled for BDJobs, Indeed, and LinkedIn")
+    logger.info("🎯 Starting Flask server on http://localhost:5000")
+    logger.info("ℹ️ For production use `python serve.py` (multiple workers sharing one model copy)")
+    # The debug reloader re-imports this module in a child process and loads the model twice,
+    # so it is opt-in via FLASK_RELOAD
+    use_reloader = os.environ.get('FLASK_RELOAD', 'false').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=use_reloader)
@@ -0,0 +1,318 @@
+# Bounded text extraction from uploaded PDF CVs.
+# Uploads are spooled to disk past a memory threshold and pages are parsed one
+# at a time, stopping as soon as the page or character budget is spent, so a
+# huge or very long document costs no more than a normal CV.
+# PdfWorkerPool runs the parsing in separate processes with a hard timeout and
+# memory limit, so a hostile PDF cannot stall the request-serving process. An
+# upload spooled to disk is opened by the worker from its path; only small
+# in-memory uploads are sent through the pipe.
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process memory limit
+    resource = None
+
+logger = logging.getLogger('ml_engine')
+
+
+class PDFExtractionError(Exception):
+    """A PDF upload was rejected before or during text extraction."""
+
+
+class PDFTooLargeError(PDFExtractionError):
+    pass
+
+
+class PDFTimeoutError(PDFExtractionError):
+    pass
+
+
+def spool_upload(stream, max_bytes, memory_bytes=1024 * 1024, chunk_size=64 * 1024):
+    """
+    Copies an upload stream into a temporary file and hashes it on the way.
+
+    The copy stays in memory up to memory_bytes and moves to a named temporary
+    file beyond that (see spooled_path()). Raises PDFTooLargeError once more
+    than max_bytes have been read. Returns (sha256 hex digest, file positioned
+    at the start); the caller closes the file, which also deletes it from disk.
+    """
+    spooled = io.BytesIO()
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise PDFTooLargeError(f'PDF is larger than the {max_bytes / (1024 * 1024):g} MB upload limit')
+            digest.update(chunk)
+            if size > memory_bytes and isinstance(spooled, io.BytesIO):
+                on_disk = tempfile.NamedTemporaryFile(prefix='upload-', suffix='.pdf')
+                on_disk.write(spooled.getvalue())
+                spooled = on_disk
+            spooled.write(chunk)
+        spooled.flush()
+    except Exception:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return digest.hexdigest(), spooled
+
+
+def spooled_path(pdf_file):
+    """Path another process can open pdf_file from, or None if it only exists in this process's memory."""
+    name = getattr(pdf_file, 'name', None)
+    # Windows does not let other processes open a delete-on-close temporary file
+    if os.name != 'posix' or not isinstance(name, str) or not os.path.isfile(name):
+        return None
+    if pdf_file.writable():
+        pdf_file.flush()
+    return name
+
+
+class PdfExtraction:
+    """Text extracted from a PDF plus how much of the document it covers and how long each page took."""
+
+    __slots__ = ('text', 'total_pages', 'pages_read', 'truncated', 'page_seconds')
+
+    def __init__(self, text='', total_pages=0, pages_read=0, truncated=False, page_seconds=()):
+        self.text = text
+        self.total_pages = total_pages
+        self.pages_read = pages_read
+        self.truncated = truncated
+        self.page_seconds = list(page_seconds)
+
+    def summary(self):
+        slowest = max(range(len(self.page_seconds)), key=self.page_seconds.__getitem__) if self.page_seconds else None
+        return {
+            'characters': len(self.text),
+            'total_pages': self.total_pages,
+            'pages_read': self.pages_read,
+            'truncated': self.truncated,
+            'extract_ms': round(sum(self.page_seconds) * 1000, 1),
+            'page_ms': [round(seconds * 1000, 1) for seconds in self.page_seconds],
+            'slowest_page': slowest + 1 if slowest is not None else None
+        }
+
+
+def extract_pdf(pdf_file, max_pages=10, max_chars=30000):
+    """
+    Extracts text from a PDF file object page by page.
+
+    Pages are only parsed while both budgets last: extraction stops after
+    max_pages pages or once max_chars characters have been collected, and the
+    text is cut to max_chars. Page texts are gathered in a list and joined once.
+    A page that fails to parse is skipped; a document that cannot be opened
+    yields an empty extraction.
+    """
+    import PyPDF2
+
+    try:
+        reader = PyPDF2.PdfReader(pdf_file)
+        total_pages = len(reader.pages)
+    except MemoryError:
+        raise
+    except Exception as e:
+        logger.warning(f"⚠️ Could not open PDF: {e}")
+        return PdfExtraction()
+
+    parts = []
+    page_seconds = []
+    chars = 0
+    for page_number in range(min(total_pages, max_pages)):
+        start = time.perf_counter()
+        try:
+            page_text = reader.pages[page_number].extract_text() or ''
+        except MemoryError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Skipping PDF page {page_number + 1}: {e}")
+            page_text = ''
+        page_seconds.append(time.perf_counter() - start)
+        parts.append(page_text)
+        chars += len(page_text)
+        if chars >= max_chars:
+            break
+
+    text = '\n'.join(parts).strip()
+    truncated = len(page_seconds) < total_pages or len(text) > max_chars
+    return PdfExtraction(text[:max_chars], total_pages, len(page_seconds), truncated, page_seconds)
+
+
+def _worker_main(conn, memory_limit_bytes, max_pages, max_chars):
+    """Parser process: extracts each PDF received on conn until the pipe is closed."""
+    if resource is not None and memory_limit_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    import PyPDF2  # noqa: F401 (imported up front so the first document is not slower)
+    conn.send(('ready', None))
+    while True:
+        try:
+            # The path of a spooled upload, or the bytes of one held in memory
+            document = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            if isinstance(document, str):
+                with open(document, 'rb') as pdf_file:
+                    extraction = extract_pdf(pdf_file, max_pages=max_pages, max_chars=max_chars)
+            else:
+                extraction = extract_pdf(io.BytesIO(document), max_pages=max_pages, max_chars=max_chars)
+            conn.send(('ok', (extraction.text, extraction.total_pages, extraction.pages_read,
+                              extraction.truncated, extraction.page_seconds)))
+        except MemoryError:
+            conn.send(('memory', 'PDF needs more memory than the parser is allowed to use'))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _PdfWorker:
+    # Starting a process is not charged to the per-document timeout, but has its own limit
+    START_TIMEOUT = 60
+
+    def __init__(self, context, args):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,) + args, name='pdf-worker', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.documents = 0
+        try:
+            ready = self.conn.poll(self.START_TIMEOUT) and self.conn.recv()[0] == 'ready'
+        except EOFError:
+            ready = False
+        if not ready:
+            self.stop(kill=True)
+            raise PDFExtractionError('PDF parser process failed to start')
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        self.conn.close()  # a healthy worker exits when its pipe closes
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class PdfWorkerPool:
+    """
+    Parses PDFs in a small pool of separate processes.
+
+    Each document is sent to an idle worker, which must answer within timeout
+    seconds or is killed (only that worker; the others keep running) and the
+    call raises PDFTimeoutError. Workers run under an address-space limit of
+    memory_limit_mb where the platform supports it, and are replaced after
+    max_documents documents so that slow leaks never accumulate. Processes are
+    spawned lazily, per server process, on first use.
+    """
+
+    def __init__(self, workers=2, timeout=15.0, memory_limit_mb=512, max_documents=50,
+                 max_pages=10, max_chars=30000, start_method='spawn'):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_documents = max_documents
+        self._context = multiprocessing.get_context(start_method)
+        self._worker_args = (memory_limit_mb * 1024 * 1024 if memory_limit_mb else 0, max_pages, max_chars)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._idle = None
+        self._documents = 0
+        self._timeouts = 0
+        self._failures = 0
+        self._started = 0
+        self._recycled = 0
+
+    def _idle_workers(self):
+        # Worker processes belong to the process that started them; a forked
+        # server worker starts its own
+        with self._lock:
+            if self._pid != os.getpid():
+                self._idle = queue.Queue()
+                for _ in range(self.workers):
+                    self._idle.put(None)
+                self._pid = os.getpid()
+            return self._idle
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def extract(self, pdf_file):
+        """
+        Returns the PdfExtraction for a PDF file object. Raises PDFTimeoutError
+        if parsing takes longer than the timeout and PDFExtractionError if the
+        parser runs out of memory or dies.
+        """
+        document = spooled_path(pdf_file)
+        if document is None:
+            # Small uploads are spooled in memory, so this copy stays bounded
+            pdf_file.seek(0)
+            document = pdf_file.read()
+
+        idle = self._idle_workers()
+        worker = idle.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = _PdfWorker(self._context, self._worker_args)
+                self._count('_started')
+
+            worker.conn.send(document)
+            if not worker.conn.poll(self.timeout):
+                worker.stop(kill=True)
+                worker = None
+                self._count('_timeouts')
+                raise PDFTimeoutError(f'PDF parsing took longer than {self.timeout:g} seconds')
+            try:
+                status, payload = worker.conn.recv()
+            except EOFError:
+                worker.stop(kill=True)
+                worker = None
+                self._count('_failures')
+                raise PDFExtractionError('PDF parser stopped unexpectedly')
+
+            self._count('_documents')
+            worker.documents += 1
+            if status == 'memory' or worker.documents >= self.max_documents:
+                worker.stop(kill=status == 'memory')
+                worker = None
+                self._count('_recycled')
+            if status != 'ok':
+                self._count('_failures')
+                raise PDFExtractionError(payload)
+            return PdfExtraction(*payload)
+        except PDFExtractionError:
+            raise
+        except BaseException:
+            # The worker is in an unknown state (e.g. the pipe broke mid-send)
+            if worker is not None:
+                worker.stop(kill=True)
+                worker = None
+            raise
+        finally:
+            idle.put(worker)
+
+    def stats(self):
+        with self._lock:
+            idle = self._idle.qsize() if self._idle is not None and self._pid == os.getpid() else self.workers
+            return {
+                'workers': self.workers,
+                'busy_workers': self.workers - idle,
+                'timeout_seconds': self.timeout,
+                'max_documents_per_worker': self.max_documents,
+                'documents': self._documents,
+                'timeouts': self._timeouts,
+                'failures': self._failures,
+                'workers_started': self._started,
+                'workers_recycled': self._recycled
+            }
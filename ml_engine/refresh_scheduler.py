@@ -0,0 +1,206 @@
+# Background refresh of the listings for popular keyword sets.
+#
+# Most CVs map to a handful of keyword sets ("python django", "react
+# javascript"). The scheduler counts how often each set is scraped and, every
+# interval, re-scrapes and re-embeds the most requested ones, so their scrape
+# cache entries never expire and their job embeddings are already stored:
+# requests for them skip the outbound scrape entirely. A cache entry that did
+# go stale is still served while revalidate() refreshes it in the background
+# (stale-while-revalidate).
+#
+# Refreshes run on their own small thread pool (the concurrency budget), so
+# they never take a slot in the request scraper pool. Each process runs its own
+# scheduler and only counts its own traffic.
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('ml_engine')
+
+
+class PopularKeywords:
+    """
+    Decayed request counts per keyword set.
+
+    decay() multiplies every count by the decay factor (once per refresh
+    cycle), so popularity follows recent traffic. At most max_tracked sets are
+    kept; the least requested one is forgotten to make room for a new one.
+    """
+
+    def __init__(self, max_tracked=1000, decay=0.5):
+        self.max_tracked = max_tracked
+        self.decay_factor = decay
+        self._lock = threading.Lock()
+        # key -> [count, keywords as last requested, deepest depth requested]
+        self._entries = {}
+
+    def record(self, key, keywords, depth):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_tracked:
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+                entry = self._entries[key] = [0.0, keywords, depth]
+            entry[0] += 1
+            entry[1] = keywords
+            entry[2] = max(entry[2], depth)
+
+    def top(self, n, min_count=1.0):
+        """[(keywords, depth)] of the n most requested sets with a count of at least min_count."""
+        with self._lock:
+            ranked = sorted(self._entries.values(), key=lambda entry: -entry[0])
+        return [(keywords, depth) for count, keywords, depth in ranked[:n] if count >= min_count]
+
+    def decay(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._entries[key][0] *= self.decay_factor
+                if self._entries[key][0] < 0.05:
+                    del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RefreshScheduler:
+    """
+    Periodically refreshes the most popular keyword sets.
+
+    refresh_fn(keywords, depth) re-scrapes and re-embeds one set;
+    needs_refresh(keywords, depth), if given, lets a cycle skip sets whose data
+    is still fresh enough; key_fn(keywords) maps keyword strings that scrape
+    the same listings to one key. At most max_concurrent refreshes run at a
+    time and at most max_pending wait for a thread.
+
+    start() must be called in the process that serves requests (after a
+    pre-fork server has forked), since threads do not survive a fork.
+    """
+
+    def __init__(self, refresh_fn, interval=600, top_n=20, min_requests=2, max_concurrent=1, max_pending=64,
+                 needs_refresh=None, key_fn=None):
+        self.refresh_fn = refresh_fn
+        self.interval = interval
+        self.top_n = top_n
+        self.min_requests = min_requests
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.needs_refresh = needs_refresh
+        self.key_fn = key_fn or (lambda keywords: keywords)
+        self.popular = PopularKeywords()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._executor = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._cycles = 0
+        self._refreshed = 0
+        self._failed = 0
+        self._skipped_fresh = 0
+        self._dropped = 0
+        self._revalidations = 0
+        self._last_cycle_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Starts the scheduler thread and the refresh pool (no-op if already running)."""
+        if self.running:
+            return
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='refresh')
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._thread = None
+
+    def record(self, keywords, depth):
+        """Counts one request that scraped keywords depth jobs deep."""
+        self.popular.record(self.key_fn(keywords), keywords, depth)
+
+    def _submit(self, keywords, depth):
+        key = self.key_fn(keywords)
+        with self._lock:
+            if key in self._pending:
+                return True
+            if not self.running or len(self._pending) >= self.max_pending:
+                self._dropped += 1
+                return False
+            self._pending.add(key)
+        self._executor.submit(self._refresh, key, keywords, depth)
+        return True
+
+    def _refresh(self, key, keywords, depth):
+        start = time.perf_counter()
+        try:
+            self.refresh_fn(keywords, depth)
+            with self._lock:
+                self._refreshed += 1
+            logger.info(f"🔄 Refreshed '{keywords}' ({depth} per source) in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+            logger.warning(f"⚠️ Refresh of '{keywords}' failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def revalidate(self, keywords, depth):
+        """
+        Schedules a background refresh of one keyword set, e.g. after serving
+        stale listings for it. Returns False if it cannot be scheduled (the
+        scheduler is not running or too many refreshes are waiting).
+        """
+        scheduled = self._submit(keywords, depth)
+        if scheduled:
+            with self._lock:
+                self._revalidations += 1
+        return scheduled
+
+    def run_cycle(self):
+        """Schedules a refresh of every popular set that needs one, then decays the request counts."""
+        for keywords, depth in self.popular.top(self.top_n, self.min_requests):
+            if self.needs_refresh is not None and not self.needs_refresh(keywords, depth):
+                with self._lock:
+                    self._skipped_fresh += 1
+                continue
+            self._submit(keywords, depth)
+        self.popular.decay()
+        with self._lock:
+            self._cycles += 1
+            self._last_cycle_at = time.time()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_cycle()
+            except Exception as e:
+                logger.error(f"❌ Refresh cycle failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': self.running,
+                'interval_seconds': self.interval,
+                'top_n': self.top_n,
+                'min_requests': self.min_requests,
+                'max_concurrent': self.max_concurrent,
+                'tracked_keyword_sets': len(self.popular),
+                'popular': [keywords for keywords, _ in self.popular.top(self.top_n, self.min_requests)],
+                'pending': len(self._pending),
+                'cycles': self._cycles,
+                'last_cycle_at': self._last_cycle_at,
+                'refreshed': self._refreshed,
+                'failed': self._failed,
+                'skipped_fresh': self._skipped_fresh,
+                'revalidations': self._revalidations,
+                'dropped': self._dropped
+            }
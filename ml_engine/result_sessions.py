@@ -0,0 +1,303 @@
+# Server-side ranked result sessions for paginating live matches.
+#
+# /match-jobs keeps the CV embedding and every candidate's score in a
+# RankedResults and hands the client an opaque cursor (session id + offset).
+# /more-jobs turns the cursor back into a slice of the ranking, so a page costs
+# O(page) instead of a re-scrape and re-rank. Candidates scraped later for
+# deeper pages are scored on their own and merged into the existing order;
+# jobs on pages already served keep their positions, so a new job that scores
+# higher than those goes to the top of the next page instead of shifting the
+# offsets of the client's cursor. Only the unserved part of the order is kept
+# sorted by score, so new jobs are merged into that part alone.
+#
+# Sessions are kept in SQLite (ResultSessionStore), so a cursor works in
+# whichever worker process of a pre-forked server the next request reaches.
+
+import base64
+import pickle
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from job_index import JobTable, normalize_job, normalize_rows
+from sqlite_db import ThreadLocalConnections
+
+
+def encode_cursor(session_id, offset):
+    return base64.urlsafe_b64encode(f'{session_id}:{offset}'.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (session_id, offset) for a cursor from encode_cursor(); raises ValueError if it is malformed."""
+    if not isinstance(cursor, str):
+        raise ValueError('malformed cursor')
+    decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    session_id, offset = decoded.rsplit(':', 1)
+    offset = int(offset)
+    if not session_id or offset < 0:
+        raise ValueError('malformed cursor')
+    return session_id, offset
+
+
+class RankedResults:
+    """
+    Candidate jobs ranked against one CV, in descending score order.
+
+    filters (sources, location, min_score) are applied as jobs are added, so
+    order only holds the jobs that pass them. deduplicator is the
+    JobDeduplicator that has seen every job added so far (None when
+    deduplication is off); seen_keys holds the exact listing keys either way.
+    Instances are not thread-safe: sessions in a ResultSessionStore are only
+    changed through its page() and release().
+    """
+
+    def __init__(self, resume_embedding, keywords, filters=None, depth=0, deduplicator=None):
+        self.resume_vector = normalize_rows(np.atleast_2d(resume_embedding))[0]
+        self.keywords = keywords
+        self.filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        # Jobs per source scraped so far; exhausted once scraping deeper found nothing new
+        self.depth = depth
+        self.exhausted = False
+        self.deduplicator = deduplicator
+        self.seen_keys = set()
+        self.jobs = []
+        self.scores = np.zeros(0, dtype=np.float32)
+        self.order = np.zeros(0, dtype=np.int64)
+        # Ranked jobs handed out by page() so far; add() never moves them, and order[served:] is
+        # sorted by descending score
+        self.served = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def add(self, jobs, embeddings):
+        """
+        Scores jobs (with their embeddings) against the CV and merges those
+        passing the filters into the ranking without re-sorting it. Returns the
+        number of jobs that entered the ranking.
+        """
+        if not jobs:
+            return 0
+        table = JobTable(jobs, embeddings)
+        scores = table.score(self.resume_vector).astype(np.float32)
+        selected = np.flatnonzero(table.mask(**self.filters))
+        new_order = selected[np.argsort(-scores[selected], kind='stable')] + len(self.jobs)
+
+        self.scores = np.concatenate([self.scores, scores])
+        # The unserved tail and new_order are both sorted by descending score, so one binary
+        # search per new job merges them (the served head is not sorted once jobs were added)
+        tail = self.order[self.served:]
+        positions = self.served + np.searchsorted(-self.scores[tail], -self.scores[new_order], side='right')
+        self.order = np.insert(self.order, positions, new_order)
+        self.jobs.extend(jobs)
+        for job in jobs:
+            self.seen_keys.add(normalize_job(job)[0])
+        return len(new_order)
+
+    def page(self, offset, limit):
+        """Copies of the ranked jobs offset .. offset + limit with similarity scores, best first."""
+        ranked = []
+        for i in self.order[offset:offset + limit]:
+            job = dict(self.jobs[i])
+            job['similarity_score'] = round(float(self.scores[i]) * 100, 1)
+            ranked.append(job)
+        self.served = max(self.served, offset + len(ranked))
+        return ranked
+
+    def has_more(self, offset):
+        """Whether jobs beyond offset are ranked already or may still be scraped."""
+        return offset < len(self.order) or not self.exhausted
+
+
+class ResultSessionStore:
+    """
+    SQLite store of RankedResults shared by every worker process.
+
+    Sessions are pickled together with their deduplicator. A session expires
+    ttl seconds after its last page; beyond max_entries sessions or max_bytes
+    of pickles in total, the least recently used ones are dropped. The served
+    offset is a column of its own, so serving a page only updates that.
+
+    A session grows by one request at a time: claim() leases it to the first
+    caller for lease seconds (so a worker that dies while scraping does not
+    block it for good), and release() merges the caller's new jobs into it.
+    """
+
+    def __init__(self, path, max_entries=1000, max_bytes=64 * 1024 * 1024, ttl=1800):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._connections = ThreadLocalConnections(path)
+        self._connection = self._connections.get
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS result_sessions (
+                session_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                served INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                claimed_until REAL NOT NULL
+            )
+            """
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two processes never both read a
+        # session and then overwrite each other's changes to it
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _load(self, connection, session_id):
+        row = connection.execute(
+            "SELECT data, served FROM result_sessions WHERE session_id = ? AND last_used > ?",
+            (session_id, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        results = pickle.loads(row[0])
+        results.served = row[1]
+        return results
+
+    def _prune(self, connection):
+        expired = connection.execute(
+            "DELETE FROM result_sessions WHERE last_used <= ?", (time.time() - self.ttl,)
+        ).rowcount
+        # Keep the most recently used sessions that fit in max_entries and max_bytes
+        evicted = connection.execute(
+            """
+            DELETE FROM result_sessions WHERE session_id IN (
+                SELECT session_id FROM (
+                    SELECT session_id, ROW_NUMBER() OVER recent AS position, SUM(size) OVER recent AS total
+                    FROM result_sessions WINDOW recent AS (ORDER BY last_used DESC ROWS UNBOUNDED PRECEDING)
+                ) WHERE position > ? OR total > ?
+            )
+            """,
+            (self.max_entries, self.max_bytes)
+        ).rowcount
+        with self._lock:
+            self._expirations += expired
+            self._evictions += evicted
+
+    def put(self, session_id, results):
+        """Stores results as session session_id, replacing any session of that id."""
+        data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._transaction() as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO result_sessions (session_id, data, size, served, last_used, claimed_until)
+                VALUES (?, ?, ?, ?, ?, 0)
+                """,
+                (session_id, data, len(data), results.served, time.time())
+            )
+            self._prune(connection)
+
+    def create(self, results):
+        """Stores results as a new session and returns its id."""
+        session_id = secrets.token_urlsafe(16)
+        self.put(session_id, results)
+        return session_id
+
+    def get(self, session_id):
+        """The session's results, or None once it has expired or been evicted."""
+        return self._load(self._connection(), session_id)
+
+    def page(self, session_id, offset, limit):
+        """
+        Returns (jobs, results) for results.page(offset, limit) of a session and
+        records those jobs as served, or None once the session has expired or
+        been evicted.
+        """
+        with self._transaction() as connection:
+            results = self._load(connection, session_id)
+            if results is not None:
+                jobs = results.page(offset, limit)
+                connection.execute(
+                    "UPDATE result_sessions SET served = ?, last_used = ? WHERE session_id = ?",
+                    (results.served, time.time(), session_id)
+                )
+        with self._lock:
+            if results is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return jobs, results
+
+    def claim(self, session_id, lease):
+        """
+        Leases a session to the caller for lease seconds, unless someone else
+        holds it. Returns the lease to pass to release(), or None.
+        """
+        now = time.time()
+        claimed_until = now + lease
+        cursor = self._connection().execute(
+            "UPDATE result_sessions SET claimed_until = ? WHERE session_id = ? AND claimed_until <= ?",
+            (claimed_until, session_id, now)
+        )
+        return claimed_until if cursor.rowcount == 1 else None
+
+    def release(self, session_id, lease, results=None, merge=None):
+        """
+        Ends a lease from claim(). With results (the session as the caller read
+        it after claiming) and merge, merge(results) is called first, in the
+        transaction and once results.served includes the pages served meanwhile,
+        and the merged results are stored. Nothing is stored if the lease ran
+        out in between.
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT served FROM result_sessions WHERE session_id = ? AND claimed_until = ?", (session_id, lease)
+            ).fetchone()
+            if row is None:
+                return
+            if results is None or merge is None:
+                connection.execute("UPDATE result_sessions SET claimed_until = 0 WHERE session_id = ?", (session_id,))
+                return
+            # Only pages were served since the claim, so apart from served the caller's copy is current
+            results.served = max(results.served, row[0])
+            merge(results)
+            data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+            connection.execute(
+                """
+                UPDATE result_sessions SET data = ?, size = ?, served = ?, last_used = ?, claimed_until = 0
+                WHERE session_id = ?
+                """,
+                (data, len(data), results.served, time.time(), session_id)
+            )
+            self._prune(connection)
+
+    def stats(self):
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM result_sessions WHERE last_used > ?",
+            (time.time() - self.ttl,)
+        ).fetchone()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'ttl_seconds': self.ttl
+            }
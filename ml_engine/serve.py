@@ -0,0 +1,93 @@
+# Production entry point for the ML engine.
+# Loads the embedding model once in the gunicorn master process, then forks
+# worker processes that share the model weights copy-on-write instead of each
+# loading their own copy.
+#
+# Usage (Linux/macOS; gunicorn does not run on Windows):
+#   python serve.py --workers 4 --threads 8 --torch-threads 2
+#
+# Every option can also be set through the environment variable shown in --help.
+
+import argparse
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+def default_torch_threads():
+    return int(os.environ.get('TORCH_THREADS_PER_WORKER', '1'))
+
+
+def default_workers(torch_threads):
+    # Enough workers to keep every core busy without oversubscribing torch threads
+    return int(os.environ.get('ML_ENGINE_WORKERS', max(1, (os.cpu_count() or 1) // max(1, torch_threads))))
+
+
+class MLEngineApplication(BaseApplication):
+    """Gunicorn application that preloads match_jobs (and its model) before forking."""
+
+    def __init__(self, options, torch_threads):
+        self.options = options
+        self.torch_threads = torch_threads
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('post_fork', self.post_fork)
+
+    def load(self):
+        print("📚 Loading embedding model in the master process...")
+        import match_jobs
+        app = match_jobs.create_app()
+        # Load without the warm-up encode: running inference here would start torch's
+        # thread pools before fork, which is not fork-safe. Each worker warms up instead.
+        match_jobs.model_loader.load()
+        # Move everything allocated so far out of the GC's reach so that garbage
+        # collection in the workers does not touch (and copy) the shared pages
+        gc.freeze()
+        print("✅ Model loaded, forking workers")
+        return app
+
+    def post_fork(self, server, worker):
+        import match_jobs
+        # Applies to torch or, for the ONNX backends, to the session each worker creates
+        match_jobs.model_loader.load().set_num_threads(self.torch_threads)
+        match_jobs.model_loader.start_background()
+        # Threads do not survive the fork, so each worker runs its own refresh scheduler
+        if match_jobs.refresh_scheduler is not None:
+            match_jobs.refresh_scheduler.start()
+        server.log.info(f"Worker {worker.pid} using {self.torch_threads} intra-op threads")
+
+
+def main():
+    torch_threads = default_torch_threads()
+    parser = argparse.ArgumentParser(description='Run the ML engine with multiple pre-forked workers.')
+    parser.add_argument('--bind', default=os.environ.get('ML_ENGINE_BIND', '0.0.0.0:5000'),
+                        help='Address to listen on (ML_ENGINE_BIND)')
+    parser.add_argument('--workers', type=int, default=default_workers(torch_threads),
+                        help='Worker processes (ML_ENGINE_WORKERS, default: CPU count / torch threads)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('ML_ENGINE_THREADS', '8')),
+                        help='Request threads per worker, mostly waiting on scrapers (ML_ENGINE_THREADS)')
+    parser.add_argument('--torch-threads', type=int, default=torch_threads,
+                        help='Torch / ONNX Runtime intra-op threads per worker (TORCH_THREADS_PER_WORKER)')
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('ML_ENGINE_TIMEOUT', '120')),
+                        help='Seconds before a silent worker is restarted (ML_ENGINE_TIMEOUT)')
+    args = parser.parse_args()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': 'gthread',
+        'threads': args.threads,
+        'timeout': args.timeout,
+        'preload_app': True,
+        'accesslog': '-'
+    }
+    print(f"🚀 Starting ML engine on {args.bind} with {args.workers} workers x {args.threads} threads")
+    MLEngineApplication(options, args.torch_threads).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -48,4 +48,6 @@ fi
 echo "2. Run the ML engine:"
 echo "   python match_jobs.py"
 echo ""
+echo "   (production: python serve.py --workers 4 --torch-threads 2)"
+echo ""
 echo "The ML engine will be available at http://localhost:5000"
@@ -0,0 +1,124 @@
+# Skill taxonomy used to pick job search keywords out of a CV.
+#
+# skill_taxonomy.json lists stop words and, per category, each canonical skill
+# with its synonyms, e.g. "kubernetes": ["k8s"] or "springboot": ["spring boot"].
+# The file is compiled once into a token trie, so matching a CV is a single pass
+# over its tokens no matter how many skills and phrases the taxonomy holds.
+
+import json
+import os
+import re
+
+# Lower-case words that may contain + # and inner dots (c++, node.js, asp.net). Single
+# letters are kept so that phrases such as "r programming" or "c sharp" can match.
+TOKEN_PATTERN = re.compile(r'(?<!\w)[a-z](?:[a-z0-9+#.]*[a-z0-9+#])?')
+
+# Categories that count as words (skills and roles) rather than multi-word phrases.
+# A term listed in several categories belongs to the first one in this order.
+CATEGORY_ORDER = ('technology', 'tech_indicator', 'role', 'phrase')
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillMatches:
+    """Result of matching one text: canonical word counts (first-seen order) and phrases found."""
+
+    __slots__ = ('word_counts', 'phrases')
+
+    def __init__(self, word_counts, phrases):
+        self.word_counts = word_counts
+        self.phrases = phrases
+
+
+class SkillTaxonomy:
+    """
+    Compiled skill taxonomy.
+
+    Every surface form (canonical name or synonym) is split into tokens and
+    inserted into a trie that maps it to its canonical skill. match() walks the
+    CV's tokens once; at each position the trie gives the skill the token itself
+    stands for and the longest multi-word skill or phrase starting there.
+
+    Single-token surface forms shorter than min_token_length are left out, the
+    same as short CV words, so ambiguous skills such as go or r are only found
+    through their synonyms (golang, rstats).
+    """
+
+    def __init__(self, categories, stop_words=(), min_token_length=3):
+        self.stop_words = frozenset(stop_words)
+        self.min_token_length = min_token_length
+        self.categories = {}
+        self._trie = {}
+        self._phrase_order = {}
+
+        for category in CATEGORY_ORDER:
+            for canonical, synonyms in categories.get(category, {}).items():
+                self.categories.setdefault(canonical, category)
+                if self.categories[canonical] == 'phrase':
+                    self._phrase_order.setdefault(canonical, len(self._phrase_order))
+                for surface in [canonical] + list(synonyms):
+                    self._insert(surface, canonical)
+
+    @classmethod
+    def load(cls, path=DEFAULT_TAXONOMY_PATH):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['categories'], data.get('stop_words', ()), data.get('min_token_length', 3))
+
+    def _insert(self, surface, canonical):
+        tokens = tokenize(surface)
+        if not tokens or (len(tokens) == 1 and len(tokens[0]) < self.min_token_length):
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        # The first canonical skill to claim a surface form keeps it
+        node.setdefault(None, canonical)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def category(self, term):
+        """'technology', 'tech_indicator', 'role', 'phrase' or None for words outside the taxonomy."""
+        return self.categories.get(term)
+
+    def match(self, text):
+        """
+        Counts every word of text (stop words and short words excluded, synonyms
+        mapped to their canonical skill) and collects the phrases it mentions,
+        ordered as in the taxonomy.
+        """
+        tokens = tokenize(text)
+        word_counts = {}
+        phrases = set()
+
+        def record(canonical):
+            if self.categories[canonical] == 'phrase':
+                phrases.add(canonical)
+            else:
+                word_counts[canonical] = word_counts.get(canonical, 0) + 1
+
+        for i, token in enumerate(tokens):
+            node = self._trie.get(token)
+
+            if node is not None and None in node:
+                record(node[None])
+            elif len(token) >= self.min_token_length and token not in self.stop_words:
+                word_counts[token] = word_counts.get(token, 0) + 1
+
+            # Longest multi-word skill or phrase starting at this token
+            longest = None
+            j = i + 1
+            while node is not None and j < len(tokens):
+                node = node.get(tokens[j])
+                j += 1
+                if node is not None and None in node:
+                    longest = node[None]
+            if longest is not None:
+                record(longest)
+
+        return SkillMatches(word_counts, sorted(phrases, key=self._phrase_order.get))
@@ -0,0 +1,38 @@
+# Shared SQLite connection handling for the stores under DATA_DIR
+# (EmbeddingStore, JobCorpus, ...), which every request thread and every
+# worker process open concurrently.
+
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalConnections:
+    """
+    One SQLite connection per thread to a database file, in autocommit mode.
+
+    The database runs in WAL mode so readers never block the single writer, and
+    with synchronous=NORMAL, which stays consistent across crashes and only
+    skips an fsync per commit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # SQLite connections must not be shared with forked worker processes
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _reset(self):
+        self._local = threading.local()
+
+    def get(self):
+        """This thread's connection, opened on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,269 @@
+# Metrics and logging for the ML engine.
+#
+# Counters and histograms are kept in process and rendered in the Prometheus
+# text format for the /metrics endpoint; span() times a block of code into a
+# histogram. Log records are handed to a bounded queue and written by a
+# background thread, so request threads never block on a slow stdout.
+#
+# Metrics are per process: under a pre-fork server every worker keeps (and
+# reports) its own numbers.
+
+import atexit
+import functools
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# Seconds; spans range from sub-millisecond keyword extraction to multi-second scrapes
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger('ml_engine')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return self.header() + [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                                for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[2] if series else 0
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class _Callback(_Metric):
+    """A gauge or counter whose current value(s) are read from fn() at render time."""
+
+    def __init__(self, name, help_text, fn, kind='gauge', labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def render(self):
+        try:
+            values = self.fn()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not collect metric {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self.header() + [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                                for key, value in values.items() if value is not None]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, fn, kind='gauge', labelnames=()):
+        """Registers a metric read from fn(): a number, or a dict of label-value tuple -> number."""
+        return self._register(_Callback(name, help_text, fn, kind, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class span:
+    """
+    Times a block into histogram (with the given labels) and logs it at DEBUG level.
+
+        with span(stage_seconds, stage='ranking'):
+            ...
+
+    Can also be used as a decorator; each call is timed separately.
+    """
+
+    def __init__(self, histogram, **labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.seconds = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        self.histogram.observe(self.seconds, **self.labels)
+        if logger.isEnabledFor(logging.DEBUG):
+            labels = ' '.join(f'{name}={value}' for name, value in self.labels.items())
+            logger.debug(f"⏱️ {self.histogram.name} {labels} {self.seconds * 1000:.1f}ms"
+                         + (f" ({exc_type.__name__})" if exc_type else ''))
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(self.histogram, **self.labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class QueueLogging:
+    """
+    Sends a logger's records through a bounded queue to a background writer thread.
+
+    The writer is restarted in forked children (its thread does not survive a
+    fork), and stop() flushes whatever is still queued.
+    """
+
+    def __init__(self, target_logger, handler, level=logging.INFO, max_queue_size=10000):
+        self.handler = handler
+        self.max_queue_size = max_queue_size
+        self.queue_handler = DroppingQueueHandler(queue.Queue(maxsize=max_queue_size))
+        self._listener = None
+        target_logger.addHandler(self.queue_handler)
+        target_logger.setLevel(level)
+        target_logger.propagate = False
+        self.start()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def start(self):
+        self._listener = logging.handlers.QueueListener(self.queue_handler.queue, self.handler)
+        self._listener.start()
+
+    def _restart_in_child(self):
+        self.queue_handler.queue = queue.Queue(maxsize=self.max_queue_size)
+        self.start()
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    @property
+    def dropped(self):
+        return self.queue_handler.dropped
+
+    def queued(self):
+        return self.queue_handler.queue.qsize()
+
+
+def setup_queue_logging(level='INFO', fmt='%(asctime)s [%(process)d] %(levelname)s %(message)s', max_queue_size=10000):
+    """Routes the 'ml_engine' logger through a QueueLogging writer on stdout and returns it."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(fmt))
+    queue_logging = QueueLogging(logger, handler, level=getattr(logging, str(level).upper(), logging.INFO),
+                                 max_queue_size=max_queue_size)
+    atexit.register(queue_logging.stop)
+    return queue_logging
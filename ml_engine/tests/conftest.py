@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# The ml_engine modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep match_jobs' runtime data out of ml_engine/data and its background work off
+_data_dir = tempfile.mkdtemp(prefix='ml_engine_tests_')
+os.environ.setdefault('EMBEDDING_CACHE_ENABLED', 'false')
+os.environ.setdefault('JOB_CORPUS_PATH', os.path.join(_data_dir, 'job_corpus.sqlite3'))
+os.environ.setdefault('JOB_INDEX_DIR', os.path.join(_data_dir, 'job_index'))
+os.environ.setdefault('RESULT_SESSION_PATH', os.path.join(_data_dir, 'result_sessions.sqlite3'))
+os.environ.setdefault('PDF_PROCESS_POOL', 'false')
+os.environ.setdefault('REFRESH_ENABLED', 'false')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
@@ -0,0 +1,153 @@
+import pytest
+import requests
+
+import circuit_breaker
+import match_jobs
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return clock
+
+
+def test_opens_after_consecutive_failures_and_half_opens(clock):
+    breaker = CircuitBreaker('bdjobs', failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now += 60
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success(0.5)
+    assert breaker.state == CLOSED
+    assert breaker.stats()['trips'] == 1
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker('indeed', failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 29
+    assert not breaker.available()
+    clock.now += 1
+    assert breaker.available()
+
+
+def test_released_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker('linkedin', failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_timeout_follows_p95_latency():
+    breaker = CircuitBreaker('bdjobs', min_timeout=1.0, max_timeout=10.0, timeout_factor=2.0, min_samples=10)
+    assert breaker.timeout() == 10.0
+    for _ in range(20):
+        breaker.record_success(0.8)
+    assert breaker.timeout() == pytest.approx(1.6)
+
+
+class FakeSession:
+    def __init__(self, error=None, status_code=200):
+        self.error = error
+        self.status_code = status_code
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        response = requests.Response()
+        response.status_code = self.status_code
+        return response
+
+
+def make_client(session, rate_limiter=None):
+    client = match_jobs.HttpClient(max_retries=2, backoff_base=0, rate_limiter=rate_limiter)
+    client.session = session
+    return client
+
+
+@pytest.mark.parametrize('error', [requests.ReadTimeout(), requests.ConnectTimeout()])
+def test_timeouts_are_not_retried(error):
+    session = FakeSession(error=error)
+    attempts = []
+    with pytest.raises(requests.Timeout):
+        make_client(session).get('https://example.com/jobs', on_attempt=lambda seconds, response: attempts.append(response))
+    assert session.calls == 1
+    assert attempts == [None]
+
+
+def test_connection_errors_are_retried_and_each_attempt_is_reported():
+    session = FakeSession(error=requests.ConnectionError())
+    attempts = []
+    with pytest.raises(requests.ConnectionError):
+        make_client(session).get('https://example.com/jobs', on_attempt=lambda seconds, response: attempts.append(response))
+    assert session.calls == 3
+    assert attempts == [None, None, None]
+
+
+def test_attempt_time_excludes_rate_limit_wait():
+    session = FakeSession()
+    client = make_client(session, rate_limiter=match_jobs.HostRateLimiter(0.2))
+    samples = []
+    for _ in range(2):
+        client.get('https://example.com/jobs', on_attempt=lambda seconds, response: samples.append(seconds))
+    assert session.calls == 2
+    # The second call waited ~0.2 s for the limiter, which is not part of its sample
+    assert max(samples) < 0.05
+
+
+def test_source_get_counts_every_attempt(monkeypatch):
+    breakers = circuit_breaker.CircuitBreakers(failure_threshold=3, reset_timeout=60)
+    monkeypatch.setattr(match_jobs, 'source_breakers', breakers)
+    monkeypatch.setattr(match_jobs, 'http_client', make_client(FakeSession(error=requests.ConnectionError())))
+    with pytest.raises(requests.ConnectionError):
+        match_jobs.source_get('bdjobs', 'https://example.com/jobs')
+    stats = breakers.get('bdjobs').stats()
+    assert stats['failures'] == 3
+    assert stats['state'] == OPEN
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        match_jobs.source_get('bdjobs', 'https://example.com/jobs')
+
+
+@pytest.mark.parametrize('error', [requests.TooManyRedirects(), requests.exceptions.ChunkedEncodingError(), ValueError()])
+def test_half_open_probe_failing_with_other_errors_frees_the_source(clock, monkeypatch, error):
+    breakers = circuit_breaker.CircuitBreakers(failure_threshold=1, reset_timeout=30)
+    monkeypatch.setattr(match_jobs, 'source_breakers', breakers)
+    monkeypatch.setattr(match_jobs, 'http_client', make_client(FakeSession(error=error)))
+    breaker = breakers.get('indeed')
+    breaker.record_failure()
+    clock.now += 30
+
+    with pytest.raises(type(error)):
+        match_jobs.source_get('indeed', 'https://example.com/jobs')
+    if isinstance(error, requests.RequestException):
+        # The probe counted as a failure, so the circuit is open again
+        assert breaker.state == OPEN
+        clock.now += 30
+    assert breaker.allow()
@@ -0,0 +1,118 @@
+import json
+import time
+
+import numpy as np
+import pytest
+import requests
+
+import match_jobs
+from match_jobs import Deadline, DeadlineExceeded, HostRateLimiter, HttpClient
+
+
+class RecordingSession:
+    def __init__(self, status_code=200, error=None):
+        self.status_code = status_code
+        self.error = error
+        self.timeouts = []
+
+    def get(self, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        if self.error is not None:
+            raise self.error
+        response = requests.Response()
+        response.status_code = self.status_code
+        return response
+
+
+def make_client(session, **options):
+    client = HttpClient(**options)
+    client.session = session
+    return client
+
+
+def test_timeout_is_capped_to_the_budget():
+    session = RecordingSession()
+    make_client(session).get('https://example.com/jobs', deadline=Deadline(0.5), timeout=10)
+    assert 0 < session.timeouts[0] <= 0.5
+
+
+def test_rate_limit_wait_beyond_the_budget_is_skipped():
+    session = RecordingSession()
+    client = make_client(session, rate_limiter=HostRateLimiter(5.0))
+    client.get('https://example.com/jobs')
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        client.get('https://example.com/jobs', deadline=Deadline(0.5))
+    assert time.perf_counter() - start < 0.1
+    assert len(session.timeouts) == 1
+
+
+def test_no_retry_backoff_beyond_the_budget():
+    session = RecordingSession(error=requests.ConnectionError())
+    client = make_client(session, max_retries=2, backoff_base=10, backoff_max=10)
+    start = time.perf_counter()
+    with pytest.raises(requests.ConnectionError):
+        # A random backoff below the 0.01 s budget is practically impossible
+        client.get('https://example.com/jobs', deadline=Deadline(0.01))
+    assert time.perf_counter() - start < 0.1
+    assert len(session.timeouts) == 1
+
+
+def test_retryable_status_is_returned_when_the_budget_cannot_cover_a_retry():
+    session = RecordingSession(status_code=503)
+    client = make_client(session, max_retries=2, backoff_base=10, backoff_max=10)
+    assert client.get('https://example.com/jobs', deadline=Deadline(0.01)).status_code == 503
+    assert len(session.timeouts) == 1
+
+
+def fast_scraper(keywords, num_jobs):
+    return [{'id': f'fast_{i}', 'title': f'Python developer {i}', 'company': f'Fast Co {i}', 'source': 'Fast',
+             'description': 'Python', 'requirements': 'Python', 'location': 'Dhaka',
+             'job_url': f'https://fast.example.com/{i}', 'apply_url': ''} for i in range(3)]
+
+
+def slow_scraper(keywords, num_jobs):
+    time.sleep(1.0)
+    return fast_scraper(keywords, num_jobs)
+
+
+def budget_scraper(keywords, num_jobs):
+    raise DeadlineExceeded('Budget: latency budget used up')
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(match_jobs, 'get_job_embeddings',
+                        lambda texts: np.random.default_rng(0).standard_normal((len(texts), 4)).astype(np.float32))
+
+
+def test_stream_leaves_out_sources_past_the_budget(monkeypatch, fake_embeddings):
+    # The final event stores a result session
+    match_jobs.warm_up()
+    monkeypatch.setattr(match_jobs, 'JOB_SOURCES', [('Fast', fast_scraper), ('Slow', slow_scraper)])
+    artifacts = {'keywords': f'python stream {time.time()}', 'text': 'Python developer',
+                 'embedding': np.ones(4, dtype=np.float32)}
+
+    start = time.perf_counter()
+    events = [json.loads(line) for line in match_jobs.stream_matches(artifacts, {}, deadline=Deadline(0.3))]
+    assert time.perf_counter() - start < 0.9
+
+    final = events[-1]
+    assert final['type'] == 'final'
+    assert final['source_status'] == {'Fast': 'complete', 'Slow': 'missing'}
+    assert final['partial_results'] is True
+    assert len(final['matched_jobs']) == 3
+
+
+def test_sequential_budget_cut_off_is_missing_not_failed(monkeypatch):
+    monkeypatch.setattr(match_jobs, 'SCRAPE_CONCURRENT', False)
+    results = list(match_jobs.iter_scrape_sources(f'python sequential {time.time()}', 5,
+                                                  sources=[('Budget', budget_scraper), ('Fast', fast_scraper)],
+                                                  deadline=Deadline(5)))
+    assert [(name, status) for name, _, status in results] == [('Budget', 'missing'), ('Fast', 'complete')]
+
+
+def test_concurrent_budget_cut_off_is_missing_not_failed():
+    results = list(match_jobs.iter_scrape_sources(f'python concurrent {time.time()}', 5,
+                                                  sources=[('Budget', budget_scraper)], deadline=Deadline(5)))
+    assert [(name, status) for name, _, status in results] == [('Budget', 'missing')]
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from embedding_service import ModelLoader
+
+
+def test_concurrent_warm_up_loads_and_warms_the_model_once():
+    calls = {'load': 0, 'warmup': 0}
+
+    def load():
+        calls['load'] += 1
+        time.sleep(0.05)
+        return object()
+
+    def warmup(model):
+        calls['warmup'] += 1
+        time.sleep(0.05)
+
+    loader = ModelLoader(load, warmup)
+    loader.start_background()
+    threads = [threading.Thread(target=loader.get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == {'load': 1, 'warmup': 1}
+    assert loader.ready
@@ -0,0 +1,38 @@
+import pytest
+
+import match_jobs
+from job_details import JOB_DETAIL_TEMPLATES, build_job_details, job_source
+
+
+@pytest.fixture
+def client():
+    return match_jobs.app.test_client()
+
+
+def test_source_defaults_to_the_id_prefix():
+    assert job_source('bdjobs_1_1700000000') == 'bdjobs'
+    assert job_source('job_1', 'LinkedIn') == 'linkedin'
+
+
+def test_details_come_from_the_source_template():
+    details = build_job_details('indeed_3', 'indeed')
+    assert details['id'] == 'indeed_3'
+    assert details['benefits'] == JOB_DETAIL_TEMPLATES['indeed']['benefits']
+    assert build_job_details('acme_1', 'acme')['source'] == 'Acme'
+
+
+def test_batch_returns_details_by_id(client):
+    response = client.post('/job-details/batch', json={'job_ids': [
+        'bdjobs_1', {'id': 'x_2', 'source': 'LinkedIn'}, 7, {'id': 'x_3', 'source': 5}]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert {job_id: details['source'] for job_id, details in body['job_details'].items()} == {
+        'bdjobs_1': 'BDJobs', 'x_2': 'LinkedIn'}
+    assert body['invalid'] == [7, {'id': 'x_3', 'source': 5}]
+
+
+def test_batch_limits(client):
+    assert client.post('/job-details/batch', json={'job_ids': 'bdjobs_1'}).status_code == 400
+    assert client.post('/job-details/batch', json=['bdjobs_1']).status_code == 400
+    too_many = ['bdjobs_1'] * (match_jobs.JOB_DETAILS_BATCH_MAX + 1)
+    assert client.post('/job-details/batch', json={'job_ids': too_many}).status_code == 400
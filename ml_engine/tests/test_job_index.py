@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from job_index import CURRENT_POINTER, build_index, current_index_dir, load_index
+
+
+def random_vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize('kind', ['flat', 'ivf'])
+def test_rebuild_does_not_touch_loaded_index(tmp_path, kind):
+    old_vectors = random_vectors(50)
+    build_index(old_vectors, [f'old_{i}' for i in range(50)], kind=kind).save(str(tmp_path), 'model-1')
+    old_index, old_meta = load_index(str(tmp_path))
+    expected = old_index.search(old_vectors[3], k=1)
+
+    new_vectors = random_vectors(80, seed=1)
+    new_dir = build_index(new_vectors, [f'new_{i}' for i in range(80)], kind=kind).save(str(tmp_path), 'model-1')
+
+    # The loaded index still reads its own (memory-mapped) files
+    assert old_index.search(old_vectors[3], k=1) == expected
+    assert expected[0][0] == 'old_3'
+    assert new_dir != old_meta['path']
+    assert current_index_dir(str(tmp_path)) == new_dir
+
+    new_index, new_meta = load_index(str(tmp_path))
+    assert new_meta['path'] == new_dir
+    assert new_meta['count'] == len(new_index) == 80
+    assert new_index.search(new_vectors[7], k=1)[0][0] == 'new_7'
+
+
+def test_old_versions_are_pruned(tmp_path):
+    vectors = random_vectors(10)
+    saved = [build_index(vectors, list(range(10))).save(str(tmp_path), 'model-1', keep=2) for _ in range(4)]
+    versions = sorted(name for name in os.listdir(tmp_path) if name != CURRENT_POINTER)
+    assert [os.path.join(str(tmp_path), name) for name in versions] == saved[-2:]
+    assert current_index_dir(str(tmp_path)) == saved[-1]
+
+
+def test_load_without_index(tmp_path):
+    assert current_index_dir(str(tmp_path)) is None
+    with pytest.raises(FileNotFoundError):
+        load_index(str(tmp_path))
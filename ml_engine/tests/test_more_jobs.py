@@ -0,0 +1,117 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import match_jobs
+from result_sessions import RankedResults, encode_cursor
+from test_result_sessions import RESUME, make_jobs
+
+
+@pytest.fixture
+def client():
+    return match_jobs.create_app().test_client()
+
+
+@pytest.mark.parametrize('per_page', ['abc', -1, 0, 2.5, None, True])
+def test_bad_per_page_is_rejected(client, per_page):
+    response = client.post('/more-jobs', json={'cursor': encode_cursor('missing', 10), 'per_page': per_page})
+    assert response.status_code == 400
+    assert 'per_page' in response.get_json()['error']
+
+
+def test_per_page_is_capped(client):
+    results = RankedResults(RESUME, 'python')
+    results.add(*make_jobs(np.linspace(0.9, 0.1, 150), 'session'))
+    results.exhausted = True
+    match_jobs.result_sessions.put('per-page-session', results)
+
+    response = client.post('/more-jobs', json={'cursor': encode_cursor('per-page-session', 0), 'per_page': 500})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['per_page'] == match_jobs.MORE_JOBS_MAX_PER_PAGE
+    assert len(body['jobs']) == match_jobs.MORE_JOBS_MAX_PER_PAGE
+
+
+@pytest.mark.parametrize('cursor', [5, ['abc'], {'id': 'abc'}, 'not a cursor'])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.post('/more-jobs', json={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+
+def test_missing_body_is_rejected(client):
+    assert client.post('/more-jobs', data='not json').status_code == 400
+
+
+def test_scraped_jobs_are_deduplicated_once_for_a_session(monkeypatch):
+    jobs, embeddings = make_jobs([0.9, 0.8], 'dedup')
+    scraper = lambda keywords, num_jobs: [dict(job) for job in jobs]
+    monkeypatch.setattr(match_jobs, 'JOB_SOURCES', [('BDJobs', scraper), ('Indeed', scraper)])
+    monkeypatch.setattr(match_jobs, 'get_job_embeddings', lambda texts: embeddings[:len(texts)])
+    results = match_jobs.new_result_session({'embedding': RESUME, 'keywords': 'dedup once'}, {}, depth=5)
+    batches = []
+    add = results.deduplicator.add
+    monkeypatch.setattr(results.deduplicator, 'add', lambda new_jobs: batches.append(len(new_jobs)) or add(new_jobs))
+
+    scraped = match_jobs.scrape_sources('dedup once', 5, deduplicator=results.deduplicator)
+    assert match_jobs.add_session_jobs(results, scraped) == 2
+    assert batches == [4]
+
+
+def blocked_sources(monkeypatch, release):
+    calls = []
+
+    def scraper(keywords, num_jobs):
+        calls.append(num_jobs)
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(match_jobs, 'JOB_SOURCES', [('BDJobs', scraper)])
+    return calls
+
+
+def short_session(session_id, keywords):
+    results = RankedResults(RESUME, keywords, depth=5)
+    results.add(*make_jobs([0.9, 0.8, 0.7], session_id))
+    match_jobs.result_sessions.put(session_id, results)
+
+
+def test_deeper_scrape_stops_at_the_latency_budget(client, monkeypatch):
+    release = threading.Event()
+    calls = blocked_sources(monkeypatch, release)
+    short_session('budget-session', 'budget keywords')
+    try:
+        start = time.perf_counter()
+        response = client.post('/more-jobs', json={'cursor': encode_cursor('budget-session', 0), 'per_page': 10,
+                                                   'budget_ms': 200})
+        assert time.perf_counter() - start < 2
+    finally:
+        release.set()
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['jobs']) == 3 and body['has_more']
+    # The source was cut short, so it may still have more jobs at this depth
+    results = match_jobs.result_sessions.get('budget-session')
+    assert calls and not results.exhausted and results.depth == 5
+
+
+def test_other_requests_do_not_wait_for_a_deeper_scrape(client, monkeypatch):
+    release = threading.Event()
+    calls = blocked_sources(monkeypatch, release)
+    short_session('single-flight-session', 'single flight keywords')
+    cursor = encode_cursor('single-flight-session', 0)
+    scraping = threading.Thread(target=client.post, args=('/more-jobs',), kwargs={'json': {'cursor': cursor, 'budget_ms': 0}})
+    scraping.start()
+    try:
+        while not calls:
+            time.sleep(0.01)
+        start = time.perf_counter()
+        response = client.post('/more-jobs', json={'cursor': cursor, 'per_page': 10, 'budget_ms': 0})
+        assert time.perf_counter() - start < 2
+        assert len(response.get_json()['jobs']) == 3
+        assert calls == [match_jobs.MORE_JOBS_SCRAPE_DEPTH]
+    finally:
+        release.set()
+        scraping.join()
@@ -0,0 +1,35 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from pdf_extract import PDFTooLargeError, spool_upload, spooled_path
+
+
+def test_small_upload_stays_in_memory():
+    data = b'%PDF-1.4 small'
+    digest, spooled = spool_upload(io.BytesIO(data), max_bytes=1024, memory_bytes=64)
+    with spooled:
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert spooled_path(spooled) is None
+        assert spooled.read() == data
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='spooled uploads are only opened by path on POSIX')
+def test_large_upload_is_spooled_to_a_named_file():
+    data = os.urandom(10000)
+    digest, spooled = spool_upload(io.BytesIO(data), max_bytes=20000, memory_bytes=1000, chunk_size=512)
+    with spooled:
+        path = spooled_path(spooled)
+        assert path is not None
+        with open(path, 'rb') as f:
+            assert f.read() == data
+        assert spooled.read() == data
+        assert digest == hashlib.sha256(data).hexdigest()
+    assert not os.path.exists(path)
+
+
+def test_upload_over_limit_is_rejected():
+    with pytest.raises(PDFTooLargeError):
+        spool_upload(io.BytesIO(b'x' * 5000), max_bytes=4000, memory_bytes=1000)
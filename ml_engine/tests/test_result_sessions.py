@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from result_sessions import RankedResults, ResultSessionStore, decode_cursor, encode_cursor
+
+RESUME = np.array([1.0, 0.0], dtype=np.float32)
+
+
+def make_jobs(scores, prefix):
+    """Jobs whose embeddings have the given cosine similarity to RESUME."""
+    jobs = [{'title': f'{prefix} job {i}', 'company': 'Acme', 'source': 'BDJobs', 'job_url': f'https://example.com/{prefix}/{i}',
+             'description': '', 'requirements': '', 'location': 'Dhaka'} for i in range(len(scores))]
+    scores = np.asarray(scores, dtype=np.float32)
+    embeddings = np.stack([scores, np.sqrt(1 - scores ** 2)], axis=1)
+    return jobs, embeddings
+
+
+def page_scores(results, offset, limit):
+    return [job['similarity_score'] for job in results.page(offset, limit)]
+
+
+def test_pages_after_add_are_in_score_order():
+    results = RankedResults(RESUME, 'python')
+    results.add(*make_jobs([0.9, 0.8, 0.7, 0.6, 0.5, 0.4], 'first'))
+    served = page_scores(results, 0, 2)
+    assert served == [90.0, 80.0]
+
+    # The first merge puts 0.95 at the top of the unserved jobs, so order is no longer sorted as a whole
+    results.add(*make_jobs([0.95], 'second'))
+    results.add(*make_jobs([0.99, 0.85, 0.45], 'third'))
+
+    assert page_scores(results, 0, 2) == served
+    remaining = []
+    offset = 2
+    while offset < len(results):
+        scores = page_scores(results, offset, 3)
+        remaining.extend(scores)
+        offset += len(scores)
+    assert remaining == sorted(remaining, reverse=True)
+    assert remaining == [99.0, 95.0, 85.0, 70.0, 60.0, 50.0, 45.0, 40.0]
+
+
+def test_add_between_pages_keeps_unserved_jobs_sorted():
+    rng = np.random.default_rng(0)
+    results = RankedResults(RESUME, 'python')
+    results.add(*make_jobs(rng.uniform(0, 1, 20), 'batch0'))
+    offset = 0
+    for batch in range(1, 11):
+        offset += len(results.page(offset, 4))
+        results.add(*make_jobs(rng.uniform(0, 1, 10), f'batch{batch}'))
+        unserved = results.scores[results.order[offset:]]
+        assert np.all(np.diff(unserved) <= 0)
+    assert len(results) == 120
+
+
+def test_filters_apply_to_added_jobs():
+    results = RankedResults(RESUME, 'python', filters={'min_score': 60})
+    assert results.add(*make_jobs([0.9, 0.5, 0.7], 'first')) == 2
+    assert page_scores(results, 0, 10) == [90.0, 70.0]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('abc_DEF-1', 40)) == ('abc_DEF-1', 40)
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor('abc', -1))
+    for cursor in (5, ['abc'], 'not a cursor'):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+@pytest.fixture
+def session_path(tmp_path):
+    return str(tmp_path / 'result_sessions.sqlite3')
+
+
+def test_sessions_are_shared_between_stores(session_path):
+    # Two stores on one file stand in for two worker processes
+    first, second = ResultSessionStore(session_path), ResultSessionStore(session_path)
+    results = RankedResults(RESUME, 'python')
+    results.add(*make_jobs([0.9, 0.8, 0.7], 'shared'))
+    results.page(0, 1)
+    session_id = first.create(results)
+
+    jobs, stored = second.page(session_id, 1, 1)
+    assert [job['similarity_score'] for job in jobs] == [80.0]
+    assert first.get(session_id).served == 2 and stored.keywords == 'python'
+    assert second.page('unknown', 0, 1) is None
+
+
+def test_one_caller_at_a_time_grows_a_session(session_path):
+    first, second = ResultSessionStore(session_path), ResultSessionStore(session_path)
+    results = RankedResults(RESUME, 'python')
+    results.add(*make_jobs([0.9, 0.5], 'grow'))
+    session_id = first.create(results)
+
+    lease = first.claim(session_id, 60)
+    assert lease is not None and second.claim(session_id, 60) is None
+    claimed = first.get(session_id)
+    # A page is served by another process while the first one scrapes
+    second.page(session_id, 0, 2)
+    first.release(session_id, lease, claimed, lambda session: session.add(*make_jobs([0.95], 'deeper')))
+
+    # The new job goes after the served jobs, not above them
+    assert page_scores(first.get(session_id), 0, 3) == [90.0, 50.0, 95.0]
+    assert second.claim(session_id, 60) is not None
+
+
+def test_merges_after_a_lost_lease_are_dropped(session_path):
+    store = ResultSessionStore(session_path)
+    results = RankedResults(RESUME, 'python')
+    results.add(*make_jobs([0.9], 'lease'))
+    session_id = store.create(results)
+
+    lease = store.claim(session_id, -1)
+    newer = store.claim(session_id, 60)
+    store.release(session_id, lease, store.get(session_id), lambda session: session.add(*make_jobs([0.8], 'late')))
+    assert len(store.get(session_id)) == 1
+    assert store.claim(session_id, 60) is None
+    store.release(session_id, newer)
+    assert store.claim(session_id, 60) is not None
+
+
+def test_store_bounds(session_path):
+    store = ResultSessionStore(session_path, max_entries=2)
+    session_ids = []
+    for i in range(3):
+        results = RankedResults(RESUME, 'python')
+        results.add(*make_jobs([0.9], f'bounds{i}'))
+        session_ids.append(store.create(results))
+    assert store.get(session_ids[0]) is None
+    assert all(store.get(session_id) is not None for session_id in session_ids[1:])
+    assert store.stats()['evictions'] == 1
+
+    store.ttl = 0
+    assert store.get(session_ids[2]) is None
@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+import match_jobs
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(match_jobs, 'PDF_MAX_UPLOAD_BYTES', 1024)
+    monkeypatch.setattr(match_jobs, 'UPLOAD_FORM_OVERHEAD_BYTES', 512)
+    return match_jobs.app.test_client()
+
+
+def upload(size):
+    return {'resume': (io.BytesIO(b'%PDF' + b'0' * size), 'cv.pdf')}
+
+
+def test_oversized_upload_is_rejected_before_it_is_read(client, monkeypatch):
+    def spool(*args, **kwargs):
+        raise AssertionError('the upload should not be read')
+
+    monkeypatch.setattr(match_jobs, 'spool_upload', spool)
+    for path in ('/match-jobs', '/match-jobs/stream'):
+        response = client.post(path, data=upload(4096), content_type='multipart/form-data')
+        assert response.status_code == 413
+
+
+def test_batch_allows_one_upload_per_resume(client):
+    files = [(io.BytesIO(b'x' * 1024), f'cv{i}.txt') for i in range(2)]
+    response = client.post('/match-jobs/batch', data={'resumes': files}, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert all(result['error'] == 'Only PDF files are supported' for result in response.get_json()['results'])
+
+
+def test_max_content_length_caps_every_body():
+    assert match_jobs.app.config['MAX_CONTENT_LENGTH'] >= match_jobs.BATCH_MAX_RESUMES * match_jobs.PDF_MAX_UPLOAD_BYTES